@@ -1,20 +1,64 @@
 """The Aquarea Smart Cloud integration."""
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Callable, Iterable
+from functools import partial
+import logging
+from typing import TYPE_CHECKING
 
-import aioaquarea
-
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import CONF_USERNAME, Platform
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
-from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    CLIENT,
+    CONF_LOOP_LAG_THRESHOLD,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_PROFILING,
+    CONF_TRACE,
+    DEFAULT_DEADBAND,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_LOOP_LAG_THRESHOLD,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MIN_PUBLISH_INTERVAL,
+    DEVICES,
+    DOMAIN,
+    LIFECYCLE,
+    LOADED_PLATFORMS,
+    PROFILER,
+    PUBLISH_OPTIONS,
+    PUBLISH_POLICIES,
+    RELOAD_SCHEDULED,
+    SCHEDULER,
+    SIGNAL_DEVICE_LOADED,
+    SIGNAL_DEVICE_UNLOADED,
+    TRACER,
+    WATCHDOG,
+)
+from .lifecycle import AquareaEntryLifecycle
+from .limiter import async_get_limiter
+from .metrics import async_get_metrics, async_setup_metrics
+from .profiler import PROFILE_LOG_INTERVAL, AquareaProfiler
+from .publish import PublishPolicy
+from .services import async_setup_services
+from .trace import AquareaTracer
+from .watchdog import AquareaLoopWatchdog
+from .websocket import async_setup_websocket
+
+# The client library and the modules built on it are only imported once an
+# entry is set up, keeping them off the Home Assistant startup path
+if TYPE_CHECKING:
+    from .coordinator import AquareaDataUpdateCoordinator
+    from .snapshot import DeviceSnapshot
 
-from .const import ATTRIBUTION, CLIENT, DEVICES, DOMAIN
-from .coordinator import AquareaDataUpdateCoordinator
+_LOGGER = logging.getLogger(__name__)
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 PLATFORMS: list[Platform] = [
     Platform.BUTTON,
@@ -26,38 +70,179 @@ PLATFORMS: list[Platform] = [
     Platform.SELECT
 ]
 
+# Platforms that only produce entities for some device capabilities
+CAPABILITY_PLATFORMS: dict[Platform, Callable[[DeviceSnapshot], bool]] = {
+    Platform.CLIMATE: lambda snapshot: bool(snapshot.zones),
+    Platform.WATER_HEATER: lambda snapshot: snapshot.has_tank,
+}
+
+
+def _get_capabilities(snapshot: DeviceSnapshot) -> tuple:
+    """Return the capabilities of a device the entities are created from."""
+    return (
+        snapshot.zone_ids,
+        snapshot.has_tank,
+        any(zone.cool_mode for zone in snapshot.zones),
+        snapshot.support_special_status,
+    )
+
+
+def _get_platforms(
+    coordinators: Iterable[AquareaDataUpdateCoordinator],
+) -> list[Platform]:
+    """Return the platforms that produce entities for the devices."""
+    snapshots = [coordinator.data for coordinator in coordinators]
+    return [
+        platform
+        for platform in PLATFORMS
+        if platform not in CAPABILITY_PLATFORMS
+        or any(CAPABILITY_PLATFORMS[platform](snapshot) for snapshot in snapshots)
+    ]
+
 
-def _create_client(hass: HomeAssistant, entry: ConfigEntry) -> aioaquarea.Client:
-    username = entry.data.get(CONF_USERNAME)
-    password = entry.data.get(CONF_PASSWORD)
-    session = async_create_clientsession(hass)
-    return aioaquarea.Client(session, username, password)
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Aquarea Smart Cloud services and WebSocket API."""
+    await async_setup_services(hass)
+    async_setup_websocket(hass)
+    async_setup_metrics(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Aquarea Smart Cloud from a config entry."""
+    import aioaquarea
+
+    from .clients import async_get_client_registry
+    from .coordinator import AquareaDataUpdateCoordinator
+    from .programs import AquareaProgramScheduler, async_get_program_store
 
-    client = _create_client(hass, entry)
+    lifecycle = AquareaEntryLifecycle(hass, f"{DOMAIN} {entry.title}")
+    # Covers a setup that fails before the entry is loaded
+    entry.async_on_unload(partial(_async_shutdown_unless_loaded, entry, lifecycle))
+    registry = async_get_client_registry(hass)
+    account_client = registry.async_acquire(entry)
+    entry.async_on_unload(partial(registry.async_release, account_client))
+    client = account_client.client
+    limiter = async_get_limiter(
+        hass,
+        entry.data[CONF_USERNAME],
+        entry.options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        ),
+    )
+    profiler = AquareaProfiler(entry.options.get(CONF_PROFILING, False))
+    tracer = AquareaTracer(entry.options.get(CONF_TRACE, False))
+    watchdog = AquareaLoopWatchdog(
+        hass,
+        entry.options.get(CONF_LOOP_LAG_THRESHOLD, DEFAULT_LOOP_LAG_THRESHOLD) / 1000,
+    )
+    entry.async_on_unload(watchdog.async_shutdown)
+    publish_policies = {
+        measurement: PublishPolicy(
+            deadband=entry.options.get(deadband, DEFAULT_DEADBAND),
+            min_interval=entry.options.get(
+                min_interval, DEFAULT_MIN_PUBLISH_INTERVAL
+            ),
+            heartbeat=entry.options.get(heartbeat, DEFAULT_HEARTBEAT_INTERVAL) * 60,
+        )
+        for measurement, (
+            deadband,
+            min_interval,
+            heartbeat,
+        ) in PUBLISH_OPTIONS.items()
+    }
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
-        CLIENT: client,
+        CLIENT: account_client,
         DEVICES: dict[str, AquareaDataUpdateCoordinator](),
+        LOADED_PLATFORMS: set[Platform](),
+        RELOAD_SCHEDULED: False,
+        PROFILER: profiler,
+        WATCHDOG: watchdog,
+        PUBLISH_POLICIES: publish_policies,
+        TRACER: tracer,
+        LIFECYCLE: lifecycle,
     }
+    metrics = async_get_metrics(hass)
+    entry.async_on_unload(partial(metrics.remove, {"entry": entry.entry_id}))
+
+    if profiler.enabled:
+        lifecycle.async_track_timer(
+            async_track_time_interval(
+                hass, profiler.async_log_summary, PROFILE_LOG_INTERVAL
+            )
+        )
 
     try:
-        await client.login()
+        # A client kept from a previous setup of the account is already logged in
+        if not account_client.logged_in:
+            await limiter.run(client.login)
+            account_client.logged_in = True
         # Get all the devices, we will filter the disabled ones later
-        devices = await client.get_devices(include_long_id=True)
+        if account_client.device_infos is None:
+            account_client.device_infos = await limiter.run(
+                client.get_devices, include_long_id=True
+            )
+        devices = account_client.device_infos
 
         # We create a Coordinator per Device and store it in the hass.data[DOMAIN] dict to be able to access it from the platform
         for device in devices:
             coordinator = AquareaDataUpdateCoordinator(
-                hass=hass, entry=entry, client=client, device_info=device
+                hass=hass,
+                entry=entry,
+                client=client,
+                device_info=device,
+                device=account_client.devices.get(device.device_id),
+                limiter=limiter,
+                profiler=profiler,
+                watchdog=watchdog,
+                publish_policies=publish_policies,
+                metrics=metrics,
+                tracer=tracer,
+                lifecycle=lifecycle,
             )
             hass.data[DOMAIN][entry.entry_id][DEVICES][device.device_id] = coordinator
+            entry.async_on_unload(
+                partial(metrics.remove, {"device": device.device_id})
+            )
             await coordinator.async_config_entry_first_refresh()
+            account_client.devices[device.device_id] = coordinator.device
 
-        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        scheduler = AquareaProgramScheduler(
+            hass,
+            lifecycle,
+            hass.data[DOMAIN][entry.entry_id][DEVICES],
+            await async_get_program_store(hass),
+        )
+        hass.data[DOMAIN][entry.entry_id][SCHEDULER] = scheduler
+        entry.async_on_unload(scheduler.async_start())
+
+        data = hass.data[DOMAIN][entry.entry_id]
+        platforms = _get_platforms(data[DEVICES].values())
+        data[LOADED_PLATFORMS].update(platforms)
+        await hass.config_entries.async_forward_entry_setups(entry, platforms)
+
+        for coordinator in data[DEVICES].values():
+            entry.async_on_unload(
+                coordinator.async_add_listener(
+                    partial(
+                        _async_check_capabilities,
+                        hass,
+                        entry,
+                        coordinator,
+                        _get_capabilities(coordinator.data),
+                    )
+                )
+            )
+            entry.async_on_unload(
+                partial(
+                    async_dispatcher_send, hass, SIGNAL_DEVICE_UNLOADED, coordinator
+                )
+            )
+            async_dispatcher_send(hass, SIGNAL_DEVICE_LOADED, coordinator)
+
+        entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     except aioaquarea.AuthenticationError as err:
+        registry.async_discard(account_client)
         if err.error_code in (
             aioaquarea.AuthenticationErrorCodes.INVALID_USERNAME_OR_PASSWORD,
             aioaquarea.AuthenticationErrorCodes.INVALID_CREDENTIALS,
@@ -67,39 +252,55 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+@callback
+def _async_check_capabilities(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: AquareaDataUpdateCoordinator,
+    capabilities: tuple,
+) -> None:
+    """Reload the entry when the capabilities of a device change.
+
+    The platforms create their entities once, a reload creates the entities
+    of the capabilities gained and removes the ones lost.
+    """
+    data = hass.data[DOMAIN][entry.entry_id]
+    if data[RELOAD_SCHEDULED] or _get_capabilities(coordinator.data) == capabilities:
+        return
+
+    _LOGGER.info(
+        "The capabilities of device %s changed, reloading %s",
+        coordinator.device.device_id,
+        entry.title,
+    )
+    data[RELOAD_SCHEDULED] = True
+    hass.async_create_task(
+        hass.config_entries.async_reload(entry.entry_id),
+        f"{DOMAIN} reload {entry.title}",
+    )
+
+
+async def _async_shutdown_unless_loaded(
+    entry: ConfigEntry, lifecycle: AquareaEntryLifecycle
+) -> None:
+    """Stop the background work, unless a failed unload kept the entities."""
+    if entry.state is not ConfigEntryState.LOADED:
+        await lifecycle.async_shutdown()
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+    data = hass.data[DOMAIN][entry.entry_id]
+    if unload_ok := await hass.config_entries.async_unload_platforms(
+        entry, data[LOADED_PLATFORMS]
+    ):
+        # The entities are gone, stop the background work they relied on
+        await data[LIFECYCLE].async_shutdown()
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
-
-
-class AquareaBaseEntity(CoordinatorEntity[AquareaDataUpdateCoordinator]):
-    """Common base for Aquarea entities."""
-
-    coordinator: AquareaDataUpdateCoordinator
-    _attr_attribution = ATTRIBUTION
-    _attr_has_entity_name = True
-
-    def __init__(self, coordinator: AquareaDataUpdateCoordinator) -> None:
-        """Initialize entity."""
-        super().__init__(coordinator)
-
-        self._attrs: dict[str, Any] = {
-            "name": self.coordinator.device.name,
-            "id": self.coordinator.device.device_id,
-        }
-        self._attr_unique_id = self.coordinator.device.device_id
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.device.device_id)},
-            manufacturer=self.coordinator.device.manufacturer,
-            model="",
-            name=self.coordinator.device.name,
-            sw_version=self.coordinator.device.version,
-        )
-
-    async def async_added_to_hass(self) -> None:
-        """When entity is added to hass."""
-        await super().async_added_to_hass()
-        self._handle_coordinator_update()
@@ -1,5 +1,6 @@
 """Binary sensors for the Aquarea integration."""
 import logging
+from typing import Any
 
 import aioaquarea
 
@@ -12,9 +13,9 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import AquareaBaseEntity
-from .const import DEVICES, DOMAIN
+from .const import ATTR_ERROR_CODE, ATTR_ERROR_MESSAGE, DEVICES, DOMAIN
 from .coordinator import AquareaDataUpdateCoordinator
+from .entity import AquareaBaseEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,7 +54,17 @@ class AquareaStatusBinarySensor(AquareaBaseEntity, BinarySensorEntity):
     @property
     def is_on(self) -> bool:
         """Return true if the binary sensor is on."""
-        return self.coordinator.device.is_on_error
+        return self.coordinator.data.is_on_error
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the code and description of the current error."""
+        if (error := self.coordinator.current_error) is None:
+            return None
+        return {
+            ATTR_ERROR_CODE: error.error_code,
+            ATTR_ERROR_MESSAGE: error.error_message,
+        }
 
 class AquareaDefrostBinarySensor(AquareaBaseEntity, BinarySensorEntity):
     """Representation of a Aquarea sensor that indicates if the device is on defrost mode."""
@@ -74,4 +85,4 @@ class AquareaDefrostBinarySensor(AquareaBaseEntity, BinarySensorEntity):
     @property
     def is_on(self) -> bool:
         """Return true if the binary sensor is on."""
-        return self.coordinator.device.device_mode_status is aioaquarea.DeviceModeStatus.DEFROST
+        return self.coordinator.data.device_mode_status is aioaquarea.DeviceModeStatus.DEFROST
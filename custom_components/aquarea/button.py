@@ -8,9 +8,9 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import AquareaBaseEntity
 from .const import DEVICES, DOMAIN
 from .coordinator import AquareaDataUpdateCoordinator
+from .entity import AquareaBaseEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -46,9 +46,11 @@ class AquareaDefrostButton(AquareaBaseEntity, ButtonEntity):
 
     async def async_press(self) -> None:
         """Request to start the defrost process."""
-        if self.coordinator.device.device_mode_status is not aioaquarea.DeviceModeStatus.DEFROST:
+        if self.coordinator.data.device_mode_status is not aioaquarea.DeviceModeStatus.DEFROST:
             _LOGGER.debug(
                 "Requesting defrost for device %s",
                 self.coordinator.device.device_id,
             )
-            await self.coordinator.device.request_defrost()
+            await self.coordinator.async_execute(
+                self.coordinator.device.request_defrost
+            )
@@ -0,0 +1,194 @@
+"""Authenticated Aquarea Smart Cloud clients shared across entry reloads."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import aioaquarea
+from aiohttp import ClientSession
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.event import async_call_later
+
+from .const import CLIENTS, DOMAIN
+
+# Seconds an unused client is kept, so a reload finds it still logged in
+CLIENT_EVICTION_DELAY = 60
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AquareaAccountClient:
+    """Client of an account with its devices, kept warm across reloads."""
+
+    def __init__(
+        self, session: ClientSession, client: aioaquarea.Client, password: str
+    ) -> None:
+        """Initialize the account client."""
+        self.session = session
+        self.client = client
+        self.password = password
+        self.logged_in = False
+        self.device_infos: list[aioaquarea.data.DeviceInfo] | None = None
+        self.devices: dict[str, aioaquarea.Device] = {}
+        self.references = 0
+        self.cancel_eviction: CALLBACK_TYPE | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the client."""
+        return {
+            "logged_in": self.logged_in,
+            "references": self.references,
+            "devices": list(self.devices),
+        }
+
+
+class AquareaClientRegistry:
+    """Account keyed registry of the clients, with reference counting.
+
+    A released client is evicted after CLIENT_EVICTION_DELAY seconds, unless
+    an entry of the account acquires it again in the meantime.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the registry."""
+        self._hass = hass
+        self._clients: dict[str, AquareaAccountClient] = {}
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_stop)
+
+    @callback
+    def async_acquire(self, entry: ConfigEntry) -> AquareaAccountClient:
+        """Return the client of the account of the entry.
+
+        A new client is created when there is none or the password changed.
+        """
+        account = entry.data[CONF_USERNAME].lower()
+        password = entry.data[CONF_PASSWORD]
+
+        if (
+            account_client := self._clients.get(account)
+        ) is None or account_client.password != password:
+            # Home Assistant would detach a session created during the setup
+            # of an entry once it unloads, the registry detaches it instead
+            session = async_create_clientsession(self._hass, auto_cleanup=False)
+            account_client = AquareaAccountClient(
+                session,
+                aioaquarea.Client(session, entry.data[CONF_USERNAME], password),
+                password,
+            )
+            self._async_replace(account, account_client)
+
+        if account_client.cancel_eviction is not None:
+            account_client.cancel_eviction()
+            account_client.cancel_eviction = None
+
+        account_client.references += 1
+        return account_client
+
+    @callback
+    def async_adopt(
+        self,
+        username: str,
+        password: str,
+        session: ClientSession,
+        client: aioaquarea.Client,
+    ) -> None:
+        """Adopt a client that already logged in, like the one of a reauth."""
+        account_client = AquareaAccountClient(session, client, password)
+        account_client.logged_in = True
+        self._async_replace(username.lower(), account_client)
+        self._async_schedule_eviction(username.lower(), account_client)
+
+    @callback
+    def async_release(self, account_client: AquareaAccountClient) -> None:
+        """Release a reference to a client, scheduling its eviction if unused."""
+        account_client.references -= 1
+        if account_client.references:
+            return
+
+        for account, registered in self._clients.items():
+            if registered is account_client:
+                self._async_schedule_eviction(account, account_client)
+                return
+
+        # Replaced by a client with new credentials while in use
+        self._async_close(account_client)
+
+    @callback
+    def async_discard(self, account_client: AquareaAccountClient) -> None:
+        """Drop the state of a client that failed to authenticate."""
+        account_client.logged_in = False
+        account_client.device_infos = None
+        account_client.devices.clear()
+
+    @callback
+    def _async_replace(
+        self, account: str, account_client: AquareaAccountClient
+    ) -> None:
+        if (previous := self._clients.get(account)) is not None:
+            if previous.cancel_eviction is not None:
+                previous.cancel_eviction()
+                previous.cancel_eviction = None
+            if not previous.references:
+                self._async_close(previous)
+        self._clients[account] = account_client
+
+    @callback
+    def _async_close(self, account_client: AquareaAccountClient) -> None:
+        """Detach the session of a client that is not used anymore.
+
+        The session shares the connector of Home Assistant, closing it would
+        close the connections of every integration.
+        """
+        if not account_client.session.closed:
+            account_client.session.detach()
+
+    @callback
+    def _async_schedule_eviction(
+        self, account: str, account_client: AquareaAccountClient
+    ) -> None:
+        @callback
+        def _async_evict(_: Any) -> None:
+            account_client.cancel_eviction = None
+            if (
+                self._clients.get(account) is account_client
+                and not account_client.references
+            ):
+                _LOGGER.debug("Evicting the unused client of %s", account)
+                del self._clients[account]
+                self._async_close(account_client)
+
+        if account_client.cancel_eviction is not None:
+            account_client.cancel_eviction()
+        account_client.cancel_eviction = async_call_later(
+            self._hass, CLIENT_EVICTION_DELAY, _async_evict
+        )
+
+    @callback
+    def _async_stop(self, _: Event) -> None:
+        """Cancel the pending evictions and detach the sessions on stop."""
+        for account_client in self._clients.values():
+            if account_client.cancel_eviction is not None:
+                account_client.cancel_eviction()
+                account_client.cancel_eviction = None
+            self._async_close(account_client)
+        self._clients.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the registered clients."""
+        return {
+            account: account_client.as_dict()
+            for account, account_client in self._clients.items()
+        }
+
+
+@callback
+def async_get_client_registry(hass: HomeAssistant) -> AquareaClientRegistry:
+    """Return the client registry of the integration."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (registry := domain_data.get(CLIENTS)) is None:
+        registry = domain_data[CLIENTS] = AquareaClientRegistry(hass)
+    return registry
@@ -1,7 +1,10 @@
 """Climate entity to control a zone for a Panasonic Aquarea Device."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
 import logging
+from operator import attrgetter
 
 from aioaquarea import (
     DeviceAction,
@@ -26,9 +29,11 @@ from homeassistant.const import ATTR_TEMPERATURE, PRECISION_WHOLE, UnitOfTempera
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import AquareaBaseEntity
-from .const import DEVICES, DOMAIN
+from .const import DEVICES, DOMAIN, MEASUREMENT_ZONE_TEMPERATURE
 from .coordinator import AquareaDataUpdateCoordinator
+from .entity import AquareaBaseEntity
+from .publish import MeasurementPublisher
+from .snapshot import ZoneSnapshot, zone_field
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -56,7 +61,7 @@ async def async_setup_entry(
         [
             HeatPumpClimate(coordinator, zone_id)
             for coordinator in data.values()
-            for zone_id in coordinator.device.zones
+            for zone_id in coordinator.data.zone_ids
         ]
     )
 
@@ -105,6 +110,75 @@ def get_update_operation_mode_from_hvac_mode(mode: HVACMode) -> UpdateOperationM
     return UpdateOperationMode.OFF
 
 
+HVAC_MODE_LOOKUP: dict[tuple[ExtendedOperationMode, OperationStatus], HVACMode] = {
+    (mode, status): get_hvac_mode_from_ext_op_mode(mode, status)
+    for mode in ExtendedOperationMode
+    for status in OperationStatus
+}
+
+HVAC_ACTION_LOOKUP: dict[DeviceAction, HVACAction] = {
+    action: get_hvac_action_from_ext_action(action) for action in DeviceAction
+}
+
+ICON_LOOKUP: dict[ExtendedOperationMode, str] = {
+    mode: "mdi:hvac-off" if mode == ExtendedOperationMode.OFF else "mdi:hvac"
+    for mode in ExtendedOperationMode
+}
+
+COOLING_MODES = (ExtendedOperationMode.COOL, ExtendedOperationMode.AUTO_COOL)
+
+TARGET_TEMPERATURE_LOOKUP: dict[
+    ExtendedOperationMode, Callable[[ZoneSnapshot], int | None]
+] = {
+    mode: attrgetter(
+        "cool_target_temperature"
+        if mode in COOLING_MODES
+        else "heat_target_temperature"
+    )
+    for mode in ExtendedOperationMode
+    if mode != ExtendedOperationMode.OFF
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ZoneCapabilities:
+    """Capabilities and temperature limits of a zone, per device mode."""
+
+    hvac_modes: tuple[HVACMode, ...]
+    limits: dict[ExtendedOperationMode, tuple[int | None, int | None]]
+
+    @staticmethod
+    def key(zone: ZoneSnapshot) -> tuple:
+        """Return the fields of the zone the capabilities are computed from."""
+        return (
+            zone.cool_mode,
+            zone.supports_set_temperature,
+            zone.heat_min,
+            zone.heat_max,
+            zone.cool_min,
+            zone.cool_max,
+        )
+
+    @classmethod
+    def from_zone(cls, zone: ZoneSnapshot) -> ZoneCapabilities:
+        """Compute the capabilities of the zone."""
+        hvac_modes = (HVACMode.HEAT, HVACMode.OFF)
+        if zone.cool_mode:
+            hvac_modes += (HVACMode.COOL, HVACMode.HEAT_COOL)
+
+        # Modes missing from limits don't allow to set the temperature
+        limits: dict[ExtendedOperationMode, tuple[int | None, int | None]] = {}
+        if zone.supports_set_temperature:
+            limits = {
+                mode: (zone.cool_min, zone.cool_max)
+                if mode in COOLING_MODES
+                else (zone.heat_min, zone.heat_max)
+                for mode in TARGET_TEMPERATURE_LOOKUP
+            }
+
+        return cls(hvac_modes, limits)
+
+
 class HeatPumpClimate(AquareaBaseEntity, ClimateEntity):
     """The ClimateEntity that controls one zone of the Aquarea heat pump.
 
@@ -118,11 +192,12 @@ class HeatPumpClimate(AquareaBaseEntity, ClimateEntity):
         """Initialize the climate entity."""
         super().__init__(coordinator)
 
-        device = coordinator.device
+        snapshot = coordinator.data
 
         self._zone_id = zone_id
+        self._zone_index = snapshot.zone_index(zone_id)
         self._attr_temperature_unit = UnitOfTemperature.CELSIUS
-        self._attr_name = device.zones.get(zone_id).name
+        self._attr_name = snapshot.zones[self._zone_index].name
         self._attr_unique_id = f"{super().unique_id}_climate_{zone_id}"
 
         self._attr_supported_features = (
@@ -131,69 +206,61 @@ class HeatPumpClimate(AquareaBaseEntity, ClimateEntity):
             | ClimateEntityFeature.TURN_OFF
         )
 
-        if device.support_special_status:
+        if snapshot.support_special_status:
             self._attr_supported_features |= ClimateEntityFeature.PRESET_MODE
             self._attr_preset_modes = list(SPECIAL_STATUS_LOOKUP.keys())
             self._attr_preset_mode = SPECIAL_STATUS_REVERSE_LOOKUP.get(
-                device.special_status
+                snapshot.special_status
             )
 
         self._attr_precision = PRECISION_WHOLE
-        self._attr_hvac_modes = [HVACMode.HEAT, HVACMode.OFF]
+        self._current_temperature = MeasurementPublisher(
+            coordinator.publish_policies[MEASUREMENT_ZONE_TEMPERATURE]
+        )
+        self._freshness_field = zone_field(zone_id, "temperature")
+        self._update_capabilities(snapshot.zones[self._zone_index])
 
-        if device.support_cooling(zone_id):
-            self._attr_hvac_modes.extend([HVACMode.COOL, HVACMode.HEAT_COOL])
+    def _update_capabilities(self, zone: ZoneSnapshot) -> None:
+        """Compute the capabilities of the zone."""
+        self._capabilities_key = ZoneCapabilities.key(zone)
+        self._capabilities = ZoneCapabilities.from_zone(zone)
+        self._attr_hvac_modes = list(self._capabilities.hvac_modes)
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
 
-        device = self.coordinator.device
-        zone = device.zones.get(self._zone_id)
+        snapshot = self.coordinator.data
+        zone = snapshot.zones[self._zone_index]
+        mode = snapshot.mode
 
-        self._attr_hvac_mode = get_hvac_mode_from_ext_op_mode(
-            device.mode, zone.operation_status
-        )
-        self._attr_hvac_action = get_hvac_action_from_ext_action(device.current_action)
-        self._attr_icon = (
-            "mdi:hvac-off" if device.mode == ExtendedOperationMode.OFF else "mdi:hvac"
-        )
+        if ZoneCapabilities.key(zone) != self._capabilities_key:
+            self._update_capabilities(zone)
 
-        self._attr_current_temperature = zone.temperature
+        self._attr_hvac_mode = HVAC_MODE_LOOKUP[(mode, zone.operation_status)]
+        self._attr_hvac_action = HVAC_ACTION_LOOKUP[snapshot.current_action]
+        self._attr_icon = ICON_LOOKUP[mode]
+        current_temperature = self._current_temperature.publish(zone.temperature)
+        if current_temperature != self._attr_current_temperature:
+            self._attr_current_temperature = current_temperature
+            self._update_last_changed()
+        # A heartbeat writes the unchanged temperature to the recorder again
+        self._attr_force_update = self._current_temperature.heartbeat
 
-        if device.support_special_status:
+        if snapshot.support_special_status:
             self._attr_preset_mode = SPECIAL_STATUS_REVERSE_LOOKUP.get(
-                device.special_status
+                snapshot.special_status
             )
 
-        # If the device doesn't allow to set the temperature directly
-        # We set the max and min to the current temperature.
-        # This is a workaround to make the UI work.
-        self._attr_max_temp = zone.temperature
-        self._attr_min_temp = zone.temperature
-
-        if zone.supports_set_temperature and device.mode != ExtendedOperationMode.OFF:
-            self._attr_max_temp = (
-                zone.cool_max
-                if device.mode
-                in (ExtendedOperationMode.COOL, ExtendedOperationMode.AUTO_COOL)
-                else zone.heat_max
-            )
-            self._attr_min_temp = (
-                zone.cool_min
-                if device.mode
-                in (ExtendedOperationMode.COOL, ExtendedOperationMode.AUTO_COOL)
-                else zone.heat_min
-            )
-            self._attr_target_temperature = (
-                zone.cool_target_temperature
-                if device.mode
-                in (
-                    ExtendedOperationMode.COOL,
-                    ExtendedOperationMode.AUTO_COOL,
-                )
-                else zone.heat_target_temperature
-            )
+        if (limits := self._capabilities.limits.get(mode)) is None:
+            # If the device doesn't allow to set the temperature directly
+            # We set the max and min to the current temperature.
+            # This is a workaround to make the UI work.
+            self._attr_max_temp = zone.temperature
+            self._attr_min_temp = zone.temperature
+        else:
+            self._attr_min_temp, self._attr_max_temp = limits
+            self._attr_target_temperature = TARGET_TEMPERATURE_LOOKUP[mode](zone)
             self._attr_target_temperature_step = 1
 
         super()._handle_coordinator_update()
@@ -209,13 +276,15 @@ class HeatPumpClimate(AquareaBaseEntity, ClimateEntity):
             hvac_mode,
         )
 
-        await self.coordinator.device.set_mode(
-            get_update_operation_mode_from_hvac_mode(hvac_mode), self._zone_id
+        await self.coordinator.async_execute(
+            self.coordinator.device.set_mode,
+            get_update_operation_mode_from_hvac_mode(hvac_mode),
+            self._zone_id,
         )
 
     async def async_set_temperature(self, **kwargs) -> None:
         """Set new target temperature if supported by the zone."""
-        zone = self.coordinator.device.zones.get(self._zone_id)
+        zone = self.coordinator.data.zones[self._zone_index]
         temperature: float | None = kwargs.get(ATTR_TEMPERATURE)
         hvac_mode: HVACMode | None = kwargs.get(ATTR_HVAC_MODE)
 
@@ -230,8 +299,10 @@ class HeatPumpClimate(AquareaBaseEntity, ClimateEntity):
                 str(temperature),
             )
 
-            await self.coordinator.device.set_temperature(
-                int(temperature), zone.zone_id
+            await self.coordinator.async_execute(
+                self.coordinator.device.set_temperature,
+                int(temperature),
+                zone.zone_id,
             )
 
     async def async_set_preset_mode(self, preset_mode):
@@ -245,8 +316,9 @@ class HeatPumpClimate(AquareaBaseEntity, ClimateEntity):
             preset_mode,
         )
 
-        await self.coordinator.device.set_special_status(
-            SPECIAL_STATUS_LOOKUP[preset_mode]
+        await self.coordinator.async_execute(
+            self.coordinator.device.set_special_status,
+            SPECIAL_STATUS_LOOKUP[preset_mode],
         )
 
     async def async_turn_on(self) -> None:
@@ -256,7 +328,7 @@ class HeatPumpClimate(AquareaBaseEntity, ClimateEntity):
             self.coordinator.device.device_id,
         )
 
-        await self.coordinator.device.turn_on()
+        await self.coordinator.async_execute(self.coordinator.device.turn_on)
 
     async def async_turn_off(self) -> None:
         """Turn the entity off."""
@@ -265,4 +337,4 @@ class HeatPumpClimate(AquareaBaseEntity, ClimateEntity):
             self.coordinator.device.device_id,
         )
 
-        await self.coordinator.device.turn_off()
+        await self.coordinator.async_execute(self.coordinator.device.turn_off)
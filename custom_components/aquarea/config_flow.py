@@ -11,11 +11,29 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
-from .const import DOMAIN
+from .clients import async_get_client_registry
+from .const import (
+    CONF_HEATING_BASE_TEMPERATURE,
+    CONF_LOOP_LAG_THRESHOLD,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_PROFILING,
+    CONF_STALENESS_THRESHOLD,
+    CONF_TRACE,
+    DEFAULT_DEADBAND,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_HEATING_BASE_TEMPERATURE,
+    DEFAULT_LOOP_LAG_THRESHOLD,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MIN_PUBLISH_INTERVAL,
+    DEFAULT_STALENESS_THRESHOLD,
+    DOMAIN,
+    PUBLISH_OPTIONS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,6 +55,14 @@ class AquareaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.info = {}
         self._api: aioaquarea.Client = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> AquareaOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return AquareaOptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -58,6 +84,10 @@ class AquareaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
             )
 
+        # The setup of the entry reuses the client that just logged in
+        async_get_client_registry(self.hass).async_adopt(
+            user_input[CONF_USERNAME], user_input[CONF_PASSWORD], self._session, self._api
+        )
         return self.async_create_entry(title=user_input[CONF_USERNAME], data=user_input)
 
     async def async_step_reauth(self, entry_data: Mapping[str, Any], user_input=None):
@@ -94,6 +124,11 @@ class AquareaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Complete reauth."""
         entry = await self.async_set_unique_id(self.unique_id)
         assert entry
+        # Hand the client that just logged in to the entry, so the reload
+        # triggered by the new credentials doesn't log in again
+        async_get_client_registry(self.hass).async_adopt(
+            username, password, self._session, self._api
+        )
         self.hass.config_entries.async_update_entry(
             entry,
             data={
@@ -151,6 +186,86 @@ class AquareaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return errors
 
 
+def _publish_schema(options: Mapping[str, Any]) -> dict[vol.Optional, Any]:
+    """Return the publish options of every class of measurements."""
+    schema: dict[vol.Optional, Any] = {}
+    for deadband, min_interval, heartbeat in PUBLISH_OPTIONS.values():
+        schema[
+            vol.Optional(deadband, default=options.get(deadband, DEFAULT_DEADBAND))
+        ] = vol.All(vol.Coerce(float), vol.Range(min=0, max=10))
+        schema[
+            vol.Optional(
+                min_interval,
+                default=options.get(min_interval, DEFAULT_MIN_PUBLISH_INTERVAL),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=3600))
+        schema[
+            vol.Optional(
+                heartbeat, default=options.get(heartbeat, DEFAULT_HEARTBEAT_INTERVAL)
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=1440))
+    return schema
+
+
+class AquareaOptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the options of Aquarea Smart Cloud."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_MAX_CONCURRENT_REQUESTS,
+                        default=options.get(
+                            CONF_MAX_CONCURRENT_REQUESTS,
+                            DEFAULT_MAX_CONCURRENT_REQUESTS,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                    vol.Optional(
+                        CONF_PROFILING,
+                        default=options.get(CONF_PROFILING, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_TRACE,
+                        default=options.get(CONF_TRACE, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_LOOP_LAG_THRESHOLD,
+                        default=options.get(
+                            CONF_LOOP_LAG_THRESHOLD, DEFAULT_LOOP_LAG_THRESHOLD
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=10000)),
+                    **_publish_schema(options),
+                    vol.Optional(
+                        CONF_STALENESS_THRESHOLD,
+                        default=options.get(
+                            CONF_STALENESS_THRESHOLD, DEFAULT_STALENESS_THRESHOLD
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1440)),
+                    vol.Optional(
+                        CONF_HEATING_BASE_TEMPERATURE,
+                        default=options.get(
+                            CONF_HEATING_BASE_TEMPERATURE,
+                            DEFAULT_HEATING_BASE_TEMPERATURE,
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=30)),
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
@@ -3,8 +3,65 @@
 DOMAIN = "aquarea"
 DEVICES = "devices"
 CLIENT = "client"
+LOADED_PLATFORMS = "loaded_platforms"
+RELOAD_SCHEDULED = "reload_scheduled"
+PROFILER = "profiler"
+PROFILES = "profiles"
+LIMITERS = "limiters"
+CLIENTS = "clients"
+WATCHDOG = "watchdog"
+PUBLISH_POLICIES = "publish_policies"
+METRICS = "metrics"
+TRACER = "tracer"
+LIFECYCLE = "lifecycle"
+PROGRAMS = "programs"
+SCHEDULER = "scheduler"
+
+# Dispatched with the coordinator of a device once its entry is loaded / unloaded
+SIGNAL_DEVICE_LOADED = f"{DOMAIN}_device_loaded"
+SIGNAL_DEVICE_UNLOADED = f"{DOMAIN}_device_unloaded"
+
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 2
+CONF_PROFILING = "profiling"
+CONF_TRACE = "trace"
+CONF_LOOP_LAG_THRESHOLD = "loop_lag_threshold"
+DEFAULT_LOOP_LAG_THRESHOLD = 0
+MEASUREMENT_OUTDOOR_TEMPERATURE = "outdoor_temperature"
+MEASUREMENT_ZONE_TEMPERATURE = "zone_temperature"
+CONF_OUTDOOR_TEMPERATURE_DEADBAND = "outdoor_temperature_deadband"
+CONF_OUTDOOR_TEMPERATURE_MIN_PUBLISH_INTERVAL = (
+    "outdoor_temperature_min_publish_interval"
+)
+CONF_OUTDOOR_TEMPERATURE_HEARTBEAT_INTERVAL = "outdoor_temperature_heartbeat_interval"
+CONF_ZONE_TEMPERATURE_DEADBAND = "zone_temperature_deadband"
+CONF_ZONE_TEMPERATURE_MIN_PUBLISH_INTERVAL = "zone_temperature_min_publish_interval"
+CONF_ZONE_TEMPERATURE_HEARTBEAT_INTERVAL = "zone_temperature_heartbeat_interval"
+DEFAULT_DEADBAND = 0.0
+DEFAULT_MIN_PUBLISH_INTERVAL = 0
+DEFAULT_HEARTBEAT_INTERVAL = 0
+# Deadband, minimum publish interval and heartbeat options of each measurement
+PUBLISH_OPTIONS: dict[str, tuple[str, str, str]] = {
+    MEASUREMENT_OUTDOOR_TEMPERATURE: (
+        CONF_OUTDOOR_TEMPERATURE_DEADBAND,
+        CONF_OUTDOOR_TEMPERATURE_MIN_PUBLISH_INTERVAL,
+        CONF_OUTDOOR_TEMPERATURE_HEARTBEAT_INTERVAL,
+    ),
+    MEASUREMENT_ZONE_TEMPERATURE: (
+        CONF_ZONE_TEMPERATURE_DEADBAND,
+        CONF_ZONE_TEMPERATURE_MIN_PUBLISH_INTERVAL,
+        CONF_ZONE_TEMPERATURE_HEARTBEAT_INTERVAL,
+    ),
+}
+CONF_STALENESS_THRESHOLD = "staleness_threshold"
+DEFAULT_STALENESS_THRESHOLD = 0
+CONF_HEATING_BASE_TEMPERATURE = "heating_base_temperature"
+DEFAULT_HEATING_BASE_TEMPERATURE = 15.5
 
 ATTRIBUTION = "Data provided by Aquarea Smart Cloud"
 
+ATTR_ERROR_CODE = "error_code"
+ATTR_ERROR_MESSAGE = "error_message"
+
 IDLE = "idle"
 HEATING = "heating"
@@ -0,0 +1,73 @@
+"""Bounded cache for the hourly consumption of an Aquarea device."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import UTC, datetime
+from typing import Any
+
+from aioaquarea import ConsumptionType
+
+DEFAULT_CONSUMPTION_CACHE_DAYS = 7
+
+
+class ConsumptionCache:
+    """LRU cache of finalized hourly consumption values of a device.
+
+    The cache is bounded to a number of days worth of hours for every
+    consumption type. The least recently used hours are evicted first. Hours
+    are keyed in UTC, the repeated hour of a fall back is ambiguous locally.
+    """
+
+    def __init__(self, max_days: int = DEFAULT_CONSUMPTION_CACHE_DAYS) -> None:
+        """Initialize the cache."""
+        self._max_size = max_days * 24 * len(ConsumptionType)
+        self._values: OrderedDict[tuple[datetime, ConsumptionType], float] = (
+            OrderedDict()
+        )
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def hits(self) -> int:
+        """Return the number of lookups served from the cache."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Return the number of lookups not found in the cache."""
+        return self._misses
+
+    def get(self, hour: datetime, consumption_type: ConsumptionType) -> float | None:
+        """Return the cached consumption of the hour, None if not cached."""
+        key = (hour.astimezone(UTC), consumption_type)
+
+        if (value := self._values.get(key)) is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._values.move_to_end(key)
+        return value
+
+    def put(
+        self, hour: datetime, consumption_type: ConsumptionType, value: float
+    ) -> None:
+        """Store the consumption of a finalized hour."""
+        key = (hour.astimezone(UTC), consumption_type)
+        self._values[key] = value
+        self._values.move_to_end(key)
+
+        while len(self._values) > self._max_size:
+            self._values.popitem(last=False)
+            self._evictions += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cache metrics."""
+        return {
+            "size": len(self._values),
+            "max_size": self._max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+        }
@@ -1,28 +1,76 @@
 """Coordinator for Aquarea."""
 from __future__ import annotations
 
-from datetime import timedelta
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime, timedelta
 import logging
+import random
+import time
+from typing import Any, ParamSpec, TypeVar
+import zlib
 
 import aioaquarea
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import (
+    CONF_HEATING_BASE_TEMPERATURE,
+    CONF_STALENESS_THRESHOLD,
+    DEFAULT_HEATING_BASE_TEMPERATURE,
+    DEFAULT_STALENESS_THRESHOLD,
+    DOMAIN,
+)
+from .consumption import ConsumptionCache
+from .defrost import DefrostTracker
+from .efficiency import HeatingEfficiency
+from .energy import day_hours, is_repeated_hour, reported_consumption
+from .lifecycle import AquareaEntryLifecycle
+from .limiter import AquareaRequestLimiter
+from .metrics import (
+    METRIC_POLL_DURATION,
+    METRIC_POLL_FAILURES,
+    METRIC_POLLS,
+    METRIC_REFRESHES_COALESCED,
+    METRIC_REQUEST_DURATION,
+    METRIC_REQUEST_FAILURES,
+    METRIC_REQUESTS,
+    AquareaMetrics,
+)
+from .profiler import AquareaProfiler
+from .publish import PublishPolicy
+from .snapshot import DeviceSnapshot, SnapshotFreshness
+from .trace import (
+    EVENT_API_CALL,
+    EVENT_COMMAND,
+    EVENT_REFRESH_END,
+    EVENT_REFRESH_START,
+    AquareaTracer,
+)
+from .watchdog import AquareaLoopWatchdog
 
 DEFAULT_SCAN_INTERVAL_SECONDS = 10
 SCAN_INTERVAL = timedelta(seconds=DEFAULT_SCAN_INTERVAL_SECONDS)
 CONSUMPTION_REFRESH_INTERVAL_MINUTES = 1
 CONSUMPTION_REFRESH_INTERVAL = timedelta(minutes=CONSUMPTION_REFRESH_INTERVAL_MINUTES)
+# Hours older than this are not updated by the cloud anymore and can be cached
+CONSUMPTION_FINALIZED_DELAY = timedelta(hours=2)
+# Random jitter added to the poll phase of each device
+POLL_PHASE_JITTER_SECONDS = 0.5
+# Refreshes requested this soon after a successful one are served from it
+REFRESH_FRESHNESS_WINDOW_SECONDS = 2
 _LOGGER = logging.getLogger(__name__)
 
+_P = ParamSpec("_P")
+_T = TypeVar("_T")
 
-class AquareaDataUpdateCoordinator(DataUpdateCoordinator):
+
+class AquareaDataUpdateCoordinator(DataUpdateCoordinator[DeviceSnapshot]):
     """Class to manage fetching Aquarea data."""
 
     _device: aioaquarea.Device
@@ -33,13 +81,57 @@ class AquareaDataUpdateCoordinator(DataUpdateCoordinator):
         entry: ConfigEntry,
         client: aioaquarea.Client,
         device_info: aioaquarea.data.DeviceInfo,
+        device: aioaquarea.Device | None,
+        limiter: AquareaRequestLimiter,
+        profiler: AquareaProfiler,
+        watchdog: AquareaLoopWatchdog,
+        publish_policies: dict[str, PublishPolicy],
+        metrics: AquareaMetrics,
+        tracer: AquareaTracer,
+        lifecycle: AquareaEntryLifecycle,
     ) -> None:
         """Initialize a data updater per Device."""
 
         self._client = client
         self._entry = entry
         self._device_info = device_info
-        self._device = None
+        self._limiter = limiter
+        self._profiler = profiler
+        self._watchdog = watchdog
+        self._publish_policies = publish_policies
+        self._metrics = metrics
+        self._tracer = tracer
+        self._lifecycle = lifecycle
+        # Commands sent to the device, a refresh started before the last
+        # command can't be reused as its state may be outdated
+        self._commands = 0
+        self._refresh_task: asyncio.Task[DeviceSnapshot] | None = None
+        self._refresh_commands = 0
+        self._fresh_commands = 0
+        self._fresh_until = 0.0
+        self._metric_labels = {"device": device_info.device_id}
+        # Device kept from a previous setup, it only needs a refresh
+        self._device = device
+        self._consumption_cache = ConsumptionCache()
+        self._current_error: aioaquarea.data.FaultError | None = None
+        self._defrost = DefrostTracker()
+        self._efficiency = HeatingEfficiency(
+            entry.options.get(
+                CONF_HEATING_BASE_TEMPERATURE, DEFAULT_HEATING_BASE_TEMPERATURE
+            )
+        )
+        staleness_threshold = entry.options.get(
+            CONF_STALENESS_THRESHOLD, DEFAULT_STALENESS_THRESHOLD
+        )
+        self._freshness = SnapshotFreshness(
+            timedelta(minutes=staleness_threshold) if staleness_threshold else None
+        )
+        # Spread the polls of the devices across the scan interval
+        phase = zlib.crc32(device_info.device_id.encode()) / 2**32
+        self._poll_phase = (
+            phase * DEFAULT_SCAN_INTERVAL_SECONDS
+            + random.uniform(0, POLL_PHASE_JITTER_SECONDS)
+        ) % DEFAULT_SCAN_INTERVAL_SECONDS
 
         super().__init__(
             hass,
@@ -53,25 +145,315 @@ class AquareaDataUpdateCoordinator(DataUpdateCoordinator):
         """Return the device."""
         return self._device
 
-    async def _async_update_data(self) -> None:
+    @property
+    def limiter(self) -> AquareaRequestLimiter:
+        """Return the limiter of the requests sent for the account."""
+        return self._limiter
+
+    @property
+    def lifecycle(self) -> AquareaEntryLifecycle:
+        """Return the lifecycle of the config entry of the device."""
+        return self._lifecycle
+
+    async def async_execute(
+        self,
+        func: Callable[_P, Awaitable[_T]],
+        *args: _P.args,
+        **kwargs: _P.kwargs,
+    ) -> _T:
+        """Send a command to Aquarea Smart Cloud through the account limiter."""
+        self._commands += 1
+        self._tracer.record(
+            EVENT_COMMAND,
+            self._device_info.device_id,
+            operation=getattr(func, "__name__", "request"),
+        )
+        return await self._async_request(func, *args, **kwargs)
+
+    async def _async_request(
+        self,
+        func: Callable[_P, Awaitable[_T]],
+        *args: _P.args,
+        **kwargs: _P.kwargs,
+    ) -> _T:
+        """Send a request to Aquarea Smart Cloud through the account limiter."""
+        operation = getattr(func, "__name__", "request")
+        labels = {**self._metric_labels, "operation": operation}
+        self._metrics.inc(METRIC_REQUESTS, labels)
+        start = time.monotonic()
+        error: str | None = None
+        try:
+            return await self._limiter.run(func, *args, **kwargs)
+        except Exception as err:
+            error = type(err).__name__
+            self._metrics.inc(METRIC_REQUEST_FAILURES, labels)
+            raise
+        finally:
+            duration = time.monotonic() - start
+            self._metrics.observe(METRIC_REQUEST_DURATION, labels, duration)
+            self._tracer.record(
+                EVENT_API_CALL,
+                self._device_info.device_id,
+                operation=operation,
+                duration=round(duration, 3),
+                error=error,
+            )
+
+    @property
+    def tracer(self) -> AquareaTracer:
+        """Return the trace of the refresh cycles."""
+        return self._tracer
+
+    @property
+    def profiler(self) -> AquareaProfiler:
+        """Return the profiler of the entity update handlers."""
+        return self._profiler
+
+    @property
+    def watchdog(self) -> AquareaLoopWatchdog:
+        """Return the event loop lag watchdog of the config entry."""
+        return self._watchdog
+
+    @property
+    def publish_policies(self) -> dict[str, PublishPolicy]:
+        """Return the publish policy of each class of measurements."""
+        return self._publish_policies
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, timing the listener when profiling."""
+        if self._profiler.enabled:
+            update_callback = self._profiler.wrap(update_callback)
+        if self._watchdog.enabled:
+            update_callback = self._watchdog.wrap(
+                self._device_info.device_id, update_callback
+            )
+
+        return super().async_add_listener(update_callback, context)
+
+    @property
+    def consumption_cache(self) -> ConsumptionCache:
+        """Return the cache of finalized hourly consumption."""
+        return self._consumption_cache
+
+    @property
+    def current_error(self) -> aioaquarea.data.FaultError | None:
+        """Return the error of the device, None if it isn't on error."""
+        return self._current_error
+
+    @property
+    def defrost(self) -> DefrostTracker:
+        """Return the defrost cycles of the device."""
+        return self._defrost
+
+    @property
+    def efficiency(self) -> HeatingEfficiency:
+        """Return the heating degree-hours and efficiency of the device."""
+        return self._efficiency
+
+    @property
+    def freshness(self) -> SnapshotFreshness:
+        """Return when each field of the device snapshots changed."""
+        return self._freshness
+
+    def get_consumption(
+        self, date: datetime, consumption_type: aioaquarea.ConsumptionType
+    ) -> float | None:
+        """Return the consumption of the hour or schedule its retrieval.
+
+        Finalized hours are served from the consumption cache. Raises
+        DataNotAvailableError when the data is not yet available.
+        """
+        hour = date.replace(minute=0, second=0, microsecond=0)
+        # The device reports it with the first hour of the fall back
+        if is_repeated_hour(hour):
+            return 0.0
+        finalized = hour + CONSUMPTION_FINALIZED_DELAY <= dt_util.now()
+
+        if finalized and (
+            value := self._consumption_cache.get(hour, consumption_type)
+        ) is not None:
+            return value
+
+        value = self.device.get_or_schedule_consumption(hour, consumption_type)
+
+        if finalized and value is not None:
+            self._consumption_cache.put(hour, consumption_type, value)
+
+        return value
+
+    async def async_fetch_consumption(
+        self, day: date
+    ) -> dict[aioaquarea.ConsumptionType, list[float | None]]:
+        """Fetch the hourly consumption of a day, caching the finalized hours.
+
+        Return the consumption of every hour of the local day, in order.
+        """
+        consumption = await self._async_request(
+            self._client.get_device_consumption,
+            self._device_info.long_id,
+            aioaquarea.DateType.DAY,
+            day.strftime("%Y-%m-%d"),
+        )
+
+        energy: dict[aioaquarea.ConsumptionType, list[float | None]] = {}
+        hours = day_hours(day, dt_util.DEFAULT_TIME_ZONE)
+        # Compared in UTC, the repeated hour of a fall back is ambiguous locally
+        finalized_until = dt_util.utcnow() - CONSUMPTION_FINALIZED_DELAY
+        for consumption_type in aioaquarea.ConsumptionType:
+            values = (consumption.energy or {}).get(consumption_type) or []
+            energy[consumption_type] = [
+                reported_consumption(values, hour) for hour in hours
+            ]
+            for hour, value in zip(hours, energy[consumption_type]):
+                if value is not None and hour <= finalized_until:
+                    self._consumption_cache.put(hour, consumption_type, value)
+
+        return energy
+
+    def _finalized_heating_consumption(self, hour: datetime) -> float | None:
+        """Return the heating consumption of the hour once it is finalized."""
+        if hour + CONSUMPTION_FINALIZED_DELAY > dt_util.now():
+            return None
+        try:
+            return self.get_consumption(hour, aioaquarea.ConsumptionType.HEAT)
+        except aioaquarea.DataNotAvailableError:
+            return None
+
+    async def async_config_entry_first_refresh(self) -> None:
+        """Refresh the device for the first time and move its polls to its phase.
+
+        DataUpdateCoordinator schedules each poll an interval after the second
+        the last refresh ended, so the first poll is scheduled on the phase
+        and the next ones stay there.
+        """
+        await super().async_config_entry_first_refresh()
+
+        interval = int(SCAN_INTERVAL.total_seconds())
+        delay = (int(self._poll_phase) - int(self.hass.loop.time()) - 1) % interval
+        self.update_interval = timedelta(seconds=delay + 1)
+
+    async def _async_refresh(
+        self,
+        log_failures: bool = True,
+        raise_on_auth_failed: bool = False,
+        scheduled: bool = False,
+        raise_on_entry_error: bool = False,
+    ) -> None:
+        """Refresh the device, probing the event loop until the listeners ran."""
+        # The polls after the first are an interval apart
+        self.update_interval = SCAN_INTERVAL
+        device_id = self._device_info.device_id
+        self._watchdog.async_start_cycle(device_id)
+        try:
+            await super()._async_refresh(
+                log_failures, raise_on_auth_failed, scheduled, raise_on_entry_error
+            )
+        finally:
+            self._watchdog.async_end_cycle(device_id)
+
+    async def _async_update_data(self) -> DeviceSnapshot:
+        """Fetch data, reusing the refresh in flight or one that just finished."""
+        if self._refresh_task is not None and self._refresh_commands == self._commands:
+            self._metrics.inc(
+                METRIC_REFRESHES_COALESCED, {**self._metric_labels, "reason": "joined"}
+            )
+            return await asyncio.shield(self._refresh_task)
+
+        if (
+            self.data is not None
+            and self._fresh_commands == self._commands
+            and self.hass.loop.time() < self._fresh_until
+        ):
+            self._metrics.inc(
+                METRIC_REFRESHES_COALESCED, {**self._metric_labels, "reason": "fresh"}
+            )
+            return self.data
+
+        if self._lifecycle.is_shutdown:
+            raise UpdateFailed("The config entry is unloading")
+
+        self._refresh_commands = self._commands
+        task = self._refresh_task = self._lifecycle.async_create_task(
+            self._async_fetch_data(self._commands), f"refresh {self.name}"
+        )
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._refresh_task is task:
+                self._refresh_task = None
+
+    async def _async_fetch_data(self, commands: int) -> DeviceSnapshot:
         """Fetch data from Aquarea Smart Cloud Service."""
+        device_id = self._device_info.device_id
+        self._metrics.inc(METRIC_POLLS, self._metric_labels)
+        self._tracer.record(EVENT_REFRESH_START, device_id)
+        start = time.monotonic()
+        success = False
         try:
             # We are not getting consumption data on the first refresh, we'll get it on the next ones
             if not self._device:
-                self._device = await self._client.get_device(
+                self._device = await self._async_request(
+                    self._client.get_device,
                     device_info=self._device_info,
                     consumption_refresh_interval=CONSUMPTION_REFRESH_INTERVAL,
                     timezone=dt_util.DEFAULT_TIME_ZONE,
                 )
             else:
-                await self.device.refresh_data()
+                await self._async_request(self.device.refresh_data)
+            success = True
         except aioaquarea.AuthenticationError as err:
             if err.error_code in (
                 aioaquarea.AuthenticationErrorCodes.INVALID_USERNAME_OR_PASSWORD,
                 aioaquarea.AuthenticationErrorCodes.INVALID_CREDENTIALS,
             ):
                 raise ConfigEntryAuthFailed from err
+            # Other errors keep the last state, there is none before the device is loaded
+            if self._device is None:
+                self._metrics.inc(METRIC_POLL_FAILURES, self._metric_labels)
+                raise UpdateFailed(
+                    f"Error authenticating with Aquarea Smart Cloud API: {err}"
+                ) from err
         except aioaquarea.errors.RequestFailedError as err:
+            self._metrics.inc(METRIC_POLL_FAILURES, self._metric_labels)
             raise UpdateFailed(
                 f"Error communicating with Aquarea Smart Cloud API: {err}"
             ) from err
+        finally:
+            duration = time.monotonic() - start
+            self._metrics.observe(METRIC_POLL_DURATION, self._metric_labels, duration)
+            self._tracer.record(
+                EVENT_REFRESH_END,
+                device_id,
+                duration=round(duration, 3),
+                success=success,
+            )
+
+        self._fresh_commands = commands
+        self._fresh_until = self.hass.loop.time() + REFRESH_FRESHNESS_WINDOW_SECONDS
+
+        snapshot = DeviceSnapshot.from_device(self._device)
+        # Keep the previous snapshot when nothing changed
+        if snapshot == self.data:
+            snapshot = self.data
+        now = dt_util.utcnow()
+        self._freshness.update(snapshot, now)
+        self._defrost.update(
+            snapshot.device_mode_status is aioaquarea.DeviceModeStatus.DEFROST, now
+        )
+        self._efficiency.update(
+            snapshot.temperature_outdoor,
+            dt_util.as_local(now),
+            self._finalized_heating_consumption,
+        )
+
+        # The error details come with the status already fetched, so they are
+        # read on every refresh and follow a fault code changing while the
+        # device stays in error
+        self._current_error = (
+            self._device.current_error if snapshot.is_on_error else None
+        )
+
+        return snapshot
@@ -0,0 +1,95 @@
+"""Rolling window of the defrost cycles of a device."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+DEFROST_WINDOW = timedelta(hours=24)
+# Bound of the cycles kept, far above what a device does within the window
+MAX_DEFROST_CYCLES = 500
+
+
+@dataclass(frozen=True, slots=True)
+class DefrostCycle:
+    """A completed defrost cycle."""
+
+    start: datetime
+    end: datetime
+
+    @property
+    def duration(self) -> timedelta:
+        """Return the duration of the cycle."""
+        return self.end - self.start
+
+
+class DefrostTracker:
+    """Detect the defrost cycles from the snapshots of a device.
+
+    The completed cycles are kept for DEFROST_WINDOW with the sum of their
+    durations, so the statistics are updated in constant time.
+    """
+
+    def __init__(
+        self, window: timedelta = DEFROST_WINDOW, size: int = MAX_DEFROST_CYCLES
+    ) -> None:
+        """Initialize the tracker."""
+        self._window = window
+        self._cycles: deque[DefrostCycle] = deque()
+        self._size = size
+        self._total_duration = timedelta()
+        self._start: datetime | None = None
+        self._last_start: datetime | None = None
+
+    def update(self, defrosting: bool, now: datetime) -> None:
+        """Record the defrost state of a new snapshot."""
+        if defrosting and self._start is None:
+            self._start = self._last_start = now
+        elif not defrosting and self._start is not None:
+            self._append(DefrostCycle(self._start, now))
+            self._start = None
+
+        self._evict(now)
+
+    def _append(self, cycle: DefrostCycle) -> None:
+        if len(self._cycles) == self._size:
+            self._total_duration -= self._cycles.popleft().duration
+        self._cycles.append(cycle)
+        self._total_duration += cycle.duration
+
+    def _evict(self, now: datetime) -> None:
+        while self._cycles and now - self._cycles[0].end > self._window:
+            self._total_duration -= self._cycles.popleft().duration
+
+    @property
+    def defrosting(self) -> bool:
+        """Return True if the device is defrosting."""
+        return self._start is not None
+
+    @property
+    def count(self) -> int:
+        """Return the cycles completed within the window."""
+        return len(self._cycles)
+
+    @property
+    def average_duration(self) -> timedelta | None:
+        """Return the average duration of the cycles within the window."""
+        if not self._cycles:
+            return None
+        return self._total_duration / len(self._cycles)
+
+    @property
+    def last_start(self) -> datetime | None:
+        """Return when the last defrost started."""
+        return self._last_start
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cycles within the window."""
+        return {
+            "defrosting": self.defrosting,
+            "cycles": [
+                {"start": cycle.start.isoformat(), "end": cycle.end.isoformat()}
+                for cycle in self._cycles
+            ],
+        }
@@ -0,0 +1,59 @@
+"""Diagnostics support for Aquarea Smart Cloud."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CLIENT,
+    DEVICES,
+    DOMAIN,
+    LIFECYCLE,
+    LIMITERS,
+    PUBLISH_POLICIES,
+    SCHEDULER,
+    TRACER,
+    WATCHDOG,
+)
+from .coordinator import AquareaDataUpdateCoordinator
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, "title", "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    devices: dict[str, AquareaDataUpdateCoordinator] = data[DEVICES]
+
+    limiter = hass.data[DOMAIN][LIMITERS].get(entry.data[CONF_USERNAME].lower())
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "client": data[CLIENT].as_dict(),
+        "lifecycle": data[LIFECYCLE].as_dict(),
+        "limiter": limiter.as_dict() if limiter else None,
+        "loop_lag": data[WATCHDOG].as_dict(),
+        "publish_policies": {
+            measurement: policy.as_dict()
+            for measurement, policy in data[PUBLISH_POLICIES].items()
+        },
+        "programs": (
+            scheduler.as_dict() if (scheduler := data.get(SCHEDULER)) else None
+        ),
+        "trace": data[TRACER].as_dict(),
+        "devices": {
+            device_id: {
+                "consumption_cache": coordinator.consumption_cache.as_dict(),
+                "freshness": coordinator.freshness.as_dict(),
+                "defrost": coordinator.defrost.as_dict(),
+                "efficiency": coordinator.efficiency.as_dict(),
+            }
+            for device_id, coordinator in devices.items()
+        },
+    }
@@ -0,0 +1,179 @@
+"""Heating degree-hours and heating energy per degree-hour of a device."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from datetime import UTC, date, datetime, timedelta, tzinfo
+from typing import Any
+
+# Samples further apart than this are not integrated, the outdoor
+# temperature in between is unknown
+MAX_SAMPLE_GAP = timedelta(hours=1)
+# Completed hours waiting for their consumption to be finalized
+MAX_PENDING_HOURS = 48
+# Days kept in the daily accumulators
+MAX_DAYS = 2
+
+ONE_HOUR = timedelta(hours=1)
+
+
+class DegreeHourIntegrator:
+    """Integrate the heating degree-hours of the outdoor temperature.
+
+    The temperature of a sample is held until the next one, and the
+    integral is split at the hour boundaries. Time is kept in UTC, so the
+    hours around a DST change last an hour like the others.
+    """
+
+    def __init__(self, base_temperature: float) -> None:
+        """Initialize the integrator."""
+        self.base_temperature = base_temperature
+        self._time: datetime | None = None
+        self._temperature = 0.0
+        self._hour: datetime | None = None
+        self._value = 0.0
+        # Timezone of the last sample, the hours are reported in it
+        self._timezone: tzinfo | None = None
+
+    @property
+    def hour(self) -> datetime | None:
+        """Return the start of the hour being integrated, in local time."""
+        if self._hour is None:
+            return None
+        return self._hour.astimezone(self._timezone)
+
+    @property
+    def value(self) -> float:
+        """Return the degree-hours of the hour being integrated."""
+        return self._value
+
+    def update(
+        self, temperature: float, now: datetime, hour: datetime
+    ) -> list[tuple[datetime, float]]:
+        """Add a sample, returning the hours completed by it with their value.
+
+        hour is the start of the hour of now, both timezone aware. The
+        completed hours are returned in the timezone of now.
+        """
+        completed: list[tuple[datetime, float]] = []
+        utc_now, utc_hour = now.astimezone(UTC), hour.astimezone(UTC)
+
+        if self._time is None or utc_now - self._time > MAX_SAMPLE_GAP:
+            if self._hour is not None:
+                completed.append((self._hour, self._value))
+            self._hour = utc_hour
+            self._value = 0.0
+        else:
+            degrees = max(0.0, self.base_temperature - self._temperature)
+            while self._hour + ONE_HOUR <= utc_now:
+                boundary = self._hour + ONE_HOUR
+                self._value += degrees * (boundary - self._time) / ONE_HOUR
+                completed.append((self._hour, self._value))
+                self._hour, self._time, self._value = boundary, boundary, 0.0
+            self._value += degrees * (utc_now - self._time) / ONE_HOUR
+            self._hour = utc_hour
+
+        self._time = utc_now
+        self._temperature = temperature
+        self._timezone = now.tzinfo
+        return [(start.astimezone(now.tzinfo), value) for start, value in completed]
+
+
+class HeatingEfficiency:
+    """Incremental heating degree-hours and heating energy per degree-hour.
+
+    Every completed hour is added to the degree-hours of its day. Once its
+    heating consumption is finalized, both are added to the energy per
+    degree-hour of the day. Only the degree-hours of the day are restored
+    after a restart, the energy per degree-hour starts over.
+    """
+
+    def __init__(self, base_temperature: float) -> None:
+        """Initialize the accumulators."""
+        self._integrator = DegreeHourIntegrator(base_temperature)
+        self._pending: deque[tuple[datetime, float]] = deque(maxlen=MAX_PENDING_HOURS)
+        # Day -> [degree-hours, heating energy, degree-hours with energy]
+        self._days: dict[date, list[float]] = {}
+        # Degree-hours of a day integrated before a restart
+        self._restored: tuple[date, float] | None = None
+
+    def _day(self, day: date) -> list[float]:
+        if (totals := self._days.get(day)) is None:
+            totals = self._days[day] = [0.0, 0.0, 0.0]
+            for old in sorted(self._days)[:-MAX_DAYS]:
+                del self._days[old]
+        return totals
+
+    def update(
+        self,
+        temperature: float | None,
+        now: datetime,
+        finalized_consumption: Callable[[datetime], float | None],
+    ) -> None:
+        """Add an outdoor temperature sample taken at now, in local time.
+
+        finalized_consumption returns the heating consumption of an hour, None
+        while it is not finalized.
+        """
+        if temperature is not None:
+            hour = now.replace(minute=0, second=0, microsecond=0)
+            for completed, degree_hours in self._integrator.update(
+                temperature, now, hour
+            ):
+                self._day(completed.date())[0] += degree_hours
+                self._pending.append((completed, degree_hours))
+
+        while self._pending:
+            completed, degree_hours = self._pending[0]
+            if (energy := finalized_consumption(completed)) is None:
+                break
+            self._pending.popleft()
+            totals = self._day(completed.date())
+            totals[1] += energy
+            totals[2] += degree_hours
+
+    def degree_hours(self, day: date) -> float:
+        """Return the heating degree-hours of the day, current hour included."""
+        value = self._days[day][0] if day in self._days else 0.0
+        if self._restored is not None and self._restored[0] == day:
+            value += self._restored[1]
+        if (hour := self._integrator.hour) is not None and hour.date() == day:
+            value += self._integrator.value
+        return value
+
+    def restore_degree_hours(self, day: date, degree_hours: float) -> None:
+        """Restore the degree-hours of a day integrated before a restart.
+
+        They are added to the ones integrated since, replacing the ones
+        restored before.
+        """
+        self._restored = (day, degree_hours)
+
+    def energy_per_degree_hour(self, day: date) -> float | None:
+        """Return the heating energy per degree-hour of the finalized hours."""
+        if (totals := self._days.get(day)) is None or not totals[2]:
+            return None
+        return totals[1] / totals[2]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the accumulators."""
+        return {
+            "base_temperature": self._integrator.base_temperature,
+            "pending_hours": len(self._pending),
+            "restored": (
+                {
+                    "day": self._restored[0].isoformat(),
+                    "degree_hours": self._restored[1],
+                }
+                if self._restored is not None
+                else None
+            ),
+            "days": {
+                day.isoformat(): {
+                    "degree_hours": totals[0],
+                    "energy": totals[1],
+                    "matched_degree_hours": totals[2],
+                }
+                for day, totals in self._days.items()
+            },
+        }
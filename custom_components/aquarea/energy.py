@@ -0,0 +1,183 @@
+"""State machines of the energy consumption sensors.
+
+The reconciliation of the hourly consumption is kept apart from the entities
+as pure functions over the consumption of a range of hours, so it can be
+driven without Home Assistant or Aquarea Smart Cloud.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta, tzinfo
+
+TRANSITION_STALE = "stale"
+TRANSITION_HOURS_COMPLETED = "hours_completed"
+TRANSITION_PREVIOUS_HOUR_UPDATE = "previous_hour_update"
+TRANSITION_CURRENT_HOUR_UPDATE = "current_hour_update"
+
+# Hours missed during a gap in the updates that are still reconciled, a longer
+# gap starts a new cycle from the current hour
+MAX_RECONCILE_HOURS = 24
+# The recorder detects a reset of a total_increasing sensor when its state
+# drops under this ratio of the previous one
+RESET_DETECTION_RATIO = 0.9
+
+# Hour and its consumption, None when the cloud doesn't have data for it yet
+HourConsumption = tuple[datetime, float | None]
+
+
+@dataclass(frozen=True, slots=True)
+class AccumulatedState:
+    """State of an accumulated energy consumption sensor."""
+
+    total: float
+    period: datetime
+    # Consumption of the period already added to the total
+    period_consumption: float
+
+
+@dataclass(frozen=True, slots=True)
+class HourlyState:
+    """State of an energy consumption sensor that resets every hour."""
+
+    value: float
+    period: datetime
+
+
+def is_stale(period: datetime | None, now: datetime) -> bool:
+    """Return True if the period being processed can't be reconciled anymore."""
+    return (
+        period is None
+        or period > now
+        or now - period > timedelta(hours=MAX_RECONCILE_HOURS)
+    )
+
+
+def hour_range(start: datetime, end: datetime) -> list[datetime]:
+    """Return every hour from start to end, both included.
+
+    The hours are stepped in UTC so the DST changes are handled, and returned
+    in the timezone of start.
+    """
+    hour = start.astimezone(UTC)
+    end = end.astimezone(UTC)
+    hours: list[datetime] = []
+
+    while hour <= end:
+        hours.append(hour.astimezone(start.tzinfo))
+        hour += timedelta(hours=1)
+
+    return hours
+
+
+def day_hours(day: date, time_zone: tzinfo) -> list[datetime]:
+    """Return the start of every hour of a local day, 23 to 25 of them.
+
+    The hours run from the local midnight to the next one, stepped in UTC
+    like hour_range.
+    """
+    start = datetime.combine(day, time(), time_zone)
+    end = datetime.combine(day + timedelta(days=1), time(), time_zone)
+    return hour_range(start, end)[:-1]
+
+
+def is_repeated_hour(hour: datetime) -> bool:
+    """Return True if the hour is the second one of a fall back, like 02:00 CET."""
+    return hour.fold == 1 and hour.utcoffset() != hour.replace(fold=0).utcoffset()
+
+
+def reported_consumption(values: list[float | None], hour: datetime) -> float | None:
+    """Return the consumption of the hour from the values of its local day.
+
+    The cloud reports the consumption by local hour of the day. Both hours of
+    a fall back share a value, counted once with the first of them.
+    """
+    if is_repeated_hour(hour):
+        return 0.0
+    return values[hour.hour] if hour.hour < len(values) else None
+
+
+def last_hour_with_data(hours: list[HourConsumption]) -> int | None:
+    """Return the index of the last hour with data before a gap in the data.
+
+    The period being processed, the first hour, may miss its data. The hours
+    after the first one missing it are left for a later update, as the cloud
+    may still fill it in.
+    """
+    last = 0 if hours and hours[0][1] is not None else None
+    for index in range(1, len(hours)):
+        if hours[index][1] is None:
+            break
+        last = index
+    return last
+
+
+def _values(hours: list[HourConsumption]) -> list[float]:
+    """Return the consumption of hours that all have data."""
+    return [value for _, value in hours if value is not None]
+
+
+def _update_transition(period: datetime, now: datetime) -> str:
+    if period == now:
+        return TRANSITION_CURRENT_HOUR_UPDATE
+    return TRANSITION_PREVIOUS_HOUR_UPDATE
+
+
+def reconcile_accumulated(
+    state: AccumulatedState, hours: list[HourConsumption], now: datetime
+) -> tuple[AccumulatedState, str] | None:
+    """Add the consumption of the hours from the period being processed.
+
+    hours starts with the period being processed. Returns the new state and
+    the transition, None if there is nothing to add yet.
+    """
+    if (last := last_hour_with_data(hours)) is None:
+        return None
+
+    to_add = 0.0
+    if (period_consumption := hours[0][1]) is not None:
+        to_add = abs(period_consumption - state.period_consumption)
+
+    # Hours after the one being processed are added completely
+    to_add += sum(_values(hours[1 : last + 1]))
+
+    period, consumption = hours[last]
+    new_state = AccumulatedState(state.total + to_add, period, consumption)
+
+    if last > 0:
+        return new_state, TRANSITION_HOURS_COMPLETED
+    return new_state, _update_transition(period, now)
+
+
+def reconcile_hourly(
+    state: HourlyState, hours: list[HourConsumption], now: datetime
+) -> tuple[list[float], datetime, str] | None:
+    """Close the completed hours from the period being processed.
+
+    hours starts with the period being processed. Returns the values to write
+    in order, the new period being processed and the transition, None if
+    there is nothing to write yet.
+    """
+    if (last := last_hour_with_data(hours)) is None:
+        return None
+
+    # We're still processing the same hour, it might be the previous one
+    if last == 0:
+        return [hours[0][1]], state.period, _update_transition(state.period, now)
+
+    # The hours before the last one with data are complete. They are closed
+    # with a single state that includes the hours missed in between.
+    completed = hours[0][1] if hours[0][1] is not None else state.value
+    completed += sum(_values(hours[1:last]))
+    period, consumption = hours[last]
+    writes: list[float] = []
+
+    if completed != state.value:
+        writes.append(completed)
+
+    # Write a 0 to start the new period only when the recorder wouldn't
+    # detect the reset from the new value
+    if completed and consumption >= completed * RESET_DETECTION_RATIO:
+        writes.append(0)
+
+    writes.append(consumption)
+    return writes, period, TRANSITION_HOURS_COMPLETED
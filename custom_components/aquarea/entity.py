@@ -0,0 +1,86 @@
+"""Base entity of the Aquarea Smart Cloud integration."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import ATTRIBUTION, DOMAIN
+from .coordinator import AquareaDataUpdateCoordinator
+from .profiler import OPERATION_WRITE
+
+ATTR_LAST_CHANGED = "last_changed"
+
+
+class AquareaBaseEntity(CoordinatorEntity[AquareaDataUpdateCoordinator]):
+    """Common base for Aquarea entities."""
+
+    coordinator: AquareaDataUpdateCoordinator
+    _attr_attribution = ATTRIBUTION
+    _attr_has_entity_name = True
+    # Snapshot field measured by the entity, the entity is unavailable while
+    # the field is stale
+    _freshness_field: str | None = None
+
+    def __init__(self, coordinator: AquareaDataUpdateCoordinator) -> None:
+        """Initialize entity."""
+        super().__init__(coordinator)
+
+        self._attrs: dict[str, Any] = {
+            "name": self.coordinator.device.name,
+            "id": self.coordinator.device.device_id,
+        }
+        self._attr_unique_id = self.coordinator.device.device_id
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, self.coordinator.device.device_id)},
+            manufacturer=self.coordinator.device.manufacturer,
+            model="",
+            name=self.coordinator.device.name,
+            sw_version=self.coordinator.device.version,
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True if the device refreshed and the measured field is fresh."""
+        return super().available and (
+            self._freshness_field is None
+            or not self.coordinator.freshness.is_stale(
+                self._freshness_field, dt_util.utcnow()
+            )
+        )
+
+    @callback
+    def _update_last_changed(self) -> None:
+        """Expose when the measured field last changed.
+
+        Called when the published measurement changes, so the attribute
+        doesn't cause writes of its own.
+        """
+        last_changed = self.coordinator.freshness.last_changed(self._freshness_field)
+        self._attr_extra_state_attributes = {
+            ATTR_LAST_CHANGED: last_changed.isoformat() if last_changed else None
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self._handle_coordinator_update()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state to the state machine, timed when profiling."""
+        if not self.coordinator.profiler.enabled:
+            super().async_write_ha_state()
+            return
+
+        start = time.perf_counter()
+        try:
+            super().async_write_ha_state()
+        finally:
+            self.coordinator.profiler.record(
+                type(self).__name__, OPERATION_WRITE, time.perf_counter() - start
+            )
@@ -0,0 +1,231 @@
+"""Streaming export of the hourly consumption of Aquarea devices."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Sequence
+from contextlib import aclosing
+import csv
+from datetime import UTC, date, timedelta
+import io
+import json
+import os
+from typing import IO, Any
+
+from aioaquarea import ConsumptionType
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .coordinator import CONSUMPTION_FINALIZED_DELAY, AquareaDataUpdateCoordinator
+from .energy import day_hours
+
+EXPORT_DIRECTORY = "aquarea_exports"
+# Days fetched ahead of the one being written, per export
+EXPORT_CONCURRENCY = 4
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+
+CSV_HEADER = ("device_id", "device_name", "consumption_type", "hour", "energy")
+
+ERROR_UNLOADED = "The config entry of the device was unloaded"
+
+# Consumption of every hour of a local day, in order
+DayConsumption = dict[ConsumptionType, list[float | None]]
+
+
+def export_path(hass: HomeAssistant, filename: str) -> str:
+    """Return the path of an export file, which must be a plain file name."""
+    if not filename or os.path.basename(filename) != filename or filename in (
+        os.curdir,
+        os.pardir,
+    ):
+        raise ValueError(f"Invalid export file name: {filename}")
+    return hass.config.path(EXPORT_DIRECTORY, filename)
+
+
+def _cached_day(
+    coordinator: AquareaDataUpdateCoordinator,
+    day: date,
+    consumption_types: Sequence[ConsumptionType],
+) -> DayConsumption | None:
+    """Return the consumption of a finalized day from the cache, if complete."""
+    hours = day_hours(day, dt_util.DEFAULT_TIME_ZONE)
+    end = hours[-1].astimezone(UTC) + timedelta(hours=1)
+    if end + CONSUMPTION_FINALIZED_DELAY > dt_util.utcnow():
+        return None
+
+    cache = coordinator.consumption_cache
+    consumption: DayConsumption = {}
+    for consumption_type in consumption_types:
+        values = [cache.get(hour, consumption_type) for hour in hours]
+        if None in values:
+            return None
+        consumption[consumption_type] = values
+    return consumption
+
+
+async def _async_day(
+    coordinator: AquareaDataUpdateCoordinator,
+    day: date,
+    consumption_types: Sequence[ConsumptionType],
+) -> tuple[DayConsumption, bool]:
+    """Return the consumption of a day and whether it was fetched."""
+    if (consumption := _cached_day(coordinator, day, consumption_types)) is not None:
+        return consumption, False
+    return await coordinator.async_fetch_consumption(day), True
+
+
+async def _async_day_result(
+    task: asyncio.Task[tuple[DayConsumption, bool]],
+) -> tuple[DayConsumption, bool]:
+    """Return the result of a day, failing if its entry unloaded meanwhile."""
+    try:
+        await asyncio.wait([task])
+    finally:
+        task.cancel()
+    if task.cancelled():
+        raise HomeAssistantError(ERROR_UNLOADED)
+    return task.result()
+
+
+async def _async_days(
+    coordinators: Sequence[AquareaDataUpdateCoordinator],
+    days: Sequence[date],
+    consumption_types: Sequence[ConsumptionType],
+) -> AsyncIterator[
+    tuple[AquareaDataUpdateCoordinator, date, tuple[DayConsumption, bool]]
+]:
+    """Yield the consumption of every device and day in order.
+
+    Up to EXPORT_CONCURRENCY days are fetched ahead, the requests themselves
+    still go through the limiter of the account. The days are fetched in
+    tasks of the entry of the device, cancelled if it unloads.
+    """
+    pending: deque[
+        tuple[AquareaDataUpdateCoordinator, date, asyncio.Task]
+    ] = deque()
+    try:
+        for coordinator in coordinators:
+            for day in days:
+                if coordinator.lifecycle.is_shutdown:
+                    raise HomeAssistantError(ERROR_UNLOADED)
+                pending.append(
+                    (
+                        coordinator,
+                        day,
+                        coordinator.lifecycle.async_create_task(
+                            _async_day(coordinator, day, consumption_types),
+                            f"export {coordinator.device.device_id} {day}",
+                        ),
+                    )
+                )
+                if len(pending) >= EXPORT_CONCURRENCY:
+                    coordinator_, day_, task = pending.popleft()
+                    yield coordinator_, day_, await _async_day_result(task)
+        while pending:
+            coordinator_, day_, task = pending.popleft()
+            yield coordinator_, day_, await _async_day_result(task)
+    finally:
+        for _, _, task in pending:
+            task.cancel()
+
+
+def _rows(
+    coordinator: AquareaDataUpdateCoordinator,
+    day: date,
+    consumption: DayConsumption,
+    consumption_types: Sequence[ConsumptionType],
+) -> list[tuple[str, str, str, str, float | None]]:
+    device = coordinator.device
+    hours = day_hours(day, dt_util.DEFAULT_TIME_ZONE)
+    return [
+        (
+            device.device_id,
+            device.name,
+            consumption_type.name.lower(),
+            hour.isoformat(),
+            value,
+        )
+        for consumption_type in consumption_types
+        for hour, value in zip(hours, consumption.get(consumption_type, []))
+    ]
+
+
+def _format(
+    rows: list[tuple[str, str, str, str, float | None]], export_format: str
+) -> str:
+    if export_format == FORMAT_NDJSON:
+        return "".join(
+            json.dumps(dict(zip(CSV_HEADER, row))) + "\n" for row in rows
+        )
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def _open(path: str, export_format: str) -> IO[str]:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    file = open(path, "w", encoding="utf-8", newline="")
+    if export_format == FORMAT_CSV:
+        csv.writer(file).writerow(CSV_HEADER)
+    return file
+
+
+def _close(file: IO[str], path: str | None) -> None:
+    """Close the file and move it to path, remove it if path is None."""
+    file.close()
+    if path is None:
+        os.remove(file.name)
+    else:
+        os.replace(file.name, path)
+
+
+async def async_export_consumption(
+    hass: HomeAssistant,
+    coordinators: Sequence[AquareaDataUpdateCoordinator],
+    start: date,
+    end: date,
+    consumption_types: Sequence[ConsumptionType],
+    export_format: str,
+    path: str,
+) -> dict[str, Any]:
+    """Write the hourly consumption of the devices between start and end.
+
+    Every day is written as soon as it is available, so only the days
+    fetched ahead are held in memory. The file is written next to path and
+    only moved there once complete.
+    """
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    rows = fetched = cached = 0
+
+    file = await hass.async_add_executor_job(_open, f"{path}.part", export_format)
+    try:
+        async with aclosing(
+            _async_days(coordinators, days, consumption_types)
+        ) as results:
+            async for coordinator, day, (consumption, was_fetched) in results:
+                if was_fetched:
+                    fetched += 1
+                else:
+                    cached += 1
+                day_rows = _rows(coordinator, day, consumption, consumption_types)
+                rows += len(day_rows)
+                await hass.async_add_executor_job(
+                    file.write, _format(day_rows, export_format)
+                )
+    except BaseException:
+        await hass.async_add_executor_job(_close, file, None)
+        raise
+
+    await hass.async_add_executor_job(_close, file, path)
+
+    return {
+        "path": path,
+        "rows": rows,
+        "days_fetched": fetched,
+        "days_cached": cached,
+    }
@@ -0,0 +1,89 @@
+"""Background work started for a config entry, cancelled when it unloads."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+import logging
+from typing import Any, TypeVar
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+_R = TypeVar("_R")
+
+
+class AquareaEntryLifecycle:
+    """Track the tasks and timers of a config entry.
+
+    Everything still pending when the entry unloads is cancelled, and
+    nothing new can be started afterwards.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str) -> None:
+        """Initialize the lifecycle."""
+        self._hass = hass
+        self._name = name
+        self._tasks: set[asyncio.Task[Any]] = set()
+        self._timers: set[CALLBACK_TYPE] = set()
+        self._shutdown = False
+
+    @property
+    def is_shutdown(self) -> bool:
+        """Return True once the entry started unloading."""
+        return self._shutdown
+
+    @callback
+    def async_create_task(
+        self, target: Coroutine[Any, Any, _R], name: str
+    ) -> asyncio.Task[_R]:
+        """Create a task cancelled when the entry unloads."""
+        if self._shutdown:
+            target.close()
+            raise RuntimeError(f"{self._name} is shut down, can't start {name}")
+
+        task = self._hass.async_create_background_task(target, f"{self._name} {name}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @callback
+    def async_track_timer(self, cancel: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Track the cancel callback of a timer, returning one that untracks it."""
+        if self._shutdown:
+            cancel()
+            return lambda: None
+
+        self._timers.add(cancel)
+
+        @callback
+        def _async_cancel() -> None:
+            if cancel in self._timers:
+                self._timers.remove(cancel)
+                cancel()
+
+        return _async_cancel
+
+    async def async_shutdown(self) -> None:
+        """Cancel the timers and the tasks, waiting for the tasks to finish."""
+        self._shutdown = True
+
+        while self._timers:
+            self._timers.pop()()
+
+        if not self._tasks:
+            return
+
+        tasks = list(self._tasks)
+        _LOGGER.debug("Cancelling %s tasks of %s", len(tasks), self._name)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the work pending for the entry."""
+        return {
+            "shutdown": self._shutdown,
+            "tasks": sorted(task.get_name() for task in self._tasks),
+            "timers": len(self._timers),
+        }
@@ -0,0 +1,155 @@
+"""Limit the number of concurrent requests sent to Aquarea Smart Cloud."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+import logging
+import time
+from typing import Any, ParamSpec, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DEFAULT_MAX_CONCURRENT_REQUESTS, DOMAIN, LIMITERS
+
+_LOGGER = logging.getLogger(__name__)
+
+_P = ParamSpec("_P")
+_T = TypeVar("_T")
+
+
+class AquareaRequestLimiter:
+    """Account scoped limiter for the requests in flight against the cloud.
+
+    The limit can change while requests are in flight, the waiting ones are
+    let through in order as soon as there is room under the new limit.
+    """
+
+    def __init__(self, limit: int = DEFAULT_MAX_CONCURRENT_REQUESTS) -> None:
+        """Initialize the limiter."""
+        self._limit = limit
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._waiting = 0
+        self._in_flight = 0
+        self._requests = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def limit(self) -> int:
+        """Return the maximum number of requests in flight."""
+        return self._limit
+
+    @callback
+    def async_set_limit(self, limit: int) -> None:
+        """Change the maximum number of requests in flight."""
+        self._limit = limit
+        self._wake_waiters()
+
+    @callback
+    def _wake_waiters(self) -> None:
+        """Hand the free slots to the requests waiting the longest."""
+        while self._waiters and self._in_flight < self._limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    async def _async_acquire(self) -> None:
+        """Wait for a slot, the request is counted in flight once it has it."""
+        if self._in_flight < self._limit and not self._waiters:
+            self._in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation
+                self._release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    @callback
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for a slot."""
+        return self._waiting
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of requests in flight."""
+        return self._in_flight
+
+    @property
+    def average_wait(self) -> float:
+        """Return the average time in seconds a request waited for a slot."""
+        return self._total_wait / self._requests if self._requests else 0.0
+
+    async def run(
+        self,
+        func: Callable[_P, Awaitable[_T]],
+        *args: _P.args,
+        **kwargs: _P.kwargs,
+    ) -> _T:
+        """Run the request once a slot is available."""
+        start = time.monotonic()
+        self._waiting += 1
+        try:
+            await self._async_acquire()
+        finally:
+            self._waiting -= 1
+
+        wait = time.monotonic() - start
+        self._requests += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self._release()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the limiter metrics."""
+        return {
+            "limit": self._limit,
+            "queue_depth": self._waiting,
+            "in_flight": self._in_flight,
+            "requests": self._requests,
+            "average_wait": round(self.average_wait, 3),
+            "max_wait": round(self._max_wait, 3),
+        }
+
+
+def async_get_limiter(
+    hass: HomeAssistant, account: str, limit: int
+) -> AquareaRequestLimiter:
+    """Return the limiter shared by every entry of the account.
+
+    A different limit changes the one of the shared limiter in place, so the
+    entries of the account keep sharing a single budget.
+    """
+    limiters: dict[str, AquareaRequestLimiter] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(LIMITERS, {})
+
+    if (limiter := limiters.get(account.lower())) is None:
+        limiter = limiters[account.lower()] = AquareaRequestLimiter(limit)
+    elif limiter.limit != limit:
+        _LOGGER.debug(
+            "Changing the concurrent requests of account %s from %s to %s",
+            account,
+            limiter.limit,
+            limit,
+        )
+        limiter.async_set_limit(limit)
+
+    return limiter
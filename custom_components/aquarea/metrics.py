@@ -0,0 +1,227 @@
+"""In-process metrics of the integration, exported in Prometheus text format."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.const import CONF_USERNAME
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DEVICES, DOMAIN, LIMITERS, METRICS, PUBLISH_POLICIES
+
+# Label sets over this limit are dropped to bound the cardinality of a metric
+MAX_SERIES_PER_METRIC = 200
+
+COUNTER = "counter"
+GAUGE = "gauge"
+SUMMARY = "summary"
+
+METRIC_POLLS = "aquarea_polls_total"
+METRIC_POLL_FAILURES = "aquarea_poll_failures_total"
+METRIC_POLL_DURATION = "aquarea_poll_duration_seconds"
+METRIC_REFRESHES_COALESCED = "aquarea_refreshes_coalesced_total"
+METRIC_REQUESTS = "aquarea_requests_total"
+METRIC_REQUEST_FAILURES = "aquarea_request_failures_total"
+METRIC_REQUEST_DURATION = "aquarea_request_duration_seconds"
+METRIC_DEVICE_AVAILABLE = "aquarea_device_available"
+METRIC_UPDATE_INTERVAL = "aquarea_update_interval_seconds"
+METRIC_QUEUE_DEPTH = "aquarea_request_queue_depth"
+METRIC_IN_FLIGHT = "aquarea_requests_in_flight"
+METRIC_SUPPRESSED_WRITES = "aquarea_suppressed_writes_total"
+METRIC_DROPPED_SERIES = "aquarea_metrics_dropped_series_total"
+
+METRICS_DEFINITIONS: dict[str, tuple[str, str]] = {
+    METRIC_POLLS: (COUNTER, "Refreshes of the devices."),
+    METRIC_POLL_FAILURES: (COUNTER, "Refreshes of the devices that failed."),
+    METRIC_POLL_DURATION: (SUMMARY, "Duration of the refreshes of the devices."),
+    METRIC_REFRESHES_COALESCED: (
+        COUNTER,
+        "Refreshes served by the refresh in flight or by a fresh result.",
+    ),
+    METRIC_REQUESTS: (COUNTER, "Requests sent to Aquarea Smart Cloud."),
+    METRIC_REQUEST_FAILURES: (COUNTER, "Requests to Aquarea Smart Cloud that failed."),
+    METRIC_REQUEST_DURATION: (
+        SUMMARY,
+        "Duration of the requests to Aquarea Smart Cloud, waiting time included.",
+    ),
+    METRIC_DEVICE_AVAILABLE: (GAUGE, "1 if the last refresh of the device succeeded."),
+    METRIC_UPDATE_INTERVAL: (GAUGE, "Current refresh interval of the device."),
+    METRIC_QUEUE_DEPTH: (GAUGE, "Requests waiting for a free slot of the account."),
+    METRIC_IN_FLIGHT: (GAUGE, "Requests in flight for the account."),
+    METRIC_SUPPRESSED_WRITES: (
+        COUNTER,
+        "Measurement writes held back by the deadband or the publish interval.",
+    ),
+    METRIC_DROPPED_SERIES: (
+        COUNTER,
+        "Samples dropped because their metric reached the maximum label sets.",
+    ),
+}
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+@dataclass(slots=True)
+class _Metric:
+    kind: str
+    help: str
+    # Label set -> value, or [count, sum] for summaries
+    series: dict[LabelKey, Any] = field(default_factory=dict)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+
+class AquareaMetrics:
+    """Registry of the counters, gauges and summaries of the integration."""
+
+    def __init__(self, max_series: int = MAX_SERIES_PER_METRIC) -> None:
+        """Initialize the registry."""
+        self._max_series = max_series
+        self._metrics = {
+            name: _Metric(kind, help)
+            for name, (kind, help) in METRICS_DEFINITIONS.items()
+        }
+
+    def _series(self, name: str, labels: Mapping[str, str]) -> LabelKey | None:
+        """Return the key of the series, None if it can't be added."""
+        key = tuple(sorted(labels.items()))
+        series = self._metrics[name].series
+        if key in series or len(series) < self._max_series:
+            return key
+
+        self._metrics[METRIC_DROPPED_SERIES].series[()] = (
+            self._metrics[METRIC_DROPPED_SERIES].series.get((), 0) + 1
+        )
+        return None
+
+    @callback
+    def inc(self, name: str, labels: Mapping[str, str], value: float = 1) -> None:
+        """Increment a counter."""
+        if (key := self._series(name, labels)) is not None:
+            series = self._metrics[name].series
+            series[key] = series.get(key, 0) + value
+
+    @callback
+    def set(self, name: str, labels: Mapping[str, str], value: float) -> None:
+        """Set the value of a gauge, or of a counter kept elsewhere."""
+        if (key := self._series(name, labels)) is not None:
+            self._metrics[name].series[key] = value
+
+    @callback
+    def observe(self, name: str, labels: Mapping[str, str], value: float) -> None:
+        """Add an observation to a summary."""
+        if (key := self._series(name, labels)) is not None:
+            if (stats := self._metrics[name].series.get(key)) is None:
+                self._metrics[name].series[key] = [1, value]
+            else:
+                stats[0] += 1
+                stats[1] += value
+
+    @callback
+    def remove(self, labels: Mapping[str, str]) -> None:
+        """Remove the series of every metric matching all the labels."""
+        items = set(labels.items())
+        for metric in self._metrics.values():
+            for key in [key for key in metric.series if items <= set(key)]:
+                del metric.series[key]
+
+    def render(self) -> str:
+        """Return the metrics in Prometheus text format."""
+        lines: list[str] = []
+
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+
+            for key, value in metric.series.items():
+                labels = _format_labels(key)
+                if metric.kind == SUMMARY:
+                    lines.append(f"{name}_count{labels} {value[0]}")
+                    lines.append(f"{name}_sum{labels} {value[1]}")
+                else:
+                    lines.append(f"{name}{labels} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+@callback
+def async_get_metrics(hass: HomeAssistant) -> AquareaMetrics:
+    """Return the metrics registry of the integration."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (metrics := domain_data.get(METRICS)) is None:
+        metrics = domain_data[METRICS] = AquareaMetrics()
+    return metrics
+
+
+@callback
+def _async_collect(hass: HomeAssistant, metrics: AquareaMetrics) -> None:
+    """Update the gauges read from the state of the loaded entries."""
+    domain_data = hass.data.get(DOMAIN, {})
+
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if (data := domain_data.get(entry.entry_id)) is None:
+            continue
+
+        entry_labels = {"entry": entry.entry_id}
+        for measurement, policy in data[PUBLISH_POLICIES].items():
+            metrics.set(
+                METRIC_SUPPRESSED_WRITES,
+                {**entry_labels, "measurement": measurement},
+                policy.suppressed,
+            )
+
+        limiters = domain_data.get(LIMITERS, {})
+        if limiter := limiters.get(entry.data[CONF_USERNAME].lower()):
+            metrics.set(METRIC_QUEUE_DEPTH, entry_labels, limiter.queue_depth)
+            metrics.set(METRIC_IN_FLIGHT, entry_labels, limiter.in_flight)
+
+        for device_id, coordinator in data[DEVICES].items():
+            device_labels = {"device": device_id}
+            metrics.set(
+                METRIC_DEVICE_AVAILABLE,
+                device_labels,
+                int(coordinator.last_update_success),
+            )
+            if coordinator.update_interval is not None:
+                metrics.set(
+                    METRIC_UPDATE_INTERVAL,
+                    device_labels,
+                    coordinator.update_interval.total_seconds(),
+                )
+
+
+class AquareaMetricsView(HomeAssistantView):
+    """Serve the metrics of the integration to Prometheus."""
+
+    url = "/api/aquarea/metrics"
+    name = "api:aquarea:metrics"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the metrics in Prometheus text format."""
+        hass: HomeAssistant = request.app["hass"]
+        metrics = async_get_metrics(hass)
+        _async_collect(hass, metrics)
+
+        return web.Response(
+            text=metrics.render(), content_type="text/plain", charset="utf-8"
+        )
+
+
+@callback
+def async_setup_metrics(hass: HomeAssistant) -> None:
+    """Create the metrics registry and register its HTTP view."""
+    async_get_metrics(hass)
+    hass.http.register_view(AquareaMetricsView)
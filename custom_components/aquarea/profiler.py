@@ -0,0 +1,94 @@
+"""Opt-in profiling of the entity update handlers of the integration."""
+from __future__ import annotations
+
+from datetime import timedelta
+from functools import wraps
+import inspect
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_LOG_INTERVAL = timedelta(minutes=5)
+PROFILE_LOG_TOP = 10
+
+OPERATION_UPDATE = "coordinator_update"
+OPERATION_WRITE = "write_ha_state"
+
+
+class AquareaProfiler:
+    """Aggregate the time spent by the entities per entity class."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        """Initialize the profiler."""
+        self.enabled = enabled
+        # (entity class, operation) -> [calls, total seconds, max seconds]
+        self._stats: dict[tuple[str, str], list[float]] = {}
+
+    @callback
+    def record(self, name: str, operation: str, elapsed: float) -> None:
+        """Record the duration of an operation run by an entity class."""
+        if (stats := self._stats.get((name, operation))) is None:
+            self._stats[(name, operation)] = [1, elapsed, elapsed]
+            return
+
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+
+    def wrap(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Return the update callback timed under its entity class."""
+        owner = getattr(inspect.unwrap(update_callback), "__self__", None)
+        name = (
+            type(owner).__name__
+            if owner is not None
+            else getattr(update_callback, "__qualname__", "listener")
+        )
+
+        @callback
+        @wraps(update_callback)
+        def _profiled_update() -> None:
+            start = time.perf_counter()
+            try:
+                update_callback()
+            finally:
+                self.record(name, OPERATION_UPDATE, time.perf_counter() - start)
+
+        return _profiled_update
+
+    def profile(self) -> list[dict[str, Any]]:
+        """Return the profile sorted by total time spent, slowest first."""
+        return [
+            {
+                "entity_class": name,
+                "operation": operation,
+                "calls": int(calls),
+                "total_ms": round(total * 1000, 3),
+                "average_ms": round(total / calls * 1000, 3),
+                "max_ms": round(maximum * 1000, 3),
+            }
+            for (name, operation), (calls, total, maximum) in sorted(
+                self._stats.items(), key=lambda item: item[1][1], reverse=True
+            )
+        ]
+
+    @callback
+    def async_log_summary(self, _now: Any = None) -> None:
+        """Log the slowest entries of the profile."""
+        if not _LOGGER.isEnabledFor(logging.DEBUG):
+            return
+
+        for row in self.profile()[:PROFILE_LOG_TOP]:
+            _LOGGER.debug(
+                "%s.%s: %s calls, %s ms total, %s ms average, %s ms max",
+                row["entity_class"],
+                row["operation"],
+                row["calls"],
+                row["total_ms"],
+                row["average_ms"],
+                row["max_ms"],
+            )
@@ -0,0 +1,353 @@
+"""Settings profiles to snapshot and restore the controllable state of a device."""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from aioaquarea import (
+    Device,
+    ExtendedOperationMode,
+    ForceDHW,
+    ForceHeater,
+    HolidayTimer,
+    OperationStatus,
+    QuietMode,
+    SpecialStatus,
+    UpdateOperationMode,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .coordinator import AquareaDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.profiles"
+STORAGE_VERSION = 1
+
+SETTING_ZONES = "zones"
+SETTING_MODE = "mode"
+SETTING_TEMPERATURE = "temperature"
+SETTING_SPECIAL_STATUS = "special_status"
+SETTING_QUIET_MODE = "quiet_mode"
+SETTING_FORCE_HEATER = "force_heater"
+SETTING_FORCE_DHW = "force_dhw"
+SETTING_HOLIDAY_TIMER = "holiday_timer"
+SETTING_TANK = "tank"
+SETTING_OPERATION_STATUS = "operation_status"
+SETTING_TARGET_TEMPERATURE = "target_temperature"
+
+EXTENDED_TO_UPDATE_OPERATION_MODE: dict[ExtendedOperationMode, UpdateOperationMode] = {
+    ExtendedOperationMode.OFF: UpdateOperationMode.OFF,
+    ExtendedOperationMode.HEAT: UpdateOperationMode.HEAT,
+    ExtendedOperationMode.COOL: UpdateOperationMode.COOL,
+    ExtendedOperationMode.AUTO_HEAT: UpdateOperationMode.AUTO,
+    ExtendedOperationMode.AUTO_COOL: UpdateOperationMode.AUTO,
+}
+
+
+@dataclass
+class SettingChange:
+    """A single call needed to move the device towards a profile."""
+
+    setting: str
+    current: Any
+    target: Any
+    apply: Callable[..., Awaitable[None]]
+    # Passed to apply, which is the bound device method so the request is
+    # labelled with its name
+    args: tuple[Any, ...] = ()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the change as a serializable dict."""
+        return {
+            "setting": self.setting,
+            "from": self.current,
+            "to": self.target,
+        }
+
+
+def _name(value: Any) -> str | None:
+    """Return the enum member name of a setting, None if not set."""
+    return value.name if value is not None else None
+
+
+def _zone_mode(device: Device, zone_id: int) -> UpdateOperationMode:
+    """Return the operation mode that would reproduce the zone state."""
+    if device.zones[zone_id].operation_status == OperationStatus.OFF:
+        return UpdateOperationMode.OFF
+
+    return EXTENDED_TO_UPDATE_OPERATION_MODE[device.mode]
+
+
+def _zone_temperature_skip_reason(device: Device, zone_id: int) -> str | None:
+    """Return why the target temperature of the zone can't be set, if so."""
+    if not device.zones[zone_id].supports_set_temperature:
+        return "the zone does not support setting its temperature"
+
+    if device.mode == ExtendedOperationMode.OFF:
+        return "the device is off"
+
+    return None
+
+
+def _zone_target_temperature(device: Device, zone_id: int) -> int | None:
+    """Return the target temperature of the zone for the current device mode."""
+    zone = device.zones[zone_id]
+
+    if _zone_temperature_skip_reason(device, zone_id) is not None:
+        return None
+
+    if device.mode in (ExtendedOperationMode.COOL, ExtendedOperationMode.AUTO_COOL):
+        return zone.cool_target_temperature
+
+    return zone.heat_target_temperature
+
+
+def capture_settings(device: Device) -> dict[str, Any]:
+    """Capture every setting of the device that can be restored later."""
+    settings: dict[str, Any] = {
+        SETTING_ZONES: {
+            str(zone_id): {
+                SETTING_MODE: _zone_mode(device, zone_id).name,
+                SETTING_TEMPERATURE: _zone_target_temperature(device, zone_id),
+            }
+            for zone_id in device.zones
+        },
+        SETTING_QUIET_MODE: _name(device.quiet_mode),
+        SETTING_FORCE_HEATER: _name(device.force_heater),
+        SETTING_HOLIDAY_TIMER: _name(device.holiday_timer),
+    }
+
+    if device.support_special_status:
+        settings[SETTING_SPECIAL_STATUS] = _name(device.special_status)
+
+    if device.has_tank:
+        settings[SETTING_FORCE_DHW] = _name(device.force_dhw)
+        settings[SETTING_TANK] = {
+            SETTING_OPERATION_STATUS: _name(device.tank.operation_status),
+            SETTING_TARGET_TEMPERATURE: device.tank.target_temperature,
+        }
+
+    return settings
+
+
+def _diff_modes(device: Device, settings: dict[str, Any]) -> list[SettingChange]:
+    """Return the changes of modes and switches needed to reach the settings."""
+    changes: list[SettingChange] = []
+
+    for key, zone_settings in settings.get(SETTING_ZONES, {}).items():
+        zone_id = int(key)
+        if zone_id not in device.zones or zone_settings.get(SETTING_MODE) is None:
+            continue
+
+        target = UpdateOperationMode[zone_settings[SETTING_MODE]]
+        if (current := _zone_mode(device, zone_id)) is not target:
+            changes.append(
+                SettingChange(
+                    f"zone_{zone_id}_{SETTING_MODE}",
+                    current.name,
+                    target.name,
+                    device.set_mode,
+                    (target, zone_id),
+                )
+            )
+
+    if SETTING_SPECIAL_STATUS in settings and device.support_special_status:
+        target = (
+            SpecialStatus[settings[SETTING_SPECIAL_STATUS]]
+            if settings[SETTING_SPECIAL_STATUS] is not None
+            else None
+        )
+        if device.special_status is not target:
+            changes.append(
+                SettingChange(
+                    SETTING_SPECIAL_STATUS,
+                    _name(device.special_status),
+                    _name(target),
+                    device.set_special_status,
+                    (target,),
+                )
+            )
+
+    for setting, enum, getter, setter in (
+        (SETTING_QUIET_MODE, QuietMode, "quiet_mode", device.set_quiet_mode),
+        (SETTING_FORCE_HEATER, ForceHeater, "force_heater", device.set_force_heater),
+        (
+            SETTING_HOLIDAY_TIMER,
+            HolidayTimer,
+            "holiday_timer",
+            device.set_holiday_timer,
+        ),
+        (SETTING_FORCE_DHW, ForceDHW, "force_dhw", device.set_force_dhw),
+    ):
+        if settings.get(setting) is None:
+            continue
+
+        if setting == SETTING_FORCE_DHW and not device.has_tank:
+            continue
+
+        target = enum[settings[setting]]
+        if (current := getattr(device, getter)) is not target:
+            changes.append(
+                SettingChange(
+                    setting,
+                    _name(current),
+                    target.name,
+                    setter,
+                    (target,),
+                )
+            )
+
+    tank_settings = settings.get(SETTING_TANK)
+    if device.has_tank and tank_settings and tank_settings.get(SETTING_OPERATION_STATUS):
+        target = OperationStatus[tank_settings[SETTING_OPERATION_STATUS]]
+        if device.tank.operation_status is not target:
+            changes.append(
+                SettingChange(
+                    f"{SETTING_TANK}_{SETTING_OPERATION_STATUS}",
+                    _name(device.tank.operation_status),
+                    target.name,
+                    device.tank.turn_on
+                    if target == OperationStatus.ON
+                    else device.tank.turn_off,
+                )
+            )
+
+    return changes
+
+
+def _diff_temperatures(device: Device, settings: dict[str, Any]) -> list[SettingChange]:
+    """Return the changes of target temperatures needed to reach the settings.
+
+    Target temperatures depend on the device mode, so they must be compared
+    against the device state once the modes have been restored.
+    """
+    changes: list[SettingChange] = []
+
+    for key, zone_settings in settings.get(SETTING_ZONES, {}).items():
+        zone_id = int(key)
+        if (
+            zone_id not in device.zones
+            or (target := zone_settings.get(SETTING_TEMPERATURE)) is None
+        ):
+            continue
+
+        current = _zone_target_temperature(device, zone_id)
+        if current is not None and current != target:
+            changes.append(
+                SettingChange(
+                    f"zone_{zone_id}_{SETTING_TEMPERATURE}",
+                    current,
+                    target,
+                    device.set_temperature,
+                    (int(target), zone_id),
+                )
+            )
+
+    tank_settings = settings.get(SETTING_TANK)
+    if (
+        device.has_tank
+        and tank_settings
+        and (target := tank_settings.get(SETTING_TARGET_TEMPERATURE)) is not None
+        and device.tank.target_temperature != target
+    ):
+        changes.append(
+            SettingChange(
+                f"{SETTING_TANK}_{SETTING_TARGET_TEMPERATURE}",
+                device.tank.target_temperature,
+                target,
+                device.tank.set_target_temperature,
+                (int(target),),
+            )
+        )
+
+    return changes
+
+
+def skipped_temperatures(device: Device, settings: dict[str, Any]) -> dict[str, str]:
+    """Return the target temperatures of the settings the device can't take.
+
+    They are keyed by the setting of their change, with the reason they are
+    skipped. Like the changes, they depend on the device mode.
+    """
+    skipped: dict[str, str] = {}
+
+    for key, zone_settings in settings.get(SETTING_ZONES, {}).items():
+        if zone_settings.get(SETTING_TEMPERATURE) is None:
+            continue
+        setting = f"zone_{key}_{SETTING_TEMPERATURE}"
+        if (zone_id := int(key)) not in device.zones:
+            skipped[setting] = "the device has no such zone"
+        elif (reason := _zone_temperature_skip_reason(device, zone_id)) is not None:
+            skipped[setting] = reason
+
+    tank_settings = settings.get(SETTING_TANK)
+    if (
+        not device.has_tank
+        and tank_settings
+        and tank_settings.get(SETTING_TARGET_TEMPERATURE) is not None
+    ):
+        skipped[f"{SETTING_TANK}_{SETTING_TARGET_TEMPERATURE}"] = (
+            "the device has no tank"
+        )
+
+    return skipped
+
+
+async def async_restore_settings(
+    coordinator: AquareaDataUpdateCoordinator, settings: dict[str, Any]
+) -> list[SettingChange]:
+    """Restore the settings, sending only the calls that change something."""
+    applied: list[SettingChange] = []
+
+    for diff in (_diff_modes, _diff_temperatures):
+        changes = diff(coordinator.device, settings)
+        if not changes:
+            continue
+
+        for change in changes:
+            _LOGGER.debug(
+                "Restoring %s of device %s from %s to %s",
+                change.setting,
+                coordinator.device.device_id,
+                change.current,
+                change.target,
+            )
+            await coordinator.async_execute(change.apply, *change.args)
+
+        applied.extend(changes)
+        # The next diff needs to be computed against the updated device state
+        await coordinator.async_refresh()
+
+    return applied
+
+
+class AquareaProfileStore:
+    """Persist the settings profiles of every device."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the profile store."""
+        self._store: Store[dict[str, dict[str, dict[str, Any]]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._profiles: dict[str, dict[str, dict[str, Any]]] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored profiles."""
+        self._profiles = await self._store.async_load() or {}
+
+    def get(self, device_id: str, profile: str) -> dict[str, Any] | None:
+        """Return the settings stored for the device under the profile name."""
+        return self._profiles.get(device_id, {}).get(profile)
+
+    async def async_save(
+        self, device_id: str, profile: str, settings: dict[str, Any]
+    ) -> None:
+        """Store the settings for the device under the profile name."""
+        self._profiles.setdefault(device_id, {})[profile] = settings
+        await self._store.async_save(self._profiles)
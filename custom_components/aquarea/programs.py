@@ -0,0 +1,356 @@
+"""Weekly programs of the zone and tank target temperatures, run locally."""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+import logging
+from typing import Any
+
+from aioaquarea.errors import ClientError
+
+from homeassistant.const import WEEKDAYS
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, PROGRAMS
+from .coordinator import AquareaDataUpdateCoordinator
+from .lifecycle import AquareaEntryLifecycle
+from .profiles import (
+    SETTING_TANK,
+    SETTING_TARGET_TEMPERATURE,
+    SETTING_TEMPERATURE,
+    SETTING_ZONES,
+    async_restore_settings,
+    skipped_temperatures,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.programs"
+STORAGE_VERSION = 1
+
+TARGET_TANK = "tank"
+ZONE_TARGET_PREFIX = "zone_"
+
+PROGRAM_DAYS = "days"
+PROGRAM_TIME = "time"
+PROGRAM_TEMPERATURE = "temperature"
+
+MINUTES_PER_DAY = 24 * 60
+# Delays in seconds between the attempts of a failed transition
+PROGRAM_RETRY_DELAYS = (30, 60, 120, 300)
+
+Programs = dict[str, dict[str, list[dict[str, Any]]]]
+
+
+def zone_target(zone_id: int) -> str:
+    """Return the program target of a zone."""
+    return f"{ZONE_TARGET_PREFIX}{zone_id}"
+
+
+@dataclass(frozen=True, slots=True)
+class ProgramTransition:
+    """A target temperature set at a minute of the week, Monday 00:00 is 0."""
+
+    minute: int
+    device_id: str
+    target: str
+    temperature: int
+
+
+def build_index(
+    programs: Programs, device_ids: set[str]
+) -> list[ProgramTransition]:
+    """Return the transitions of the programs of the devices sorted by minute."""
+    index: list[ProgramTransition] = []
+
+    for device_id, targets in programs.items():
+        if device_id not in device_ids:
+            continue
+        for target, program in targets.items():
+            for transition in program:
+                hours, minutes = map(int, transition[PROGRAM_TIME].split(":")[:2])
+                index.extend(
+                    ProgramTransition(
+                        WEEKDAYS.index(day) * MINUTES_PER_DAY + hours * 60 + minutes,
+                        device_id,
+                        target,
+                        transition[PROGRAM_TEMPERATURE],
+                    )
+                    for day in transition.get(PROGRAM_DAYS) or WEEKDAYS
+                )
+
+    # Stable, so transitions stored later win within the same minute
+    index.sort(key=lambda transition: transition.minute)
+    return index
+
+
+def minute_of_week(now: datetime) -> int:
+    """Return the minute of the week of a local time."""
+    return now.weekday() * MINUTES_PER_DAY + now.hour * 60 + now.minute
+
+
+def next_due(minutes: list[int], now: datetime) -> tuple[int, datetime] | None:
+    """Return the first minute of the week after now and its local time."""
+    if not minutes:
+        return None
+
+    current = minute_of_week(now)
+    position = bisect_right(minutes, current)
+    minute = minutes[position] if position < len(minutes) else minutes[0]
+
+    days = (minute // MINUTES_PER_DAY - now.weekday()) % 7
+    if minute <= current:
+        days = days or 7
+    day = now.date() + timedelta(days=days)
+    minute_of_day = minute % MINUTES_PER_DAY
+    return minute, datetime.combine(
+        day, time(minute_of_day // 60, minute_of_day % 60), now.tzinfo
+    )
+
+
+def _settings(temperatures: Mapping[str, int]) -> dict[str, Any]:
+    """Return the profile settings setting the target temperatures."""
+    settings: dict[str, Any] = {SETTING_ZONES: {}}
+    for target, temperature in temperatures.items():
+        if target == TARGET_TANK:
+            settings[SETTING_TANK] = {SETTING_TARGET_TEMPERATURE: temperature}
+        else:
+            zone_id = target.removeprefix(ZONE_TARGET_PREFIX)
+            settings[SETTING_ZONES][zone_id] = {SETTING_TEMPERATURE: temperature}
+    return settings
+
+
+def _setting(target: str) -> str:
+    """Return the profile setting changed by a target."""
+    if target == TARGET_TANK:
+        return f"{SETTING_TANK}_{SETTING_TARGET_TEMPERATURE}"
+    return f"{target}_{SETTING_TEMPERATURE}"
+
+
+class AquareaProgramStore:
+    """Persist the programs of every device, keyed by device and target."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the program store."""
+        self._store: Store[Programs] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._programs: Programs = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @property
+    def programs(self) -> Programs:
+        """Return the programs of every device."""
+        return self._programs
+
+    async def async_load(self) -> None:
+        """Load the stored programs."""
+        self._programs = await self._store.async_load() or {}
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for changes of the programs, returning a remove callback."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    async def async_set(
+        self, device_id: str, target: str, program: list[dict[str, Any]]
+    ) -> None:
+        """Store the program of a target of the device."""
+        self._programs.setdefault(device_id, {})[target] = program
+        await self._async_save()
+
+    async def async_clear(self, device_id: str, target: str | None = None) -> None:
+        """Remove the program of a target of the device, all of them if None."""
+        if target is None:
+            self._programs.pop(device_id, None)
+        elif device_id in self._programs:
+            self._programs[device_id].pop(target, None)
+            if not self._programs[device_id]:
+                del self._programs[device_id]
+        await self._async_save()
+
+    async def _async_save(self) -> None:
+        await self._store.async_save(self._programs)
+        for update_callback in list(self._listeners):
+            update_callback()
+
+
+async def async_get_program_store(hass: HomeAssistant) -> AquareaProgramStore:
+    """Return the program store, loaded on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (programs := domain_data.get(PROGRAMS)) is None:
+        store = AquareaProgramStore(hass)
+        await store.async_load()
+        # Another setup may have loaded it in the meantime
+        programs = domain_data.setdefault(PROGRAMS, store)
+    return programs
+
+
+class AquareaProgramScheduler:
+    """Run the programs of the devices of a config entry.
+
+    A single timer is armed for the next transition. Transitions due at the
+    same minute are coalesced into one restore per device, sent through the
+    request limiter of the account. Failed transitions are retried until a
+    later transition of the same target supersedes them.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lifecycle: AquareaEntryLifecycle,
+        coordinators: dict[str, AquareaDataUpdateCoordinator],
+        store: AquareaProgramStore,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._lifecycle = lifecycle
+        self._coordinators = coordinators
+        self._store = store
+        self._index: list[ProgramTransition] = []
+        self._minutes: list[int] = []
+        self._cancel_timer: CALLBACK_TYPE | None = None
+        self._due: tuple[int, datetime] | None = None
+        self._dispatches = 0
+        # Last dispatch of every device and target
+        self._latest: dict[tuple[str, str], int] = {}
+        self._results: dict[str, dict[str, Any]] = {}
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Schedule the programs, returning a callback to stop following them."""
+        remove_listener = self._store.async_add_listener(self.async_reschedule)
+        self.async_reschedule()
+        return remove_listener
+
+    @callback
+    def async_reschedule(self) -> None:
+        """Rebuild the index from the store and arm the timer."""
+        self._index = build_index(self._store.programs, set(self._coordinators))
+        self._minutes = [transition.minute for transition in self._index]
+        self._async_schedule_next(dt_util.now())
+
+    @callback
+    def _async_schedule_next(self, now: datetime) -> None:
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+
+        if self._lifecycle.is_shutdown or (
+            due := next_due(self._minutes, now)
+        ) is None:
+            self._due = None
+            return
+
+        self._due = due
+        self._cancel_timer = self._lifecycle.async_track_timer(
+            async_track_point_in_time(self._hass, self._async_run_due, due[1])
+        )
+
+    @callback
+    def _async_run_due(self, now: datetime) -> None:
+        """Apply the transitions due and arm the timer for the next ones."""
+        if self._due is None:
+            return
+        minute, due = self._due
+
+        self._dispatches += 1
+        temperatures: dict[str, dict[str, int]] = {}
+        for transition in self._index[
+            bisect_left(self._minutes, minute) : bisect_right(self._minutes, minute)
+        ]:
+            temperatures.setdefault(transition.device_id, {})[
+                transition.target
+            ] = transition.temperature
+            self._latest[(transition.device_id, transition.target)] = (
+                self._dispatches
+            )
+
+        for device_id, device_temperatures in temperatures.items():
+            self._lifecycle.async_create_task(
+                self._async_apply(device_id, device_temperatures, self._dispatches),
+                f"program {device_id}",
+            )
+
+        self._async_schedule_next(due)
+
+    async def _async_apply(
+        self, device_id: str, temperatures: dict[str, int], dispatch: int
+    ) -> None:
+        """Set the target temperatures, retrying while they are not superseded."""
+        for attempt, delay in enumerate((0, *PROGRAM_RETRY_DELAYS), 1):
+            if delay:
+                await asyncio.sleep(delay)
+
+            temperatures = {
+                target: temperature
+                for target, temperature in temperatures.items()
+                if self._latest.get((device_id, target)) == dispatch
+            }
+            if not temperatures or (
+                coordinator := self._coordinators.get(device_id)
+            ) is None:
+                return
+
+            settings = _settings(temperatures)
+            try:
+                changes = await async_restore_settings(coordinator, settings)
+            except (ClientError, TimeoutError) as err:
+                _LOGGER.warning(
+                    "Program of device %s failed on attempt %s: %s",
+                    device_id,
+                    attempt,
+                    err,
+                )
+                self._results[device_id] = {
+                    "at": dt_util.utcnow().isoformat(),
+                    "temperatures": temperatures,
+                    "attempts": attempt,
+                    "error": str(err),
+                }
+                continue
+
+            # Targets the device can't take are not sent, not retried either
+            changed = {change.setting for change in changes}
+            skipped = skipped_temperatures(coordinator.device, settings)
+            skipped_targets = {
+                target: reason
+                for target in temperatures
+                if _setting(target) not in changed
+                and (reason := skipped.get(_setting(target))) is not None
+            }
+            for target, reason in skipped_targets.items():
+                _LOGGER.warning(
+                    "Program of device %s skipped %s: %s", device_id, target, reason
+                )
+
+            result: dict[str, Any] = {
+                "at": dt_util.utcnow().isoformat(),
+                "temperatures": temperatures,
+                "attempts": attempt,
+                "changes": [change.as_dict() for change in changes],
+                "skipped": skipped_targets,
+            }
+            if len(skipped_targets) == len(temperatures):
+                result["error"] = "No target temperature could be set"
+            self._results[device_id] = result
+            return
+
+        _LOGGER.error(
+            "Giving up on the program of device %s after %s attempts",
+            device_id,
+            len(PROGRAM_RETRY_DELAYS) + 1,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the next transition and the last result of every device."""
+        return {
+            "transitions": len(self._index),
+            "next_due": self._due[1].isoformat() if self._due else None,
+            "results": self._results,
+        }
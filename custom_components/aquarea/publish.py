@@ -0,0 +1,89 @@
+"""Deadband and rate limiting of the state published by measurement entities."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+
+class PublishPolicy:
+    """Limit how often a class of measurements is published.
+
+    A new value is published when it moves at least deadband away from the
+    published one and min_interval seconds have passed since the last
+    publish. With a heartbeat, the value is published at least every
+    heartbeat seconds: a value held back is released and an unchanged value
+    is written again. All settings at 0 publish every change, as is.
+    """
+
+    def __init__(self, deadband: float, min_interval: float, heartbeat: float) -> None:
+        """Initialize the policy, intervals in seconds."""
+        self.deadband = deadband
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+        self.published = 0
+        self.suppressed = 0
+        self.heartbeats = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the policy and its counters."""
+        return {
+            "deadband": self.deadband,
+            "min_interval": self.min_interval,
+            "heartbeat": self.heartbeat,
+            "published": self.published,
+            "suppressed": self.suppressed,
+            "heartbeats": self.heartbeats,
+        }
+
+
+class MeasurementPublisher:
+    """Decide when the measurement of a single entity is published."""
+
+    def __init__(self, policy: PublishPolicy) -> None:
+        """Initialize the publisher."""
+        self._policy = policy
+        self._value: float | None = None
+        self._published_at = 0.0
+        self._heartbeat = False
+
+    @property
+    def value(self) -> float | None:
+        """Return the last published value."""
+        return self._value
+
+    @property
+    def heartbeat(self) -> bool:
+        """Return True if the last publish rewrites an unchanged value."""
+        return self._heartbeat
+
+    def publish(self, value: float | None) -> float | None:
+        """Return the value to publish for the new measurement."""
+        now = time.monotonic()
+        elapsed = now - self._published_at
+        policy = self._policy
+        heartbeat_due = bool(policy.heartbeat) and elapsed >= policy.heartbeat
+        self._heartbeat = False
+
+        if value == self._value:
+            if heartbeat_due and value is not None:
+                policy.heartbeats += 1
+                self._heartbeat = True
+                self._published_at = now
+            return value
+
+        if (
+            value is not None
+            and self._value is not None
+            and not heartbeat_due
+            and (
+                elapsed < policy.min_interval
+                or abs(value - self._value) < policy.deadband
+            )
+        ):
+            policy.suppressed += 1
+            return self._value
+
+        policy.published += 1
+        self._value = value
+        self._published_at = now
+        return value
@@ -8,9 +8,9 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import AquareaBaseEntity
 from .const import DEVICES, DOMAIN
 from .coordinator import AquareaDataUpdateCoordinator
+from .entity import AquareaBaseEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -65,23 +65,25 @@ class AquareaQuietModeSelect(AquareaBaseEntity, SelectEntity):
     @property
     def current_option(self) -> str:
         """The current select option."""
-        return QUIET_MODE_REVERSE_LOOKUP.get(self.coordinator.device.quiet_mode)
+        return QUIET_MODE_REVERSE_LOOKUP.get(self.coordinator.data.quiet_mode)
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
         if(quiet_mode := QUIET_MODE_LOOKUP.get(option)) is None:
             return
 
-        if quiet_mode is self.coordinator.device.quiet_mode:
+        if quiet_mode is self.coordinator.data.quiet_mode:
             return
 
         _LOGGER.debug(
             "Setting Quiet Mode of device %s, from %s to %s",
             self.coordinator.device.device_id,
-            str(self.coordinator.device.quiet_mode),
+            str(self.coordinator.data.quiet_mode),
             str(quiet_mode)
         )
-        await self.coordinator.device.set_quiet_mode(quiet_mode)
+        await self.coordinator.async_execute(
+            self.coordinator.device.set_quiet_mode, quiet_mode
+        )
 
 class AquareaPowerfulTimeSelect(AquareaBaseEntity, SelectEntity):
     """Representation of an Aquarea select entity to configure the device's powerful time."""
@@ -97,25 +99,27 @@ class AquareaPowerfulTimeSelect(AquareaBaseEntity, SelectEntity):
     @property
     def icon(self) -> str:
         """Return the icon."""
-        return "mdi:fire-off" if self.coordinator.device.powerful_time is PowerfulTime.OFF else "mdi:fire"
+        return "mdi:fire-off" if self.coordinator.data.powerful_time is PowerfulTime.OFF else "mdi:fire"
 
     @property
     def current_option(self) -> str:
         """The current select option."""
-        return POWERFUL_TIME_REVERSE_LOOKUP.get(self.coordinator.device.powerful_time)
+        return POWERFUL_TIME_REVERSE_LOOKUP.get(self.coordinator.data.powerful_time)
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
         if(powerful_time := POWERFUL_TIME_LOOKUP.get(option)) is None:
             return
 
-        if powerful_time is self.coordinator.device.powerful_time:
+        if powerful_time is self.coordinator.data.powerful_time:
             return
 
         _LOGGER.debug(
             "Setting Powerful Time of device %s, from %s to %s",
             self.coordinator.device.device_id,
-            str(self.coordinator.device.powerful_time),
+            str(self.coordinator.data.powerful_time),
             str(powerful_time)
         )
-        await self.coordinator.device.set_powerful_time(powerful_time)
+        await self.coordinator.async_execute(
+            self.coordinator.device.set_powerful_time, powerful_time
+        )
@@ -15,18 +15,40 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfEnergy, UnitOfTemperature
+from homeassistant.const import UnitOfEnergy, UnitOfTemperature, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.util import dt as dt_util
 
-from . import AquareaBaseEntity
-from .const import DEVICES, DOMAIN
+from .const import (
+    ATTR_ERROR_MESSAGE,
+    DEVICES,
+    DOMAIN,
+    MEASUREMENT_OUTDOOR_TEMPERATURE,
+)
 from .coordinator import AquareaDataUpdateCoordinator
+from .energy import (
+    TRANSITION_STALE,
+    AccumulatedState,
+    HourConsumption,
+    HourlyState,
+    hour_range,
+    is_stale,
+    reconcile_accumulated,
+    reconcile_hourly,
+)
+from .entity import AquareaBaseEntity
+from .publish import MeasurementPublisher
+from .snapshot import FIELD_TEMPERATURE_OUTDOOR
+from .trace import EVENT_ENERGY_TRANSITION
 
 _LOGGER = logging.getLogger(__name__)
 
+UNIT_DEGREE_HOURS = f"{UnitOfTemperature.CELSIUS}·h"
+ATTR_YESTERDAY = "yesterday"
+
 @dataclass(kw_only=True)
 class AquareaEnergyConsumptionSensorDescription(SensorEntityDescription):
     """Entity Description for Aquarea Energy Consumption Sensors."""
@@ -54,7 +76,7 @@ ACCUMULATED_ENERGY_SENSORS: list[AquareaEnergyConsumptionSensorDescription] = [
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         suggested_display_precision=2,
         consumption_type=ConsumptionType.COOL,
-        exists_fn=lambda coordinator: any(zone.cool_mode for zone in coordinator.device.zones.values())
+        exists_fn=lambda coordinator: any(zone.cool_mode for zone in coordinator.data.zones)
     ),
     AquareaEnergyConsumptionSensorDescription(
         key="tank_accumulated_energy_consumption",
@@ -65,7 +87,7 @@ ACCUMULATED_ENERGY_SENSORS: list[AquareaEnergyConsumptionSensorDescription] = [
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         suggested_display_precision=2,
         consumption_type=ConsumptionType.WATER_TANK,
-        exists_fn=lambda coordinator: coordinator.device.has_tank
+        exists_fn=lambda coordinator: coordinator.data.has_tank
     ),
     AquareaEnergyConsumptionSensorDescription(
         key="accumulated_energy_consumption",
@@ -100,7 +122,7 @@ ENERGY_SENSORS: list[AquareaEnergyConsumptionSensorDescription] = [
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         suggested_display_precision=2,
         consumption_type=ConsumptionType.WATER_TANK,
-        exists_fn=lambda coordinator: coordinator.device.has_tank,
+        exists_fn=lambda coordinator: coordinator.data.has_tank,
         entity_registry_enabled_default=False
     ),
     AquareaEnergyConsumptionSensorDescription(
@@ -112,7 +134,7 @@ ENERGY_SENSORS: list[AquareaEnergyConsumptionSensorDescription] = [
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         suggested_display_precision=2,
         consumption_type=ConsumptionType.COOL,
-        exists_fn=lambda coordinator: any(zone.cool_mode for zone in coordinator.device.zones.values()),
+        exists_fn=lambda coordinator: any(zone.cool_mode for zone in coordinator.data.zones),
         entity_registry_enabled_default=False
     ),
     AquareaEnergyConsumptionSensorDescription(
@@ -128,6 +150,42 @@ ENERGY_SENSORS: list[AquareaEnergyConsumptionSensorDescription] = [
     ),
 ]
 
+def _trace_transition(
+    sensor: AquareaBaseEntity,
+    transition: str,
+    hours: list[HourConsumption],
+) -> None:
+    """Record a transition of the energy consumption state machine."""
+    if not sensor.coordinator.tracer.enabled:
+        return
+
+    sensor.coordinator.tracer.record(
+        EVENT_ENERGY_TRANSITION,
+        sensor.coordinator.device.device_id,
+        entity_id=sensor.entity_id,
+        transition=transition,
+        period=sensor.period_being_processed,
+        hours=[value for _, value in hours],
+        value=sensor.native_value,
+    )
+
+
+def _get_consumption_range(
+    coordinator: AquareaDataUpdateCoordinator,
+    consumption_type: ConsumptionType,
+    start: datetime,
+    end: datetime,
+) -> list[HourConsumption]:
+    """Return the consumption of every hour from start to end, both included.
+
+    Raises DataNotAvailableError when the data of any hour is not yet available.
+    """
+    return [
+        (hour, coordinator.get_consumption(hour, consumption_type))
+        for hour in hour_range(start, end)
+    ]
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -143,6 +201,18 @@ async def async_setup_entry(
 
     for coordinator in data.values():
         entities.append(OutdoorTemperatureSensor(coordinator))
+        entities.append(ErrorSensor(coordinator))
+        entities.extend(
+            [
+                DefrostCountSensor(coordinator),
+                DefrostAverageDurationSensor(coordinator),
+                LastDefrostSensor(coordinator),
+                HeatingDegreeHoursSensor(coordinator),
+                HeatingEnergyPerDegreeHourSensor(coordinator),
+            ]
+        )
+        if coordinator.watchdog.enabled:
+            entities.append(EventLoopLagSensor(coordinator))
         entities.extend(
             [
                 EnergyAccumulatedConsumptionSensor(description,coordinator)
@@ -231,6 +301,10 @@ class OutdoorTemperatureSensor(AquareaBaseEntity, SensorEntity):
         self._attr_device_class = SensorDeviceClass.TEMPERATURE
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+        self._publisher = MeasurementPublisher(
+            coordinator.publish_policies[MEASUREMENT_OUTDOOR_TEMPERATURE]
+        )
+        self._freshness_field = FIELD_TEMPERATURE_OUTDOOR
 
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -241,7 +315,223 @@ class OutdoorTemperatureSensor(AquareaBaseEntity, SensorEntity):
             self.coordinator.device.name,
         )
 
-        self._attr_native_value = self.coordinator.device.temperature_outdoor
+        value = self._publisher.publish(self.coordinator.data.temperature_outdoor)
+        if value != self._attr_native_value:
+            self._attr_native_value = value
+            self._update_last_changed()
+        # A heartbeat writes the unchanged value to the recorder again
+        self._attr_force_update = self._publisher.heartbeat
+        super()._handle_coordinator_update()
+
+
+class ErrorSensor(AquareaBaseEntity, SensorEntity):
+    """Representation of the code of the current error of a device."""
+
+    def __init__(self, coordinator: AquareaDataUpdateCoordinator) -> None:
+        """Initialize error sensor."""
+        super().__init__(coordinator)
+
+        self._attr_translation_key = "error"
+        self._attr_unique_id = f"{super().unique_id}_error"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_icon = "mdi:alert-circle-outline"
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if (error := self.coordinator.current_error) is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = None
+        else:
+            self._attr_native_value = error.error_code
+            self._attr_extra_state_attributes = {
+                ATTR_ERROR_MESSAGE: error.error_message
+            }
+        super()._handle_coordinator_update()
+
+
+class DefrostCountSensor(AquareaBaseEntity, SensorEntity):
+    """Representation of the defrost cycles of the last 24 hours."""
+
+    def __init__(self, coordinator: AquareaDataUpdateCoordinator) -> None:
+        """Initialize defrost count sensor."""
+        super().__init__(coordinator)
+
+        self._attr_translation_key = "defrost_count"
+        self._attr_unique_id = f"{super().unique_id}_defrost_count"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_icon = "mdi:snowflake-melt"
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._attr_native_value = self.coordinator.defrost.count
+        super()._handle_coordinator_update()
+
+
+class DefrostAverageDurationSensor(AquareaBaseEntity, SensorEntity):
+    """Representation of the average defrost duration of the last 24 hours."""
+
+    def __init__(self, coordinator: AquareaDataUpdateCoordinator) -> None:
+        """Initialize average defrost duration sensor."""
+        super().__init__(coordinator)
+
+        self._attr_translation_key = "defrost_average_duration"
+        self._attr_unique_id = f"{super().unique_id}_defrost_average_duration"
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_native_unit_of_measurement = UnitOfTime.SECONDS
+        self._attr_suggested_display_precision = 0
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        average = self.coordinator.defrost.average_duration
+        self._attr_native_value = (
+            average.total_seconds() if average is not None else None
+        )
+        super()._handle_coordinator_update()
+
+
+class LastDefrostSensor(AquareaBaseEntity, SensorEntity):
+    """Representation of the start of the last defrost."""
+
+    def __init__(self, coordinator: AquareaDataUpdateCoordinator) -> None:
+        """Initialize last defrost sensor."""
+        super().__init__(coordinator)
+
+        self._attr_translation_key = "last_defrost"
+        self._attr_unique_id = f"{super().unique_id}_last_defrost"
+        self._attr_device_class = SensorDeviceClass.TIMESTAMP
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._attr_native_value = self.coordinator.defrost.last_start
+        super()._handle_coordinator_update()
+
+
+class HeatingDegreeHoursSensor(AquareaBaseEntity, SensorEntity, RestoreEntity):
+    """Representation of the heating degree-hours of the day."""
+
+    def __init__(self, coordinator: AquareaDataUpdateCoordinator) -> None:
+        """Initialize heating degree-hours sensor."""
+        super().__init__(coordinator)
+
+        self._attr_translation_key = "heating_degree_hours"
+        self._attr_unique_id = f"{super().unique_id}_heating_degree_hours"
+        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        self._attr_native_unit_of_measurement = UNIT_DEGREE_HOURS
+        self._attr_suggested_display_precision = 1
+        self._attr_icon = "mdi:thermometer-minus"
+        self._day: datetime | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Call when entity about to be added to hass."""
+        if (
+            (sensor_data := await self.async_get_last_sensor_data()) is not None
+            and sensor_data.period_being_processed is not None
+            and sensor_data.period_being_processed == dt_util.start_of_local_day()
+            and isinstance(sensor_data.native_value, (int, float))
+        ):
+            # Keep counting the day from where it was before the restart
+            self._day = sensor_data.period_being_processed
+            efficiency = self.coordinator.efficiency
+            efficiency.restore_degree_hours(
+                self._day.date(), float(sensor_data.native_value)
+            )
+            self._attr_native_value = efficiency.degree_hours(self._day.date())
+
+        await super().async_added_to_hass()
+
+    @property
+    def extra_restore_state_data(self) -> AquareaSensorExtraStoredData:
+        """Return sensor specific state data to be restored."""
+        return AquareaSensorExtraStoredData(
+            self.native_value,
+            self.native_unit_of_measurement,
+            self._day,
+        )
+
+    async def async_get_last_sensor_data(self) -> AquareaSensorExtraStoredData | None:
+        """Restore native_value and the day it counts."""
+        if (restored_last_extra_data := await self.async_get_last_extra_data()) is None:
+            return None
+        return AquareaSensorExtraStoredData.from_dict(
+            restored_last_extra_data.as_dict()
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._day = dt_util.start_of_local_day()
+        self._attr_native_value = self.coordinator.efficiency.degree_hours(
+            self._day.date()
+        )
+        super()._handle_coordinator_update()
+
+
+class HeatingEnergyPerDegreeHourSensor(AquareaBaseEntity, SensorEntity):
+    """Representation of the heating energy used per degree-hour of the day."""
+
+    def __init__(self, coordinator: AquareaDataUpdateCoordinator) -> None:
+        """Initialize heating energy per degree-hour sensor."""
+        super().__init__(coordinator)
+
+        self._attr_translation_key = "heating_energy_per_degree_hour"
+        self._attr_unique_id = f"{super().unique_id}_heating_energy_per_degree_hour"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_native_unit_of_measurement = (
+            f"{UnitOfEnergy.KILO_WATT_HOUR}/{UNIT_DEGREE_HOURS}"
+        )
+        self._attr_suggested_display_precision = 3
+        self._attr_icon = "mdi:home-thermometer-outline"
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        today = dt_util.now().date()
+        efficiency = self.coordinator.efficiency
+        self._attr_native_value = efficiency.energy_per_degree_hour(today)
+        self._attr_extra_state_attributes = {
+            ATTR_YESTERDAY: efficiency.energy_per_degree_hour(
+                today - timedelta(days=1)
+            )
+        }
+        super()._handle_coordinator_update()
+
+
+class EventLoopLagSensor(AquareaBaseEntity, SensorEntity):
+    """Representation of the last event loop lag attributed to a device."""
+
+    def __init__(self, coordinator: AquareaDataUpdateCoordinator) -> None:
+        """Initialize event loop lag sensor."""
+        super().__init__(coordinator)
+
+        self._attr_translation_key = "event_loop_lag"
+        self._attr_unique_id = f"{super().unique_id}_event_loop_lag"
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+        self._attr_suggested_display_precision = 0
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        event = self.coordinator.watchdog.last_event(
+            self.coordinator.device.device_id
+        )
+
+        if event is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = None
+        else:
+            self._attr_native_value = round(event.lag * 1000, 1)
+            self._attr_extra_state_attributes = {
+                "source": event.source,
+                "detected_at": event.detected_at.isoformat(),
+            }
+
         super()._handle_coordinator_update()
 
 class EnergyAccumulatedConsumptionSensor(
@@ -286,6 +576,7 @@ class EnergyAccumulatedConsumptionSensor(
             self.native_value,
             self.native_unit_of_measurement,
             self.period_being_processed,
+            self._accumulated_period_being_processed,
         )
 
     async def async_get_last_sensor_data(
@@ -312,63 +603,41 @@ class EnergyAccumulatedConsumptionSensor(
             self.coordinator.device.name,
         )
 
-        # we need to check the value for the current hour. If the device returns None means that we don't have yet data for the current hour. However the device might still update the previous hour data.
-        device = self.coordinator.device
         now = dt_util.now().replace(minute=0, second=0, microsecond=0)
-        previous_hour = now - timedelta(hours=1)
-
-        try:
-            current_hour_consumption = device.get_or_schedule_consumption(
-                now, self.entity_description.consumption_type
-            )
-
-            previous_hour_consumption = device.get_or_schedule_consumption(
-                previous_hour, self.entity_description.consumption_type
-            )
-
-        except DataNotAvailableError:
-            # we don't have yet data for the current hour but should be available on next refresh
-            return
 
         # Stale data
-        if self._period_being_processed not in [now, previous_hour]:
+        if is_stale(self._period_being_processed, now):
             self._period_being_processed = now
             self._accumulated_period_being_processed = 0
+            _trace_transition(self, TRANSITION_STALE, [])
 
-        # 1. When we already have data for the current hour and we were still updating the previous one. This means that the previous hour data is now complete and we can update the sensor value
-        if (
-            current_hour_consumption is not None
-            and previous_hour_consumption is not None
-            and self._period_being_processed == previous_hour
-        ):
-            to_add = abs(previous_hour_consumption - self._accumulated_period_being_processed)
-            self._attr_native_value += to_add
-            # Store the previous period as completed and move to next one
-            self._period_being_processed = now
-            self._accumulated_period_being_processed = 0
-            super()._handle_coordinator_update()
+        # Reconcile every hour from the one being processed to the current one
+        try:
+            hours = _get_consumption_range(
+                self.coordinator,
+                self.entity_description.consumption_type,
+                self._period_being_processed,
+                now,
+            )
+        except DataNotAvailableError:
+            # we don't have yet data for some hour but should be available on next refresh
             return
 
-        # 2. We're still processing the previous hour data and we don't have yet the current hour data. This means that we need to update the sensor value with the previous hour data
-        if (
-            current_hour_consumption is None
-            and previous_hour_consumption is not None
-            and self._period_being_processed == previous_hour
-        ):
-            to_add = abs(previous_hour_consumption - self._accumulated_period_being_processed)
-            self._attr_native_value += to_add
-            self._accumulated_period_being_processed = previous_hour_consumption
-            super()._handle_coordinator_update()
+        state = AccumulatedState(
+            self._attr_native_value,
+            self._period_being_processed,
+            self._accumulated_period_being_processed,
+        )
+        if (result := reconcile_accumulated(state, hours, now)) is None:
             return
 
-        # 3. We're processing the current hour
-        if current_hour_consumption is not None:
-            self._period_being_processed = now
-            to_add = abs(current_hour_consumption - self._accumulated_period_being_processed)
-            self._attr_native_value += to_add
-            self._accumulated_period_being_processed = current_hour_consumption
-            super()._handle_coordinator_update()
-            return
+        state, transition = result
+        self._attr_native_value = state.total
+        self._period_being_processed = state.period
+        self._accumulated_period_being_processed = state.period_consumption
+        _trace_transition(self, transition, hours)
+        super()._handle_coordinator_update()
+
 
 class EnergyConsumptionSensor(AquareaBaseEntity, SensorEntity, RestoreEntity):
     """Representation of a Aquarea sensor."""
@@ -427,62 +696,36 @@ class EnergyConsumptionSensor(AquareaBaseEntity, SensorEntity, RestoreEntity):
             self.coordinator.device.name,
         )
 
-        # we need to check the value for the current hour. If the device returns None means that we don't have yet data for the current hour. However the device might still update the previous hour data.
-        device = self.coordinator.device
         now = dt_util.now().replace(minute=0, second=0, microsecond=0)
-        previous_hour = now - timedelta(hours=1)
-
-        try:
-            current_hour_consumption = device.get_or_schedule_consumption(
-                now, self.entity_description.consumption_type
-            )
-
-            previous_hour_consumption = device.get_or_schedule_consumption(
-                previous_hour, self.entity_description.consumption_type
-            )
-
-        except DataNotAvailableError:
-            # we don't have yet data for the current hour but should be available on next refresh
-            return
 
         # Stale data, we reset to 0 to start a new cycle
-        if self._period_being_processed not in [now, previous_hour]:
+        if is_stale(self._period_being_processed, now):
             self._period_being_processed = now
             self._attr_native_value = 0
+            _trace_transition(self, TRANSITION_STALE, [])
             super()._handle_coordinator_update()
             return
 
-        # 1. When we already have data for the current hour and we were still updating the previous one. This means that the previous hour data is now complete and we can update the sensor value
-        if (
-            current_hour_consumption is not None
-            and previous_hour_consumption is not None
-            and self._period_being_processed == previous_hour
-        ):
-            self._attr_native_value = previous_hour_consumption
-            self._period_being_processed = now
-            # Store the previous period as completed
-            super()._handle_coordinator_update()
-            # Reset the value to 0 to start the new period
-            self._attr_native_value = 0
-            super()._handle_coordinator_update()
-            # Update the value with the current hour data
-            self._attr_native_value = current_hour_consumption
-            super()._handle_coordinator_update()
+        try:
+            hours = _get_consumption_range(
+                self.coordinator,
+                self.entity_description.consumption_type,
+                self._period_being_processed,
+                now,
+            )
+        except DataNotAvailableError:
+            # we don't have yet data for some hour but should be available on next refresh
             return
 
-        # 2. We're still processing the previous hour data and we don't have yet the current hour data. This means that we need to update the sensor value with the previous hour data
-        if (
-            current_hour_consumption is None
-            and previous_hour_consumption is not None
-            and self._period_being_processed == previous_hour
-        ):
-            self._attr_native_value = previous_hour_consumption
-            super()._handle_coordinator_update()
+        state = HourlyState(self._attr_native_value or 0, self._period_being_processed)
+        if (result := reconcile_hourly(state, hours, now)) is None:
             return
 
-        # 3. We're processing the current hour
-        if current_hour_consumption is not None:
-            self._period_being_processed = now
-            self._attr_native_value = current_hour_consumption
+        writes, self._period_being_processed, transition = result
+        # Each value is a state of its own for the recorder: the total of the
+        # completed hours and the reset have to be recorded before the new hour
+        for value in writes:
+            self._attr_native_value = value
             super()._handle_coordinator_update()
-            return
+
+        _trace_transition(self, transition, hours)
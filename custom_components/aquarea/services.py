@@ -0,0 +1,326 @@
+"""Services for the Aquarea Smart Cloud integration."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.const import WEEKDAYS
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.util import dt as dt_util
+
+from .const import DEVICES, DOMAIN, PROFILER, PROFILES
+from .profiler import AquareaProfiler
+
+if TYPE_CHECKING:
+    from .coordinator import AquareaDataUpdateCoordinator
+    from .profiles import AquareaProfileStore
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_DEVICE_ID = "device_id"
+ATTR_PROFILE = "profile"
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_FORMAT = "format"
+ATTR_CONSUMPTION_TYPE = "consumption_type"
+ATTR_FILENAME = "filename"
+ATTR_TARGET = "target"
+ATTR_PROGRAM = "program"
+ATTR_DAYS = "days"
+ATTR_TIME = "time"
+ATTR_TEMPERATURE = "temperature"
+
+SERVICE_SAVE_PROFILE = "save_profile"
+SERVICE_RESTORE_PROFILE = "restore_profile"
+SERVICE_DUMP_PERFORMANCE_PROFILE = "dump_performance_profile"
+SERVICE_EXPORT_CONSUMPTION = "export_consumption"
+SERVICE_SET_PROGRAM = "set_program"
+SERVICE_CLEAR_PROGRAM = "clear_program"
+
+# Formats of export and names of ConsumptionType, export imports aioaquarea
+# and is only loaded when the service is called
+EXPORT_FORMATS = ("csv", "ndjson")
+CONSUMPTION_TYPES = ("heat", "cool", "water_tank", "total")
+MAX_EXPORT_DAYS = 366
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Required(ATTR_PROFILE): cv.string,
+    }
+)
+
+EXPORT_CONSUMPTION_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Required(ATTR_END_DATE): cv.date,
+        vol.Optional(ATTR_FORMAT, default="csv"): vol.In(EXPORT_FORMATS),
+        vol.Optional(ATTR_CONSUMPTION_TYPE, default=list(CONSUMPTION_TYPES)): vol.All(
+            cv.ensure_list, [vol.In(CONSUMPTION_TYPES)]
+        ),
+        vol.Optional(ATTR_FILENAME): cv.string,
+    }
+)
+
+# Program targets are the tank or a zone, as in programs.zone_target
+PROGRAM_TARGET = vol.Match(r"^(tank|zone_\d+)$")
+
+SET_PROGRAM_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Required(ATTR_TARGET): PROGRAM_TARGET,
+        vol.Required(ATTR_PROGRAM): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Optional(ATTR_DAYS): vol.All(
+                            cv.ensure_list, [vol.In(WEEKDAYS)]
+                        ),
+                        vol.Required(ATTR_TIME): cv.time,
+                        vol.Required(ATTR_TEMPERATURE): vol.Coerce(int),
+                    }
+                )
+            ],
+        ),
+    }
+)
+
+CLEAR_PROGRAM_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_TARGET): PROGRAM_TARGET,
+    }
+)
+
+
+def get_coordinator(hass: HomeAssistant, device_id: str) -> AquareaDataUpdateCoordinator:
+    """Return the coordinator of the Aquarea device registered under device_id."""
+    if (device := dr.async_get(hass).async_get(device_id)) is None:
+        raise HomeAssistantError(f"Unknown device: {device_id}")
+
+    for domain, aquarea_device_id in device.identifiers:
+        if domain != DOMAIN:
+            continue
+
+        for entry_id in device.config_entries:
+            devices: dict[str, AquareaDataUpdateCoordinator] = (
+                hass.data.get(DOMAIN, {}).get(entry_id, {}).get(DEVICES, {})
+            )
+            if (coordinator := devices.get(aquarea_device_id)) is not None:
+                return coordinator
+
+    raise HomeAssistantError(f"Device {device_id} is not a loaded Aquarea device")
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Set up the services of the Aquarea integration."""
+
+    async def _async_get_profiles() -> AquareaProfileStore:
+        """Return the profile store, loaded on the first profile service call."""
+        from .profiles import AquareaProfileStore
+
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        if (profiles := domain_data.get(PROFILES)) is None:
+            store = AquareaProfileStore(hass)
+            await store.async_load()
+            # Another call may have loaded it in the meantime
+            profiles = domain_data.setdefault(PROFILES, store)
+        return profiles
+
+    async def async_save_profile(call: ServiceCall) -> None:
+        """Capture the controllable state of a device into a profile."""
+        from .profiles import capture_settings
+
+        coordinator = get_coordinator(hass, call.data[ATTR_DEVICE_ID])
+        profiles = await _async_get_profiles()
+        await profiles.async_save(
+            coordinator.device.device_id,
+            call.data[ATTR_PROFILE],
+            capture_settings(coordinator.device),
+        )
+
+    async def async_restore_profile(call: ServiceCall) -> ServiceResponse:
+        """Restore a profile, sending only the settings that differ."""
+        from .profiles import async_restore_settings, skipped_temperatures
+
+        coordinator = get_coordinator(hass, call.data[ATTR_DEVICE_ID])
+        profile = call.data[ATTR_PROFILE]
+        profiles = await _async_get_profiles()
+
+        if (settings := profiles.get(coordinator.device.device_id, profile)) is None:
+            raise HomeAssistantError(
+                f"Profile {profile} not found for device {coordinator.device.name}"
+            )
+
+        changes = await async_restore_settings(coordinator, settings)
+        skipped = skipped_temperatures(coordinator.device, settings)
+        _LOGGER.debug(
+            "Restored profile %s of device %s with %s changes",
+            profile,
+            coordinator.device.device_id,
+            len(changes),
+        )
+        for setting, reason in skipped.items():
+            _LOGGER.warning(
+                "Profile %s of device %s skipped %s: %s",
+                profile,
+                coordinator.device.device_id,
+                setting,
+                reason,
+            )
+
+        return {
+            "changes": [change.as_dict() for change in changes],
+            "skipped": skipped,
+        }
+
+    async def async_dump_performance_profile(call: ServiceCall) -> ServiceResponse:
+        """Return the entity update profile of every entry with profiling on."""
+        profiles: dict[str, list[dict[str, Any]]] = {}
+
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            if (data := hass.data[DOMAIN].get(entry.entry_id)) is None:
+                continue
+
+            profiler: AquareaProfiler = data[PROFILER]
+            if profiler.enabled:
+                profiler.async_log_summary()
+                profiles[entry.title] = profiler.profile()
+
+        return {"profiles": profiles}
+
+    async def async_export_consumption(call: ServiceCall) -> ServiceResponse:
+        """Export the hourly consumption of devices to a file."""
+        from aioaquarea import ConsumptionType
+
+        from .export import async_export_consumption, export_path
+
+        start = call.data[ATTR_START_DATE]
+        end = call.data[ATTR_END_DATE]
+        if end < start:
+            raise HomeAssistantError("The end date is before the start date")
+        if end > dt_util.now().date():
+            raise HomeAssistantError("The end date is in the future")
+        if end - start >= timedelta(days=MAX_EXPORT_DAYS):
+            raise HomeAssistantError(
+                f"The export is limited to {MAX_EXPORT_DAYS} days"
+            )
+
+        coordinators = [
+            get_coordinator(hass, device_id) for device_id in call.data[ATTR_DEVICE_ID]
+        ]
+        export_format = call.data[ATTR_FORMAT]
+        filename = call.data.get(
+            ATTR_FILENAME,
+            f"aquarea_consumption_{start.isoformat()}_{end.isoformat()}.{export_format}",
+        )
+        try:
+            path = export_path(hass, filename)
+        except ValueError as err:
+            raise HomeAssistantError(str(err)) from err
+
+        result = await async_export_consumption(
+            hass,
+            coordinators,
+            start,
+            end,
+            [
+                ConsumptionType[consumption_type.upper()]
+                for consumption_type in call.data[ATTR_CONSUMPTION_TYPE]
+            ],
+            export_format,
+            path,
+        )
+        _LOGGER.debug("Exported consumption to %s: %s", path, result)
+        return result
+
+    async def async_set_program(call: ServiceCall) -> None:
+        """Store the weekly program of a zone or the tank of a device."""
+        from .programs import (
+            PROGRAM_DAYS,
+            PROGRAM_TEMPERATURE,
+            PROGRAM_TIME,
+            TARGET_TANK,
+            async_get_program_store,
+            zone_target,
+        )
+
+        coordinator = get_coordinator(hass, call.data[ATTR_DEVICE_ID])
+        target = call.data[ATTR_TARGET]
+        snapshot = coordinator.data
+        if target not in (
+            *(zone_target(zone_id) for zone_id in snapshot.zone_ids),
+            *((TARGET_TANK,) if snapshot.has_tank else ()),
+        ):
+            raise HomeAssistantError(
+                f"Device {coordinator.device.name} has no {target}"
+            )
+
+        programs = await async_get_program_store(hass)
+        await programs.async_set(
+            coordinator.device.device_id,
+            target,
+            [
+                {
+                    PROGRAM_DAYS: transition.get(ATTR_DAYS),
+                    PROGRAM_TIME: transition[ATTR_TIME].strftime("%H:%M"),
+                    PROGRAM_TEMPERATURE: transition[ATTR_TEMPERATURE],
+                }
+                for transition in call.data[ATTR_PROGRAM]
+            ],
+        )
+
+    async def async_clear_program(call: ServiceCall) -> None:
+        """Remove the program of a target of a device, or all of them."""
+        from .programs import async_get_program_store
+
+        coordinator = get_coordinator(hass, call.data[ATTR_DEVICE_ID])
+        programs = await async_get_program_store(hass)
+        await programs.async_clear(
+            coordinator.device.device_id, call.data.get(ATTR_TARGET)
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SAVE_PROFILE, async_save_profile, schema=PROFILE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESTORE_PROFILE,
+        async_restore_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DUMP_PERFORMANCE_PROFILE,
+        async_dump_performance_profile,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_CONSUMPTION,
+        async_export_consumption,
+        schema=EXPORT_CONSUMPTION_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_PROGRAM, async_set_program, schema=SET_PROGRAM_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CLEAR_PROGRAM,
+        async_clear_program,
+        schema=CLEAR_PROGRAM_SCHEMA,
+    )
@@ -0,0 +1,270 @@
+"""Immutable snapshot of the state of a device taken on every refresh."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any
+
+from aioaquarea import (
+    Device,
+    DeviceAction,
+    DeviceModeStatus,
+    ExtendedOperationMode,
+    ForceDHW,
+    ForceHeater,
+    HolidayTimer,
+    OperationStatus,
+    PowerfulTime,
+    QuietMode,
+    SpecialStatus,
+    Tank,
+)
+from aioaquarea.data import DeviceZone
+
+FIELD_TEMPERATURE_OUTDOOR = "temperature_outdoor"
+FIELD_TANK_TEMPERATURE = "tank.temperature"
+
+
+def zone_field(zone_id: int, field: str) -> str:
+    """Return the freshness key of a field of a zone."""
+    return f"zones.{zone_id}.{field}"
+
+
+def _serialize(value: Any) -> Any:
+    """Return the serializable form of a snapshot field."""
+    return value.name.lower() if isinstance(value, Enum) else value
+
+
+@dataclass(frozen=True, slots=True)
+class ZoneSnapshot:
+    """State of a zone of the device."""
+
+    zone_id: int
+    name: str
+    operation_status: OperationStatus
+    temperature: int
+    cool_mode: bool
+    supports_set_temperature: bool
+    heat_target_temperature: int | None
+    cool_target_temperature: int | None
+    heat_min: int | None
+    heat_max: int | None
+    cool_min: int | None
+    cool_max: int | None
+
+    @classmethod
+    def from_zone(cls, zone: DeviceZone) -> ZoneSnapshot:
+        """Take a snapshot of the zone."""
+        return cls(
+            zone_id=zone.zone_id,
+            name=zone.name,
+            operation_status=zone.operation_status,
+            temperature=zone.temperature,
+            cool_mode=zone.cool_mode,
+            supports_set_temperature=zone.supports_set_temperature,
+            heat_target_temperature=zone.heat_target_temperature,
+            cool_target_temperature=zone.cool_target_temperature,
+            heat_min=zone.heat_min,
+            heat_max=zone.heat_max,
+            cool_min=zone.cool_min,
+            cool_max=zone.cool_max,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the zone as a serializable dict."""
+        return {
+            field: _serialize(getattr(self, field)) for field in self.__slots__
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class TankSnapshot:
+    """State of the water tank of the device."""
+
+    operation_status: OperationStatus
+    temperature: int
+    target_temperature: int
+    heat_min: int
+    heat_max: int
+
+    @classmethod
+    def from_tank(cls, tank: Tank) -> TankSnapshot:
+        """Take a snapshot of the tank."""
+        return cls(
+            operation_status=tank.operation_status,
+            temperature=tank.temperature,
+            target_temperature=tank.target_temperature,
+            heat_min=tank.heat_min,
+            heat_max=tank.heat_max,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the tank as a serializable dict."""
+        return {
+            field: _serialize(getattr(self, field)) for field in self.__slots__
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceSnapshot:
+    """State of the device read by the entities.
+
+    The zones are stored sorted by zone id, entities resolve the position of
+    their zone once with zone_index and read it by index afterwards.
+    """
+
+    mode: ExtendedOperationMode
+    current_action: DeviceAction
+    is_on_error: bool
+    device_mode_status: DeviceModeStatus
+    support_special_status: bool
+    special_status: SpecialStatus | None
+    quiet_mode: QuietMode
+    force_dhw: ForceDHW
+    force_heater: ForceHeater
+    holiday_timer: HolidayTimer
+    powerful_time: PowerfulTime
+    temperature_outdoor: int
+    tank: TankSnapshot | None
+    zone_ids: tuple[int, ...]
+    zones: tuple[ZoneSnapshot, ...]
+
+    @classmethod
+    def from_device(cls, device: Device) -> DeviceSnapshot:
+        """Take a snapshot of the device."""
+        zones = tuple(
+            ZoneSnapshot.from_zone(zone)
+            for _, zone in sorted(device.zones.items())
+        )
+
+        return cls(
+            mode=device.mode,
+            current_action=device.current_action,
+            is_on_error=device.is_on_error,
+            device_mode_status=device.device_mode_status,
+            support_special_status=device.support_special_status,
+            special_status=device.special_status,
+            quiet_mode=device.quiet_mode,
+            force_dhw=device.force_dhw,
+            force_heater=device.force_heater,
+            holiday_timer=device.holiday_timer,
+            powerful_time=device.powerful_time,
+            temperature_outdoor=device.temperature_outdoor,
+            tank=TankSnapshot.from_tank(device.tank) if device.has_tank else None,
+            zone_ids=tuple(zone.zone_id for zone in zones),
+            zones=zones,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the snapshot as a serializable dict, zones keyed by id."""
+        data = {
+            field: _serialize(getattr(self, field))
+            for field in self.__slots__
+            if field not in ("tank", "zone_ids", "zones")
+        }
+        data["tank"] = self.tank.as_dict() if self.tank is not None else None
+        data["zones"] = {str(zone.zone_id): zone.as_dict() for zone in self.zones}
+        return data
+
+    @property
+    def has_tank(self) -> bool:
+        """Return True if the device has a water tank."""
+        return self.tank is not None
+
+    def zone_index(self, zone_id: int) -> int:
+        """Return the position of the zone in zones."""
+        return self.zone_ids.index(zone_id)
+
+    def zone(self, zone_id: int) -> ZoneSnapshot:
+        """Return the snapshot of the zone."""
+        return self.zones[self.zone_ids.index(zone_id)]
+
+
+def _fields(snapshot: DeviceSnapshot) -> list[tuple[str, Any]]:
+    """Return the fields of the snapshot keyed by their path."""
+    fields = [
+        (field, getattr(snapshot, field))
+        for field in snapshot.__slots__
+        if field not in ("tank", "zone_ids", "zones")
+    ]
+    if snapshot.tank is not None:
+        fields.extend(
+            (f"tank.{field}", getattr(snapshot.tank, field))
+            for field in snapshot.tank.__slots__
+        )
+    for zone in snapshot.zones:
+        fields.extend(
+            (zone_field(zone.zone_id, field), getattr(zone, field))
+            for field in zone.__slots__
+        )
+    return fields
+
+
+class SnapshotFreshness:
+    """When each field of the snapshots of a device changed and was confirmed.
+
+    A field is confirmed by every refresh that returns a value for it. A field
+    that hasn't changed for longer than stale_after is considered stale, as
+    the cloud may be serving a cached value.
+    """
+
+    def __init__(self, stale_after: timedelta | None) -> None:
+        """Initialize the freshness, stale_after None to never go stale."""
+        self._stale_after = stale_after
+        self._snapshot: DeviceSnapshot | None = None
+        # Fields with a value in the last snapshot
+        self._present: list[str] = []
+        self._values: dict[str, Any] = {}
+        self._last_changed: dict[str, datetime] = {}
+        self._last_confirmed: dict[str, datetime] = {}
+
+    def update(self, snapshot: DeviceSnapshot, now: datetime) -> None:
+        """Record the fields of a new snapshot of the device."""
+        # The coordinator keeps the previous snapshot when nothing changed
+        if snapshot is self._snapshot:
+            for field in self._present:
+                self._last_confirmed[field] = now
+            return
+
+        self._snapshot = snapshot
+        self._present = []
+        for field, value in _fields(snapshot):
+            if value is None:
+                continue
+            self._present.append(field)
+            self._last_confirmed[field] = now
+            if field not in self._values or self._values[field] != value:
+                self._values[field] = value
+                self._last_changed[field] = now
+
+    def last_changed(self, field: str) -> datetime | None:
+        """Return when the field last changed."""
+        return self._last_changed.get(field)
+
+    def last_confirmed(self, field: str) -> datetime | None:
+        """Return when a refresh last returned the field."""
+        return self._last_confirmed.get(field)
+
+    def is_stale(self, field: str, now: datetime) -> bool:
+        """Return True if the field hasn't changed within stale_after."""
+        if self._stale_after is None or (
+            last_changed := self._last_changed.get(field)
+        ) is None:
+            return False
+        return now - last_changed > self._stale_after
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the timestamps of every field."""
+        return {
+            "stale_after": (
+                self._stale_after.total_seconds() if self._stale_after else None
+            ),
+            "fields": {
+                field: {
+                    "last_changed": self._last_changed[field].isoformat(),
+                    "last_confirmed": confirmed.isoformat(),
+                }
+                for field, confirmed in self._last_confirmed.items()
+            },
+        }
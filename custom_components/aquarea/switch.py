@@ -8,9 +8,9 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import AquareaBaseEntity
 from .const import DEVICES, DOMAIN
 from .coordinator import AquareaDataUpdateCoordinator
+from .entity import AquareaBaseEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,7 +32,7 @@ async def async_setup_entry(
         [
             AquareaForceDHWSwitch(coordinator)
             for coordinator in data.values()
-            if coordinator.device.has_tank
+            if coordinator.data.has_tank
         ]
     )
 
@@ -60,15 +60,19 @@ class AquareaForceDHWSwitch(AquareaBaseEntity, SwitchEntity):
     @property
     def is_on(self) -> bool:
         """If force DHW mode is enabled."""
-        return self.coordinator.device.force_dhw is aioaquarea.ForceDHW.ON
+        return self.coordinator.data.force_dhw is aioaquarea.ForceDHW.ON
 
     async def async_turn_on(self) -> None:
         """Turn on Force DHW."""
-        await self.coordinator.device.set_force_dhw(aioaquarea.ForceDHW.ON)
+        await self.coordinator.async_execute(
+            self.coordinator.device.set_force_dhw, aioaquarea.ForceDHW.ON
+        )
 
     async def async_turn_off(self) -> None:
         """Turn off Force DHW."""
-        await self.coordinator.device.set_force_dhw(aioaquarea.ForceDHW.OFF)
+        await self.coordinator.async_execute(
+            self.coordinator.device.set_force_dhw, aioaquarea.ForceDHW.OFF
+        )
 
 
 class AquareaForceHeaterSwitch(AquareaBaseEntity, SwitchEntity):
@@ -89,15 +93,19 @@ class AquareaForceHeaterSwitch(AquareaBaseEntity, SwitchEntity):
     @property
     def is_on(self) -> bool:
         """If force heater mode is enabled."""
-        return self.coordinator.device.force_heater is aioaquarea.ForceHeater.ON
+        return self.coordinator.data.force_heater is aioaquarea.ForceHeater.ON
 
     async def async_turn_on(self) -> None:
         """Turn on Force heater."""
-        await self.coordinator.device.set_force_heater(aioaquarea.ForceHeater.ON)
+        await self.coordinator.async_execute(
+            self.coordinator.device.set_force_heater, aioaquarea.ForceHeater.ON
+        )
 
     async def async_turn_off(self) -> None:
         """Turn off Force heater."""
-        await self.coordinator.device.set_force_heater(aioaquarea.ForceHeater.OFF)
+        await self.coordinator.async_execute(
+            self.coordinator.device.set_force_heater, aioaquarea.ForceHeater.OFF
+        )
 
 class AquareaHolidayTimerSwitch(AquareaBaseEntity, SwitchEntity):
     """Representation of an Aquarea switch."""
@@ -117,12 +125,16 @@ class AquareaHolidayTimerSwitch(AquareaBaseEntity, SwitchEntity):
     @property
     def is_on(self) -> bool:
         """If the holiday timer mode is enabled."""
-        return self.coordinator.device.holiday_timer is aioaquarea.HolidayTimer.ON
+        return self.coordinator.data.holiday_timer is aioaquarea.HolidayTimer.ON
 
     async def async_turn_on(self) -> None:
         """Turn on Holiday Timer."""
-        await self.coordinator.device.set_holiday_timer(aioaquarea.HolidayTimer.ON)
+        await self.coordinator.async_execute(
+            self.coordinator.device.set_holiday_timer, aioaquarea.HolidayTimer.ON
+        )
 
     async def async_turn_off(self) -> None:
         """Turn off Holiday Timer."""
-        await self.coordinator.device.set_holiday_timer(aioaquarea.HolidayTimer.OFF)
+        await self.coordinator.async_execute(
+            self.coordinator.device.set_holiday_timer, aioaquarea.HolidayTimer.OFF
+        )
@@ -0,0 +1,57 @@
+"""Fixed-size trace of the refresh cycles, dumped in the diagnostics."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+TRACE_BUFFER_SIZE = 1000
+
+EVENT_REFRESH_START = "refresh_start"
+EVENT_REFRESH_END = "refresh_end"
+EVENT_API_CALL = "api_call"
+EVENT_COMMAND = "command"
+EVENT_ENERGY_TRANSITION = "energy_transition"
+
+
+class AquareaTracer:
+    """Ring buffer of structured trace events.
+
+    Recording is a no-op while the tracer is disabled, so the trace points
+    can stay in the hot paths.
+    """
+
+    def __init__(self, enabled: bool = False, size: int = TRACE_BUFFER_SIZE) -> None:
+        """Initialize the tracer."""
+        self.enabled = enabled
+        self._events: deque[tuple[datetime, str, str, dict[str, Any]]] = deque(
+            maxlen=size
+        )
+
+    @callback
+    def record(self, event: str, device_id: str, **data: Any) -> None:
+        """Record a trace event of a device."""
+        if self.enabled:
+            self._events.append((dt_util.utcnow(), event, device_id, data))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the trace, oldest event first."""
+        return {
+            "enabled": self.enabled,
+            "size": self._events.maxlen,
+            "events": [
+                {
+                    "time": time.isoformat(),
+                    "event": event,
+                    "device_id": device_id,
+                    **{
+                        key: value.isoformat() if isinstance(value, datetime) else value
+                        for key, value in data.items()
+                    },
+                }
+                for time, event, device_id, data in self._events
+            ],
+        }
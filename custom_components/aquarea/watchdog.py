@@ -0,0 +1,162 @@
+"""Event loop lag watchdog for the refresh cycles of the integration."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from functools import wraps
+import inspect
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# How often the loop is probed while a refresh cycle is running
+PROBE_INTERVAL_SECONDS = 0.05
+LAG_LOG_SIZE = 50
+
+SOURCE_REFRESH = "refresh"
+
+
+@dataclass(frozen=True, slots=True)
+class LoopLagEvent:
+    """A lag of the event loop over the threshold."""
+
+    device_id: str | None
+    source: str
+    lag: float
+    detected_at: datetime
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the event as a serializable dict."""
+        return {
+            "device_id": self.device_id,
+            "source": self.source,
+            "lag_ms": round(self.lag * 1000, 1),
+            "detected_at": self.detected_at.isoformat(),
+        }
+
+
+class AquareaLoopWatchdog:
+    """Measure the event loop scheduling lag during the refresh cycles.
+
+    While at least one coordinator is refreshing, the loop is probed every
+    PROBE_INTERVAL_SECONDS. Lags over the threshold are attributed to the
+    entity update handler that blocked the loop when it was one of ours,
+    otherwise to the refresh of the device that was running at the time.
+    """
+
+    def __init__(self, hass: HomeAssistant, threshold: float) -> None:
+        """Initialize the watchdog, threshold in seconds."""
+        self._hass = hass
+        self._threshold = threshold
+        self._cycles: dict[str, int] = {}
+        self._handle: asyncio.TimerHandle | None = None
+        self._expected = 0.0
+        self._attributed = False
+        self._events: deque[LoopLagEvent] = deque(maxlen=LAG_LOG_SIZE)
+        self._last_events: dict[str | None, LoopLagEvent] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if the watchdog is measuring the loop lag."""
+        return self._threshold > 0
+
+    @property
+    def events(self) -> list[LoopLagEvent]:
+        """Return the rolling log of lag events, oldest first."""
+        return list(self._events)
+
+    def last_event(self, device_id: str) -> LoopLagEvent | None:
+        """Return the last lag event attributed to the device."""
+        return self._last_events.get(device_id)
+
+    @callback
+    def async_start_cycle(self, device_id: str) -> None:
+        """Start probing the loop while the device refreshes."""
+        if not self.enabled:
+            return
+
+        self._cycles[device_id] = self._cycles.get(device_id, 0) + 1
+        if self._handle is None:
+            self._async_schedule_probe()
+
+    @callback
+    def async_end_cycle(self, device_id: str) -> None:
+        """Stop probing for the device once its refresh cycle is done."""
+        if (cycles := self._cycles.get(device_id, 0)) <= 1:
+            self._cycles.pop(device_id, None)
+        else:
+            self._cycles[device_id] = cycles - 1
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop probing the loop."""
+        self._cycles.clear()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def wrap(self, device_id: str, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Return the update callback timed against the lag threshold."""
+        owner = getattr(inspect.unwrap(update_callback), "__self__", None)
+
+        @callback
+        @wraps(update_callback)
+        def _watched_update() -> None:
+            start = time.perf_counter()
+            try:
+                update_callback()
+            finally:
+                if (elapsed := time.perf_counter() - start) > self._threshold:
+                    # The entity id is only known once the entity is added
+                    source = getattr(owner, "entity_id", None) or getattr(
+                        update_callback, "__qualname__", "listener"
+                    )
+                    self._record(device_id, source, elapsed)
+                    self._attributed = True
+
+        return _watched_update
+
+    @callback
+    def _async_schedule_probe(self) -> None:
+        self._expected = self._hass.loop.time() + PROBE_INTERVAL_SECONDS
+        self._attributed = False
+        self._handle = self._hass.loop.call_at(self._expected, self._probe)
+
+    @callback
+    def _probe(self) -> None:
+        lag = self._hass.loop.time() - self._expected
+
+        if lag > self._threshold and not self._attributed:
+            # Only one refresh running means we know which device was busy
+            device_id = next(iter(self._cycles)) if len(self._cycles) == 1 else None
+            self._record(device_id, SOURCE_REFRESH, lag)
+
+        if self._cycles:
+            self._async_schedule_probe()
+        else:
+            self._handle = None
+
+    def _record(self, device_id: str | None, source: str, lag: float) -> None:
+        event = LoopLagEvent(device_id, source, lag, dt_util.utcnow())
+        self._events.append(event)
+        self._last_events[device_id] = event
+        _LOGGER.debug(
+            "Event loop lag of %.1f ms attributed to %s of device %s",
+            lag * 1000,
+            source,
+            device_id,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the rolling log of lag events."""
+        return {
+            "threshold_ms": round(self._threshold * 1000, 1),
+            "events": [event.as_dict() for event in self._events],
+        }
@@ -20,9 +20,10 @@ from homeassistant.const import (
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import AquareaBaseEntity
 from .const import DEVICES, DOMAIN, HEATING, IDLE
 from .coordinator import AquareaDataUpdateCoordinator
+from .entity import AquareaBaseEntity
+from .snapshot import FIELD_TANK_TEMPERATURE
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,7 +43,7 @@ async def async_setup_entry(
         [
             WaterHeater(coordinator)
             for coordinator in data.values()
-            if coordinator.device.has_tank
+            if coordinator.data.has_tank
         ]
     )
 
@@ -65,6 +66,7 @@ class WaterHeater(AquareaBaseEntity, WaterHeaterEntity):
         self._attr_operation_list = [HEATING, STATE_OFF]
         self._attr_precision = PRECISION_WHOLE
         self._attr_target_temperature_step = 1
+        self._freshness_field = FIELD_TANK_TEMPERATURE
         self._update_temperature()
         self._update_operation_state()
 
@@ -82,12 +84,12 @@ class WaterHeater(AquareaBaseEntity, WaterHeaterEntity):
         super()._handle_coordinator_update()
 
     def _update_operation_state(self) -> None:
-        if self.coordinator.device.tank.operation_status == OperationStatus.OFF:
+        if self.coordinator.data.tank.operation_status == OperationStatus.OFF:
             self._attr_state = STATE_OFF
             self._attr_current_operation = STATE_OFF
             self._attr_icon = (
                 "mdi:water-boiler-alert"
-                if self.coordinator.device.is_on_error
+                if self.coordinator.data.is_on_error
                 else "mdi:water-boiler-off"
             )
         else:
@@ -95,15 +97,17 @@ class WaterHeater(AquareaBaseEntity, WaterHeaterEntity):
             self._attr_state = STATE_HEAT_PUMP
             self._attr_current_operation = (
                 HEATING
-                if self.coordinator.device.current_action == DeviceAction.HEATING_WATER
+                if self.coordinator.data.current_action == DeviceAction.HEATING_WATER
                 else IDLE
             )
 
     def _update_temperature(self) -> None:
-        self._attr_min_temp = self.coordinator.device.tank.heat_min
-        self._attr_max_temp = self.coordinator.device.tank.heat_max
-        self._attr_target_temperature = self.coordinator.device.tank.target_temperature
-        self._attr_current_temperature = self.coordinator.device.tank.temperature
+        self._attr_min_temp = self.coordinator.data.tank.heat_min
+        self._attr_max_temp = self.coordinator.data.tank.heat_max
+        self._attr_target_temperature = self.coordinator.data.tank.target_temperature
+        if self.coordinator.data.tank.temperature != self._attr_current_temperature:
+            self._attr_current_temperature = self.coordinator.data.tank.temperature
+            self._update_last_changed()
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
@@ -114,7 +118,9 @@ class WaterHeater(AquareaBaseEntity, WaterHeaterEntity):
                 self.coordinator.device.device_id,
                 str(temperature),
             )
-            await self.coordinator.device.tank.set_target_temperature(int(temperature))
+            await self.coordinator.async_execute(
+                self.coordinator.device.tank.set_target_temperature, int(temperature)
+            )
 
     async def async_set_operation_mode(self, operation_mode):
         _LOGGER.debug(
@@ -123,6 +129,6 @@ class WaterHeater(AquareaBaseEntity, WaterHeaterEntity):
             operation_mode,
         )
         if operation_mode == HEATING:
-            await self.coordinator.device.tank.turn_on()
+            await self.coordinator.async_execute(self.coordinator.device.tank.turn_on)
         elif operation_mode == STATE_OFF:
-            await self.coordinator.device.tank.turn_off()
+            await self.coordinator.async_execute(self.coordinator.device.tank.turn_off)
@@ -0,0 +1,168 @@
+"""WebSocket API of the Aquarea Smart Cloud integration."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt as dt_util
+
+from .const import SIGNAL_DEVICE_LOADED, SIGNAL_DEVICE_UNLOADED
+from .services import ATTR_DEVICE_ID, get_coordinator
+
+if TYPE_CHECKING:
+    from aioaquarea import ConsumptionType
+
+    from .coordinator import AquareaDataUpdateCoordinator
+    from .snapshot import DeviceSnapshot
+
+TYPE_SUBSCRIBE_DEVICE = "aquarea/subscribe_device"
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register the WebSocket commands of the Aquarea integration."""
+    websocket_api.async_register_command(hass, websocket_subscribe_device)
+
+
+def _consumption_types(snapshot: DeviceSnapshot) -> list[ConsumptionType]:
+    """Return the consumption types reported for the device."""
+    from aioaquarea import ConsumptionType
+
+    consumption_types = [ConsumptionType.HEAT, ConsumptionType.TOTAL]
+    if any(zone.cool_mode for zone in snapshot.zones):
+        consumption_types.append(ConsumptionType.COOL)
+    if snapshot.has_tank:
+        consumption_types.append(ConsumptionType.WATER_TANK)
+    return consumption_types
+
+
+def _device_state(coordinator: AquareaDataUpdateCoordinator) -> dict[str, Any]:
+    """Return the snapshot of the device with the consumption of this hour."""
+    # Loaded with the entries, a device can't be subscribed to before that
+    from aioaquarea import DataNotAvailableError
+
+    state = coordinator.data.as_dict()
+    now = dt_util.now()
+    consumption: dict[str, float | None] = {}
+
+    # The cloud only reports the consumption of the features of the device
+    for consumption_type in _consumption_types(coordinator.data):
+        try:
+            consumption[consumption_type.name.lower()] = coordinator.get_consumption(
+                now, consumption_type
+            )
+        except DataNotAvailableError:
+            consumption[consumption_type.name.lower()] = None
+
+    state["consumption"] = consumption
+    return state
+
+
+def _delta(previous: dict[str, Any], current: dict[str, Any]) -> dict[str, Any]:
+    """Return the fields of current that differ from previous.
+
+    Nested dicts are diffed recursively, removed keys are sent as None.
+    """
+    delta: dict[str, Any] = {}
+
+    for key, value in current.items():
+        old = previous.get(key)
+        if isinstance(value, dict) and isinstance(old, dict):
+            if nested := _delta(old, value):
+                delta[key] = nested
+        elif key not in previous or value != old:
+            delta[key] = value
+
+    for key in previous.keys() - current.keys():
+        delta[key] = None
+
+    return delta
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): TYPE_SUBSCRIBE_DEVICE,
+        vol.Required(ATTR_DEVICE_ID): str,
+    }
+)
+@callback
+def websocket_subscribe_device(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subscribe to the state of a device.
+
+    The first event carries the full state of the device, the next ones only
+    the fields changed by each refresh. The subscription follows the device
+    across reloads of its entry: an unloaded event is sent when the entry is
+    unloaded and a new full state once it is loaded again.
+    """
+    try:
+        coordinator = get_coordinator(hass, msg[ATTR_DEVICE_ID])
+    except HomeAssistantError as err:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, str(err))
+        return
+
+    device_id = coordinator.device.device_id
+    state = _device_state(coordinator)
+
+    @callback
+    def _async_device_updated() -> None:
+        nonlocal state
+        current = _device_state(coordinator)
+        if delta := _delta(state, current):
+            state = current
+            connection.send_message(
+                websocket_api.event_message(msg["id"], {"delta": delta})
+            )
+
+    remove_listener: CALLBACK_TYPE | None = coordinator.async_add_listener(
+        _async_device_updated
+    )
+
+    @callback
+    def _async_device_unloaded(unloaded: AquareaDataUpdateCoordinator) -> None:
+        nonlocal remove_listener
+        if unloaded is not coordinator or remove_listener is None:
+            return
+        remove_listener()
+        remove_listener = None
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"unloaded": True})
+        )
+
+    @callback
+    def _async_device_loaded(loaded: AquareaDataUpdateCoordinator) -> None:
+        nonlocal coordinator, remove_listener, state
+        if loaded.device.device_id != device_id or loaded is coordinator:
+            return
+        if remove_listener is not None:
+            remove_listener()
+        coordinator = loaded
+        remove_listener = coordinator.async_add_listener(_async_device_updated)
+        state = _device_state(coordinator)
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"snapshot": state})
+        )
+
+    remove_dispatchers = [
+        async_dispatcher_connect(hass, SIGNAL_DEVICE_UNLOADED, _async_device_unloaded),
+        async_dispatcher_connect(hass, SIGNAL_DEVICE_LOADED, _async_device_loaded),
+    ]
+
+    @callback
+    def _async_unsubscribe() -> None:
+        for remove_dispatcher in remove_dispatchers:
+            remove_dispatcher()
+        if remove_listener is not None:
+            remove_listener()
+
+    connection.subscriptions[msg["id"]] = _async_unsubscribe
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(msg["id"], {"snapshot": state}))
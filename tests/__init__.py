@@ -0,0 +1 @@
+"""Tests for the Aquarea Smart Cloud integration."""
@@ -0,0 +1,16 @@
+"""Fixtures for the Aquarea Smart Cloud tests."""
+from __future__ import annotations
+
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
+
+from .fakes import FakeClient
+
+
+@pytest.fixture
+def fake_client() -> Generator[type[FakeClient], None, None]:
+    """Serve the fake device in place of Aquarea Smart Cloud."""
+    with patch("aioaquarea.Client", FakeClient):
+        yield FakeClient
@@ -0,0 +1,251 @@
+"""Fakes of Aquarea Smart Cloud and of the clock."""
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+from aioaquarea import (
+    ConsumptionType,
+    DataNotAvailableError,
+    Device,
+    DeviceModeStatus,
+    ExtendedOperationMode,
+    ForceDHW,
+    ForceHeater,
+    HolidayTimer,
+    OperationStatus,
+    PowerfulTime,
+    QuietMode,
+)
+from aioaquarea.data import (
+    DeviceInfo,
+    DeviceStatus,
+    DeviceZoneInfo,
+    DeviceZoneStatus,
+    Tank,
+    TankStatus,
+)
+
+from custom_components.aquarea.energy import HourConsumption, hour_range
+
+ONE_HOUR = timedelta(hours=1)
+
+DEVICE_ID = "device-1"
+LONG_ID = "long-1"
+USERNAME = "user@example.com"
+
+
+class FakeClock:
+    """A clock moved by hand, in the timezone of its start.
+
+    Time is kept in UTC, so moving it across a DST change behaves like the
+    wall clock of a device does.
+    """
+
+    def __init__(self, start: datetime) -> None:
+        """Initialize the clock at start, timezone aware."""
+        self._now = start.astimezone(UTC)
+        self._timezone = start.tzinfo
+
+    @property
+    def now(self) -> datetime:
+        """Return the current local time."""
+        return self._now.astimezone(self._timezone)
+
+    @property
+    def hour(self) -> datetime:
+        """Return the start of the current local hour."""
+        return self._now.replace(minute=0, second=0, microsecond=0).astimezone(
+            self._timezone
+        )
+
+    def advance(self, delta: timedelta = ONE_HOUR) -> None:
+        """Move the clock forward."""
+        self._now += delta
+
+
+class FakeConsumption:
+    """Hourly consumption reported by the cloud for a device.
+
+    Hours not reported yet are missing, like the ones the cloud delays and
+    backfills later.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the consumption, with nothing reported."""
+        self._values: dict[tuple[datetime, ConsumptionType], float] = {}
+
+    def report(
+        self,
+        hour: datetime,
+        value: float,
+        consumption_type: ConsumptionType = ConsumptionType.HEAT,
+    ) -> None:
+        """Report the consumption of an hour, replacing the previous one."""
+        self._values[(hour.astimezone(UTC), consumption_type)] = value
+
+    def get(
+        self,
+        hour: datetime,
+        consumption_type: ConsumptionType = ConsumptionType.HEAT,
+    ) -> float | None:
+        """Return the consumption of an hour, None if not reported."""
+        return self._values.get((hour.astimezone(UTC), consumption_type))
+
+    def hours(
+        self,
+        start: datetime,
+        end: datetime,
+        consumption_type: ConsumptionType = ConsumptionType.HEAT,
+    ) -> list[HourConsumption]:
+        """Return the consumption of every hour from start to end."""
+        return [
+            (hour, self.get(hour, consumption_type)) for hour in hour_range(start, end)
+        ]
+
+
+def _status() -> DeviceStatus:
+    return DeviceStatus(
+        long_id=LONG_ID,
+        operation_status=OperationStatus.ON,
+        device_status=DeviceModeStatus.NORMAL,
+        temperature_outdoor=5,
+        operation_mode=ExtendedOperationMode.HEAT,
+        fault_status=[],
+        direction=1,
+        pump_duty=1,
+        tank_status=[TankStatus(OperationStatus.ON, 45, 65, 40, 50)],
+        zones=[
+            DeviceZoneStatus(
+                1, 30, OperationStatus.ON, 55, 20, 35, 20, 5, 18, None, None, None, None
+            )
+        ],
+        quiet_mode=QuietMode.OFF,
+        force_dhw=ForceDHW.OFF,
+        force_heater=ForceHeater.OFF,
+        holiday_timer=HolidayTimer.OFF,
+        powerful_time=PowerfulTime.OFF,
+        special_status=None,
+    )
+
+
+class FakeTank(Tank):
+    """Tank of the fake device, recording the commands."""
+
+    def __init__(self, status: TankStatus, device: FakeDevice) -> None:
+        """Initialize the tank."""
+        super().__init__(status, device)
+        self._fake_device = device
+
+    async def __set_target_temperature__(self, value: int) -> None:
+        self._fake_device.calls.append(("set_target_temperature", value))
+
+    async def __set_operation_status__(
+        self, status: OperationStatus, device_status: OperationStatus
+    ) -> None:
+        self._fake_device.calls.append(("set_tank_operation_status", status))
+
+
+class FakeDevice(Device):
+    """Device with a zone and a tank, recording the commands sent to it.
+
+    Its consumption is read from a FakeConsumption, raising
+    DataNotAvailableError for the hours not reported yet.
+    """
+
+    def __init__(self, consumption: FakeConsumption | None = None) -> None:
+        """Initialize the device."""
+        info = DeviceInfo(
+            DEVICE_ID,
+            "Heat pump",
+            LONG_ID,
+            "Heat",
+            True,
+            "1.0",
+            [
+                DeviceZoneInfo(
+                    1, "House", "Room", True, "Water temperature", "Direct", "Direct"
+                )
+            ],
+        )
+        self.info = info
+        self.calls: list[tuple[Any, ...]] = []
+        self.consumption = consumption or FakeConsumption()
+        super().__init__(info, _status())
+        self._tank = FakeTank(self._status.tank_status[0], self)
+
+    async def refresh_data(self) -> None:
+        self.calls.append(("refresh_data",))
+
+    async def get_and_refresh_consumption(
+        self, date: datetime, consumption_type: ConsumptionType
+    ) -> float | None:
+        return self.consumption.get(date, consumption_type)
+
+    def get_or_schedule_consumption(
+        self, date: datetime, consumption_type: ConsumptionType
+    ) -> float | None:
+        if (value := self.consumption.get(date, consumption_type)) is None:
+            raise DataNotAvailableError(f"No consumption for {date}")
+        return value
+
+    async def __set_operation_status__(self, status: OperationStatus) -> None:
+        self.calls.append(("set_operation_status", status))
+
+    async def __set_special_status__(self, special_status: Any, zones: Any) -> None:
+        self.calls.append(("set_special_status", special_status))
+
+    async def set_mode(self, mode: Any, zone_id: int | None = None) -> None:
+        self.calls.append(("set_mode", mode, zone_id))
+
+    async def set_temperature(self, temperature: int, zone_id: int | None = None) -> None:
+        self.calls.append(("set_temperature", temperature, zone_id))
+
+    async def set_quiet_mode(self, mode: QuietMode) -> None:
+        self.calls.append(("set_quiet_mode", mode))
+
+    async def set_force_dhw(self, force_dhw: ForceDHW) -> None:
+        self.calls.append(("set_force_dhw", force_dhw))
+
+    async def set_force_heater(self, force_heater: ForceHeater) -> None:
+        self.calls.append(("set_force_heater", force_heater))
+
+    async def set_holiday_timer(self, holiday_timer: HolidayTimer) -> None:
+        self.calls.append(("set_holiday_timer", holiday_timer))
+
+    async def set_powerful_time(self, powerful_time: PowerfulTime) -> None:
+        self.calls.append(("set_powerful_time", powerful_time))
+
+    async def request_defrost(self) -> None:
+        self.calls.append(("request_defrost",))
+
+
+class FakeClient:
+    """Client of Aquarea Smart Cloud serving a single FakeDevice.
+
+    The consumption of a day is served from days, by date and consumption
+    type, with a value per local hour of the day like the cloud reports it.
+    """
+
+    def __init__(self, session: Any, username: str, password: str, **kwargs: Any) -> None:
+        """Initialize the client."""
+        self.session = session
+        self.device = FakeDevice()
+        self.days: dict[str, dict[ConsumptionType, list[float | None]]] = {}
+        self.consumption_requests: list[str] = []
+
+    async def login(self) -> None:
+        pass
+
+    async def get_devices(self, include_long_id: bool = False) -> list[DeviceInfo]:
+        return [self.device.info]
+
+    async def get_device(self, device_info: DeviceInfo, **kwargs: Any) -> FakeDevice:
+        return self.device
+
+    async def get_device_consumption(
+        self, long_id: str, aggregation: Any, date_input: str
+    ) -> SimpleNamespace:
+        self.consumption_requests.append(date_input)
+        return SimpleNamespace(energy=self.days.get(date_input, {}))
@@ -0,0 +1,155 @@
+"""Tests of the heating degree-hours and energy per degree-hour."""
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    mock_restore_cache_with_extra_data,
+)
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from custom_components.aquarea.const import DEVICES, DOMAIN
+from custom_components.aquarea.efficiency import HeatingEfficiency
+from custom_components.aquarea.sensor import AquareaSensorExtraStoredData
+
+from .fakes import DEVICE_ID, ONE_HOUR, USERNAME, FakeClient, FakeClock
+
+MADRID = ZoneInfo("Europe/Madrid")
+BASE_TEMPERATURE = 15.5
+SAMPLE_INTERVAL = timedelta(minutes=10)
+
+DST_DAYS = [
+    pytest.param(date(2024, 6, 1), id="24 hours"),
+    pytest.param(date(2024, 3, 31), id="spring forward"),
+    pytest.param(date(2024, 10, 27), id="fall back"),
+]
+
+
+def _run(
+    efficiency: HeatingEfficiency,
+    clock: FakeClock,
+    temperature: float,
+    duration: timedelta,
+) -> list[datetime]:
+    """Sample a constant temperature, returning the hours finalized."""
+    finalized: list[datetime] = []
+
+    def _consumption(hour: datetime) -> float:
+        finalized.append(hour)
+        return 1.0
+
+    efficiency.update(temperature, clock.now, _consumption)
+    for _ in range(duration // SAMPLE_INTERVAL):
+        clock.advance(SAMPLE_INTERVAL)
+        efficiency.update(temperature, clock.now, _consumption)
+    return finalized
+
+
+@pytest.mark.parametrize("day", DST_DAYS)
+def test_degree_hours_across_dst(day: date) -> None:
+    """Test every hour counts once, the repeated or skipped ones included."""
+    efficiency = HeatingEfficiency(BASE_TEMPERATURE)
+    clock = FakeClock(datetime(day.year, day.month, day.day, 0, 30, tzinfo=MADRID))
+
+    finalized = _run(efficiency, clock, BASE_TEMPERATURE - 10, 4 * ONE_HOUR)
+
+    assert efficiency.degree_hours(day) == pytest.approx(40.0)
+    # 00:00 to 03:00 local, the repeated hour reported twice
+    assert [hour.astimezone(UTC) for hour in finalized] == [
+        finalized[0].astimezone(UTC) + index * ONE_HOUR
+        for index in range(len(finalized))
+    ]
+    assert all(hour.tzinfo is MADRID for hour in finalized)
+    assert efficiency.energy_per_degree_hour(day) == pytest.approx(
+        len(finalized) / (10 * len(finalized) - 5)
+    )
+
+
+def test_degree_hours_fall_back_hours() -> None:
+    """Test the repeated hour of a fall back is integrated as two hours."""
+    efficiency = HeatingEfficiency(BASE_TEMPERATURE)
+    clock = FakeClock(datetime(2024, 10, 27, 1, tzinfo=MADRID))
+
+    finalized = _run(efficiency, clock, BASE_TEMPERATURE - 10, 3 * ONE_HOUR)
+
+    assert [(hour.hour, hour.fold) for hour in finalized] == [
+        (1, 0),
+        (2, 0),
+        (2, 1),
+    ]
+    assert efficiency.degree_hours(date(2024, 10, 27)) == pytest.approx(30.0)
+
+
+def test_degree_hours_above_base() -> None:
+    """Test temperatures above the base add no degree-hours."""
+    efficiency = HeatingEfficiency(BASE_TEMPERATURE)
+    clock = FakeClock(datetime(2024, 6, 1, 10, tzinfo=MADRID))
+
+    _run(efficiency, clock, BASE_TEMPERATURE + 5, 2 * ONE_HOUR)
+
+    assert efficiency.degree_hours(date(2024, 6, 1)) == 0.0
+    assert efficiency.energy_per_degree_hour(date(2024, 6, 1)) is None
+
+
+def test_degree_hours_restored() -> None:
+    """Test the degree-hours restored are added to the ones integrated since."""
+    efficiency = HeatingEfficiency(BASE_TEMPERATURE)
+    clock = FakeClock(datetime(2024, 6, 1, 10, tzinfo=MADRID))
+    day = date(2024, 6, 1)
+
+    efficiency.restore_degree_hours(day, 12.0)
+    _run(efficiency, clock, BASE_TEMPERATURE - 2, ONE_HOUR)
+    assert efficiency.degree_hours(day) == pytest.approx(14.0)
+
+    efficiency.restore_degree_hours(day, 20.0)
+    assert efficiency.degree_hours(day) == pytest.approx(22.0)
+    assert efficiency.degree_hours(day + timedelta(days=1)) == 0.0
+
+
+async def test_degree_hours_sensor_restored(
+    recorder_mock: None,
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+    fake_client: type[FakeClient],
+) -> None:
+    """Test the degree-hours sensor keeps counting the day after a restart."""
+    unique_id = f"{DEVICE_ID}_heating_degree_hours"
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: "password"},
+        unique_id=USERNAME,
+    )
+    entry.add_to_hass(hass)
+    entity_id = er.async_get(hass).async_get_or_create(
+        "sensor", DOMAIN, unique_id, config_entry=entry
+    ).entity_id
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(entity_id, "12.5"),
+                AquareaSensorExtraStoredData(
+                    12.5, "°C·h", dt_util.start_of_local_day()
+                ).as_dict(),
+            )
+        ],
+    )
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert float(hass.states.get(entity_id).state) == pytest.approx(12.5)
+    coordinator = hass.data[DOMAIN][entry.entry_id][DEVICES][DEVICE_ID]
+    assert coordinator.efficiency.degree_hours(
+        dt_util.now().date()
+    ) == pytest.approx(12.5)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
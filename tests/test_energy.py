@@ -0,0 +1,437 @@
+"""Tests of the state machines of the energy consumption sensors."""
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.aquarea.energy import (
+    MAX_RECONCILE_HOURS,
+    RESET_DETECTION_RATIO,
+    TRANSITION_CURRENT_HOUR_UPDATE,
+    TRANSITION_HOURS_COMPLETED,
+    TRANSITION_PREVIOUS_HOUR_UPDATE,
+    AccumulatedState,
+    HourlyState,
+    day_hours,
+    hour_range,
+    is_repeated_hour,
+    is_stale,
+    reconcile_accumulated,
+    reconcile_hourly,
+    reported_consumption,
+)
+from custom_components.aquarea.sensor import (
+    AquareaAccumulatedSensorExtraStoredData,
+    AquareaSensorExtraStoredData,
+)
+
+from .fakes import ONE_HOUR, FakeClock, FakeConsumption
+
+MADRID = ZoneInfo("Europe/Madrid")
+HOUR = datetime(2024, 6, 1, 10, tzinfo=MADRID)
+
+DST_DAYS = [
+    pytest.param(date(2024, 6, 1), 24, id="24 hours"),
+    pytest.param(date(2024, 3, 31), 23, id="spring forward"),
+    pytest.param(date(2024, 10, 27), 25, id="fall back"),
+]
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time(), MADRID)
+
+
+def _report_day(consumption: FakeConsumption, day: date, value: float) -> None:
+    """Report the same consumption for every hour of a local day."""
+    for hour in hour_range(_midnight(day), _midnight(day + timedelta(days=1)))[:-1]:
+        consumption.report(hour, value)
+
+
+def _run_accumulated(
+    clock: FakeClock, consumption: FakeConsumption, state: AccumulatedState, hours: int
+) -> AccumulatedState:
+    """Move the clock hour by hour, updating the state like the sensor does."""
+    for _ in range(hours):
+        clock.advance()
+        now = clock.hour
+        if (
+            result := reconcile_accumulated(
+                state, consumption.hours(state.period, now), now
+            )
+        ) is not None:
+            state = result[0]
+    return state
+
+
+def _run_hourly(
+    clock: FakeClock, consumption: FakeConsumption, state: HourlyState, hours: int
+) -> tuple[HourlyState, list[float]]:
+    """Move the clock hour by hour, returning the values written."""
+    written: list[float] = []
+    for _ in range(hours):
+        clock.advance()
+        now = clock.hour
+        if (
+            result := reconcile_hourly(state, consumption.hours(state.period, now), now)
+        ) is not None:
+            writes, period, _ = result
+            written.extend(writes)
+            state = HourlyState(writes[-1], period)
+    return state, written
+
+
+def _recorded_energy(written: list[float], previous: float = 0.0) -> float:
+    """Return the energy the recorder sums from the states of the sensor."""
+    energy = 0.0
+    for value in written:
+        if value < previous * RESET_DETECTION_RATIO:
+            energy += value
+        else:
+            energy += value - previous
+        previous = value
+    return energy
+
+
+@pytest.mark.parametrize(("day", "hours"), DST_DAYS)
+def test_hour_range_dst_days(day: date, hours: int) -> None:
+    """Test the hours of a local day are stepped in UTC."""
+    start = _midnight(day)
+    end = _midnight(day + timedelta(days=1))
+
+    result = hour_range(start, end)
+
+    assert len(result) == hours + 1
+    assert all(
+        b.astimezone(UTC) - a.astimezone(UTC) == ONE_HOUR
+        for a, b in zip(result, result[1:])
+    )
+    assert result[-1] == end
+
+
+@pytest.mark.parametrize(("day", "hours"), DST_DAYS)
+def test_day_hours_dst_days(day: date, hours: int) -> None:
+    """Test every hour of a local day is returned, from its midnight."""
+    result = day_hours(day, MADRID)
+
+    assert len(result) == hours
+    assert result[0] == _midnight(day)
+    assert len({hour.astimezone(UTC) for hour in result}) == hours
+    assert all(hour.date() == day for hour in result)
+
+
+def test_repeated_hour_reported_once() -> None:
+    """Test the value of the local hour repeated by a fall back is counted once."""
+    values = [float(hour_of_day) for hour_of_day in range(24)]
+    hours = day_hours(date(2024, 10, 27), MADRID)
+
+    repeated = [hour for hour in hours if is_repeated_hour(hour)]
+    assert [hour.astimezone(UTC).hour for hour in repeated] == [1]
+    assert [reported_consumption(values, hour) for hour in hours if hour.hour == 2] == [
+        2.0,
+        0.0,
+    ]
+    assert sum(reported_consumption(values, hour) for hour in hours) == sum(values)
+
+
+def test_accumulated_current_hour_update() -> None:
+    """Test the growth of the hour being processed is added."""
+    state = AccumulatedState(10.0, HOUR, 0.2)
+
+    result = reconcile_accumulated(state, [(HOUR, 0.5)], HOUR)
+
+    assert result == (
+        AccumulatedState(pytest.approx(10.3), HOUR, 0.5),
+        TRANSITION_CURRENT_HOUR_UPDATE,
+    )
+
+
+def test_accumulated_hour_rollover() -> None:
+    """Test the hour being processed is completed once the next one has data."""
+    state = AccumulatedState(10.0, HOUR, 0.2)
+    next_hour = HOUR + ONE_HOUR
+
+    result = reconcile_accumulated(
+        state, [(HOUR, 0.5), (next_hour, 0.1)], next_hour
+    )
+
+    assert result == (
+        AccumulatedState(pytest.approx(10.4), next_hour, 0.1),
+        TRANSITION_HOURS_COMPLETED,
+    )
+
+
+def test_accumulated_previous_hour_update() -> None:
+    """Test the previous hour keeps being processed until the next one has data."""
+    state = AccumulatedState(10.0, HOUR, 0.2)
+    next_hour = HOUR + ONE_HOUR
+
+    result = reconcile_accumulated(state, [(HOUR, 0.6), (next_hour, None)], next_hour)
+
+    assert result == (
+        AccumulatedState(pytest.approx(10.4), HOUR, 0.6),
+        TRANSITION_PREVIOUS_HOUR_UPDATE,
+    )
+
+
+def test_accumulated_no_data() -> None:
+    """Test nothing is added while the cloud has no data."""
+    state = AccumulatedState(10.0, HOUR, 0.2)
+
+    assert reconcile_accumulated(state, [(HOUR, None)], HOUR) is None
+
+
+def test_accumulated_backfilled_hours() -> None:
+    """Test hours delayed by the cloud are added once they are backfilled."""
+    consumption = FakeConsumption()
+    consumption.report(HOUR, 0.4)
+    now = HOUR + 2 * ONE_HOUR
+    state = AccumulatedState(5.0, HOUR, 0.2)
+
+    state, transition = reconcile_accumulated(
+        state, consumption.hours(HOUR, now), now
+    )
+    assert state == AccumulatedState(pytest.approx(5.2), HOUR, 0.4)
+    assert transition == TRANSITION_PREVIOUS_HOUR_UPDATE
+
+    consumption.report(HOUR + ONE_HOUR, 0.3)
+    consumption.report(now, 0.1)
+    state, transition = reconcile_accumulated(
+        state, consumption.hours(HOUR, now), now
+    )
+    assert state == AccumulatedState(pytest.approx(5.6), now, 0.1)
+    assert transition == TRANSITION_HOURS_COMPLETED
+
+    # A revised hour only adds its difference
+    consumption.report(now, 0.25)
+    state, transition = reconcile_accumulated(state, consumption.hours(now, now), now)
+    assert state == AccumulatedState(pytest.approx(5.75), now, 0.25)
+    assert transition == TRANSITION_CURRENT_HOUR_UPDATE
+
+
+def test_accumulated_waits_for_missing_hour() -> None:
+    """Test the hours after one without data wait until it is backfilled."""
+    consumption = FakeConsumption()
+    consumption.report(HOUR, 0.4)
+    now = HOUR + 2 * ONE_HOUR
+    consumption.report(now, 0.1)
+    state = AccumulatedState(5.0, HOUR, 0.2)
+
+    state, transition = reconcile_accumulated(
+        state, consumption.hours(HOUR, now), now
+    )
+    assert state == AccumulatedState(pytest.approx(5.2), HOUR, 0.4)
+    assert transition == TRANSITION_PREVIOUS_HOUR_UPDATE
+
+    consumption.report(HOUR + ONE_HOUR, 0.3)
+    state, transition = reconcile_accumulated(
+        state, consumption.hours(HOUR, now), now
+    )
+    assert state == AccumulatedState(pytest.approx(5.6), now, 0.1)
+    assert transition == TRANSITION_HOURS_COMPLETED
+
+
+@pytest.mark.parametrize(("day", "hours"), DST_DAYS)
+def test_accumulated_dst_days(day: date, hours: int) -> None:
+    """Test every hour of a local day is added once."""
+    consumption = FakeConsumption()
+    _report_day(consumption, day, 1.0)
+    clock = FakeClock(_midnight(day))
+
+    state = _run_accumulated(
+        clock, consumption, AccumulatedState(0.0, clock.hour, 0.0), hours
+    )
+
+    assert clock.hour == _midnight(day + timedelta(days=1))
+    assert state.total == pytest.approx(hours)
+
+
+def test_hourly_current_hour_update() -> None:
+    """Test the value of the hour being processed is written as is."""
+    state = HourlyState(0.2, HOUR)
+
+    assert reconcile_hourly(state, [(HOUR, 0.5)], HOUR) == (
+        [0.5],
+        HOUR,
+        TRANSITION_CURRENT_HOUR_UPDATE,
+    )
+
+
+def test_hourly_no_data() -> None:
+    """Test nothing is written while the cloud has no data."""
+    state = HourlyState(0.2, HOUR)
+    next_hour = HOUR + ONE_HOUR
+
+    assert reconcile_hourly(state, [(HOUR, None), (next_hour, None)], next_hour) is None
+
+
+def test_hourly_backfilled_hours() -> None:
+    """Test the hours backfilled after a gap are closed with a single state."""
+    consumption = FakeConsumption()
+    for offset, value in enumerate((0.6, 0.3, 0.2)):
+        consumption.report(HOUR + offset * ONE_HOUR, value)
+    now = HOUR + 2 * ONE_HOUR
+
+    result = reconcile_hourly(
+        HourlyState(0.4, HOUR), consumption.hours(HOUR, now), now
+    )
+
+    assert result == ([pytest.approx(0.9), 0.2], now, TRANSITION_HOURS_COMPLETED)
+
+
+def test_hourly_waits_for_missing_hour() -> None:
+    """Test the hours after one without data are closed once it is backfilled."""
+    consumption = FakeConsumption()
+    consumption.report(HOUR, 0.6)
+    now = HOUR + 2 * ONE_HOUR
+    consumption.report(now, 0.2)
+    state = HourlyState(0.4, HOUR)
+
+    assert reconcile_hourly(state, consumption.hours(HOUR, now), now) == (
+        [0.6],
+        HOUR,
+        TRANSITION_PREVIOUS_HOUR_UPDATE,
+    )
+
+    consumption.report(HOUR + ONE_HOUR, 0.3)
+    result = reconcile_hourly(
+        HourlyState(0.6, HOUR), consumption.hours(HOUR, now), now
+    )
+    assert result == ([pytest.approx(0.9), 0.2], now, TRANSITION_HOURS_COMPLETED)
+
+
+@pytest.mark.parametrize(
+    ("consumption", "writes"),
+    [
+        pytest.param(0.5, [0.5], id="detected by the recorder"),
+        pytest.param(
+            RESET_DETECTION_RATIO, [0, RESET_DETECTION_RATIO], id="detection threshold"
+        ),
+        pytest.param(0.95, [0, 0.95], id="undetected decrease"),
+        pytest.param(1.2, [0, 1.2], id="increase"),
+    ],
+)
+def test_hourly_reset_detection(consumption: float, writes: list[float]) -> None:
+    """Test a 0 is written when the recorder wouldn't detect the new hour."""
+    next_hour = HOUR + ONE_HOUR
+
+    result = reconcile_hourly(
+        HourlyState(1.0, HOUR), [(HOUR, 1.0), (next_hour, consumption)], next_hour
+    )
+
+    assert result == (writes, next_hour, TRANSITION_HOURS_COMPLETED)
+
+
+def test_hourly_reset_after_idle_hour() -> None:
+    """Test no 0 is written after an hour without consumption."""
+    next_hour = HOUR + ONE_HOUR
+
+    result = reconcile_hourly(
+        HourlyState(0, HOUR), [(HOUR, 0), (next_hour, 0)], next_hour
+    )
+
+    assert result == ([0], next_hour, TRANSITION_HOURS_COMPLETED)
+
+
+def test_hourly_recorded_energy() -> None:
+    """Test the recorder sums every hour, close values included."""
+    values = [1.0, 0.95, 0.97, 1.2, 0.3, 0.0, 0.5]
+    consumption = FakeConsumption()
+    clock = FakeClock(HOUR)
+    for offset, value in enumerate(values):
+        consumption.report(HOUR + offset * ONE_HOUR, value)
+
+    _, written = _run_hourly(clock, consumption, HourlyState(0, HOUR), len(values) - 1)
+
+    assert _recorded_energy(written) == pytest.approx(sum(values))
+
+
+@pytest.mark.parametrize(("day", "hours"), DST_DAYS)
+def test_hourly_dst_days(day: date, hours: int) -> None:
+    """Test the recorder sums every hour of a local day once."""
+    consumption = FakeConsumption()
+    _report_day(consumption, day, 1.0)
+    clock = FakeClock(_midnight(day))
+
+    _, written = _run_hourly(
+        clock, consumption, HourlyState(0, clock.hour), hours
+    )
+
+    assert _recorded_energy(written) == pytest.approx(hours)
+
+
+@pytest.mark.parametrize(
+    ("period", "stale"),
+    [
+        pytest.param(None, True, id="never processed"),
+        pytest.param(HOUR, False, id="current hour"),
+        pytest.param(HOUR - MAX_RECONCILE_HOURS * ONE_HOUR, False, id="oldest"),
+        pytest.param(HOUR - (MAX_RECONCILE_HOURS + 1) * ONE_HOUR, True, id="too old"),
+        pytest.param(HOUR + ONE_HOUR, True, id="in the future"),
+    ],
+)
+def test_is_stale(period: datetime | None, stale: bool) -> None:
+    """Test the periods that can't be reconciled after a restart."""
+    assert is_stale(period, HOUR) is stale
+
+
+def test_accumulated_restart_in_repeated_hour() -> None:
+    """Test a restart during the repeated hour continues where it stopped."""
+    day = date(2024, 10, 27)
+    consumption = FakeConsumption()
+    _report_day(consumption, day, 1.0)
+    start = AccumulatedState(0.0, _midnight(day), 0.0)
+
+    uninterrupted = _run_accumulated(
+        FakeClock(_midnight(day)), consumption, start, 25
+    )
+
+    # The second 02:00 of the day, once the clocks went back
+    clock = FakeClock(_midnight(day))
+    state = _run_accumulated(clock, consumption, start, 3)
+    assert state.period.utcoffset() == timedelta(hours=1)
+
+    stored = AquareaAccumulatedSensorExtraStoredData(
+        state.total, "kWh", state.period, state.period_consumption
+    ).as_dict()
+    restored = AquareaAccumulatedSensorExtraStoredData.from_dict(stored)
+    # Times in the repeated hour never compare equal across timezones
+    assert restored.period_being_processed.astimezone(UTC) == state.period.astimezone(
+        UTC
+    )
+    assert not is_stale(restored.period_being_processed, clock.hour)
+
+    state = _run_accumulated(
+        clock,
+        consumption,
+        AccumulatedState(
+            restored.native_value,
+            restored.period_being_processed,
+            restored.accumulated_period_being_processed,
+        ),
+        22,
+    )
+
+    assert state.total == pytest.approx(uninterrupted.total)
+    assert state.total == pytest.approx(25)
+
+
+def test_hourly_restart() -> None:
+    """Test a restart between two updates keeps the hour being processed."""
+    consumption = FakeConsumption()
+    for offset in range(6):
+        consumption.report(HOUR + offset * ONE_HOUR, 1.0)
+
+    clock = FakeClock(HOUR)
+    state, written = _run_hourly(clock, consumption, HourlyState(0, HOUR), 2)
+
+    stored = AquareaSensorExtraStoredData(
+        state.value, "kWh", state.period
+    ).as_dict()
+    restored = AquareaSensorExtraStoredData.from_dict(stored)
+    state = HourlyState(restored.native_value, restored.period_being_processed)
+
+    _, written_after = _run_hourly(clock, consumption, state, 3)
+
+    assert _recorded_energy(written + written_after) == pytest.approx(6)
@@ -0,0 +1,76 @@
+"""Throughput of the reconciliation of the energy consumption sensors.
+
+Every update of every energy sensor reconciles the hours since the one being
+processed, up to MAX_RECONCILE_HOURS after a gap. Run with
+--benchmark-disable to only check the results.
+"""
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.aquarea.energy import (
+    MAX_RECONCILE_HOURS,
+    AccumulatedState,
+    HourlyState,
+    hour_range,
+    reconcile_accumulated,
+    reconcile_hourly,
+)
+
+from .fakes import ONE_HOUR
+
+START = datetime(2024, 10, 27, tzinfo=ZoneInfo("Europe/Madrid"))
+
+# Mean time of a single reconciliation, about 3 times the baseline on a
+# development machine, 3 µs for the longest gap
+MAX_MEAN_SECONDS = 10e-6
+
+WINDOWS = [
+    pytest.param(1, id="current hour"),
+    pytest.param(2, id="hour rollover"),
+    pytest.param(MAX_RECONCILE_HOURS + 1, id="longest gap"),
+]
+
+
+def _consumption(count: int) -> list[tuple[datetime, float | None]]:
+    """Return count hours of consumption from START, across the DST change."""
+    end = START.astimezone(UTC) + (count - 1) * ONE_HOUR
+    return [
+        (hour, 0.5 + index % 3 * 0.25)
+        for index, hour in enumerate(hour_range(START, end))
+    ]
+
+
+def _check_throughput(benchmark: Any) -> None:
+    if benchmark.stats is not None:
+        assert benchmark.stats.stats.mean < MAX_MEAN_SECONDS
+
+
+@pytest.mark.parametrize("count", WINDOWS)
+def test_reconcile_accumulated_throughput(benchmark: Any, count: int) -> None:
+    """Benchmark the reconciliation of an accumulated sensor."""
+    hours = _consumption(count)
+    now = hours[-1][0]
+
+    result = benchmark(
+        reconcile_accumulated, AccumulatedState(10.0, START, 0.25), hours, now
+    )
+
+    assert result is not None
+    _check_throughput(benchmark)
+
+
+@pytest.mark.parametrize("count", WINDOWS)
+def test_reconcile_hourly_throughput(benchmark: Any, count: int) -> None:
+    """Benchmark the reconciliation of an hourly sensor."""
+    hours = _consumption(count)
+    now = hours[-1][0]
+
+    result = benchmark(reconcile_hourly, HourlyState(0.25, START), hours, now)
+
+    assert result is not None
+    _check_throughput(benchmark)
@@ -0,0 +1,109 @@
+"""Cost of a coordinator update of the entities refreshed on every poll.
+
+Every poll of a device runs the coordinator update handler of each of its
+entities. The energy sensors also reconcile the consumption of the hours
+since the one being processed. Run with --benchmark-disable to only check
+the entities update.
+"""
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from typing import Any
+from unittest.mock import patch
+
+from aioaquarea import ConsumptionType
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.util import dt as dt_util
+
+from custom_components.aquarea.climate import HeatPumpClimate
+from custom_components.aquarea.const import DEVICES, DOMAIN
+from custom_components.aquarea.sensor import (
+    EnergyAccumulatedConsumptionSensor,
+    EnergyConsumptionSensor,
+)
+from custom_components.aquarea.water_heater import WaterHeater
+
+from .fakes import DEVICE_ID, USERNAME, FakeClient
+
+# Median time of an update, about 3 times the baseline on a development
+# machine: 50 µs for the climate entity, 22 µs for the energy sensors and
+# 15 µs for the water heater. The median leaves out the state writes that
+# wait for the recorder.
+MAX_MEDIAN_SECONDS = {
+    HeatPumpClimate: 150e-6,
+    EnergyAccumulatedConsumptionSensor: 65e-6,
+    EnergyConsumptionSensor: 65e-6,
+    WaterHeater: 45e-6,
+}
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    recorder_mock: None, enable_custom_integrations: None
+) -> None:
+    """Enable the integration, which depends on the recorder."""
+
+
+@pytest.fixture
+async def entities(
+    hass: HomeAssistant, fake_client: type[FakeClient]
+) -> AsyncGenerator[list[Entity], None]:
+    """Set up the device, with consumption for the current hour.
+
+    The hourly energy sensors, disabled by default, are enabled.
+    """
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: "password"},
+        unique_id=USERNAME,
+    )
+    entry.add_to_hass(hass)
+    with patch.object(
+        EnergyConsumptionSensor, "entity_registry_enabled_default", True
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id][DEVICES][DEVICE_ID]
+    hour = dt_util.now().replace(minute=0, second=0, microsecond=0)
+    for consumption_type in ConsumptionType:
+        coordinator.device.consumption.report(hour, 0.5, consumption_type)
+
+    yield [
+        entity
+        for platform in async_get_platforms(hass, DOMAIN)
+        for entity in platform.entities.values()
+    ]
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.parametrize(
+    "entity_class",
+    [
+        pytest.param(EnergyAccumulatedConsumptionSensor, id="accumulated energy"),
+        pytest.param(EnergyConsumptionSensor, id="hourly energy"),
+        pytest.param(HeatPumpClimate, id="climate"),
+        pytest.param(WaterHeater, id="water heater"),
+    ],
+)
+async def test_coordinator_update_cost(
+    hass: HomeAssistant,
+    entities: list[Entity],
+    benchmark: Any,
+    entity_class: type[Entity],
+) -> None:
+    """Benchmark the coordinator update handler of an entity."""
+    entity = next(entity for entity in entities if type(entity) is entity_class)
+    # pylint: disable-next=protected-access
+    benchmark(entity._handle_coordinator_update)
+
+    assert hass.states.get(entity.entity_id).state not in ("unavailable", "unknown")
+    if benchmark.stats is not None:
+        assert benchmark.stats.stats.median < MAX_MEDIAN_SECONDS[entity_class]
@@ -0,0 +1,151 @@
+"""Tests of the export of the hourly consumption."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+import csv
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from aioaquarea import ConsumptionType
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.aquarea.const import DEVICES, DOMAIN
+from custom_components.aquarea.coordinator import AquareaDataUpdateCoordinator
+from custom_components.aquarea.export import (
+    EXPORT_CONCURRENCY,
+    FORMAT_CSV,
+    async_export_consumption,
+)
+
+from .fakes import DEVICE_ID, USERNAME, FakeClient
+
+DST_DAYS = [
+    pytest.param(date(2024, 6, 1), 24, id="24 hours"),
+    pytest.param(date(2024, 3, 31), 23, id="spring forward"),
+    pytest.param(date(2024, 10, 27), 25, id="fall back"),
+]
+
+
+@pytest.fixture
+async def coordinator(
+    recorder_mock: None,
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+    fake_client: type[FakeClient],
+) -> AsyncGenerator[AquareaDataUpdateCoordinator, None]:
+    """Set up a device in Europe/Madrid and return its coordinator."""
+    hass.config.set_time_zone("Europe/Madrid")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: "password"},
+        unique_id=USERNAME,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    yield hass.data[DOMAIN][entry.entry_id][DEVICES][DEVICE_ID]
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def _export(
+    hass: HomeAssistant,
+    coordinator: AquareaDataUpdateCoordinator,
+    day: date,
+    path: Path,
+) -> tuple[dict, list[list[str]]]:
+    result = await async_export_consumption(
+        hass, [coordinator], day, day, [ConsumptionType.HEAT], FORMAT_CSV, str(path)
+    )
+    with path.open(encoding="utf-8") as file:
+        return result, list(csv.reader(file))[1:]
+
+
+@pytest.mark.parametrize(("day", "hours"), DST_DAYS)
+async def test_export_every_hour_of_the_day(
+    coordinator: AquareaDataUpdateCoordinator,
+    hass: HomeAssistant,
+    tmp_path: Path,
+    day: date,
+    hours: int,
+) -> None:
+    """Test a day is exported hour by hour, however long it is."""
+    client: FakeClient = coordinator._client  # pylint: disable=protected-access
+    values = [float(hour_of_day) for hour_of_day in range(24)]
+    if hours == 23:
+        # Nothing is consumed in the local hour skipped by the spring forward
+        values[2] = 0.0
+    client.days[day.isoformat()] = {ConsumptionType.HEAT: values}
+
+    result, rows = await _export(hass, coordinator, day, tmp_path / "first.csv")
+
+    assert result["rows"] == hours
+    assert result["days_fetched"] == 1
+    starts = [datetime.fromisoformat(row[3]) for row in rows]
+    assert starts[0].replace(tzinfo=None) == datetime(day.year, day.month, day.day)
+    assert len(set(starts)) == hours
+    assert all(
+        (later - earlier).total_seconds() == 3600
+        for earlier, later in zip(starts, starts[1:])
+    )
+    # Every hour takes the value the cloud reports for its local hour, the
+    # second hour of a fall back has it counted with the first one
+    expected: list[float] = []
+    for index, start in enumerate(starts):
+        repeated = any(earlier.hour == start.hour for earlier in starts[:index])
+        expected.append(0.0 if repeated else values[start.hour])
+    assert [float(row[4]) for row in rows] == expected
+    assert sum(float(row[4]) for row in rows) == sum(values)
+
+    # The finalized day is served from the cache the second time
+    result, cached_rows = await _export(hass, coordinator, day, tmp_path / "second.csv")
+
+    assert result["days_cached"] == 1
+    assert client.consumption_requests == [day.isoformat()]
+    assert cached_rows == rows
+
+
+async def test_unload_cancels_export(
+    coordinator: AquareaDataUpdateCoordinator, hass: HomeAssistant, tmp_path: Path
+) -> None:
+    """Test unloading the entry cancels the days being fetched for an export."""
+    client: FakeClient = coordinator._client  # pylint: disable=protected-access
+    started = asyncio.Event()
+
+    async def _get_device_consumption(*args: object) -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    client.get_device_consumption = _get_device_consumption
+    path = tmp_path / "export.csv"
+    start = date(2024, 6, 1)
+    export = hass.async_create_task(
+        async_export_consumption(
+            hass,
+            [coordinator],
+            start,
+            start + timedelta(days=EXPORT_CONCURRENCY * 2),
+            [ConsumptionType.HEAT],
+            FORMAT_CSV,
+            str(path),
+        )
+    )
+    await started.wait()
+    lifecycle = coordinator.lifecycle
+    exports = [name for name in lifecycle.as_dict()["tasks"] if " export " in name]
+    assert len(exports) == EXPORT_CONCURRENCY
+
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+    with pytest.raises(HomeAssistantError):
+        await export
+    assert lifecycle.as_dict()["tasks"] == []
+    assert not path.exists()
+    assert not Path(f"{path}.part").exists()
@@ -0,0 +1,84 @@
+"""Import time of the integration and of its platforms.
+
+Home Assistant imports the integration at startup, before any entry is set
+up, so loading it must not pull in aioaquarea or the coordinator. The
+platforms are only imported by the setup of an entry, once those are
+already loaded, so only their own cost is measured.
+
+Each measurement runs python -X importtime in a fresh interpreter.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+from custom_components.aquarea import PLATFORMS
+
+ROOT = Path(__file__).parent.parent
+PACKAGE = "custom_components.aquarea"
+
+# Far above the baseline on a development machine, about 8 ms for the
+# package and 10 ms for the largest platform, so only a heavy import added
+# back to the startup path trips them
+MAX_PACKAGE_SECONDS = 0.1
+MAX_PLATFORM_SECONDS = 0.1
+
+# Loaded by the setup of an entry before its platforms are imported
+SETUP_MODULES = ("aioaquarea", f"{PACKAGE}.coordinator", f"{PACKAGE}.entity")
+
+
+def _import_times(
+    module: str, preload: tuple[str, ...] = ()
+) -> dict[str, tuple[int, int]]:
+    """Import module in a fresh interpreter after preload.
+
+    Return the self and cumulative import time, in microseconds, of every
+    module loaded by the import of module.
+    """
+    statements = [f"import {name}" for name in preload]
+    statements.append("import sys; sys.stderr.write('-- start --\\n')")
+    statements.append(f"import {module}")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(statements)],
+        capture_output=True,
+        check=True,
+        cwd=ROOT,
+        text=True,
+    )
+    times: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.partition("-- start --\n")[2].splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def test_package_import_defers_client() -> None:
+    """Test loading the integration leaves the client for the entry setup."""
+    times = _import_times(PACKAGE)
+
+    assert PACKAGE in times
+    for module in (*SETUP_MODULES, f"{PACKAGE}.snapshot"):
+        assert module not in times
+
+    own = sum(
+        self_us for name, (self_us, _) in times.items() if name.startswith(PACKAGE)
+    )
+    assert own / 1e6 < MAX_PACKAGE_SECONDS
+
+
+@pytest.mark.parametrize("platform", [platform.value for platform in PLATFORMS])
+def test_platform_import_cost(platform: str) -> None:
+    """Test a platform loads quickly once its entry is being set up."""
+    module = f"{PACKAGE}.{platform}"
+    times = _import_times(
+        module,
+        preload=(f"homeassistant.components.{platform}", PACKAGE, *SETUP_MODULES),
+    )
+
+    assert times[module][1] / 1e6 < MAX_PLATFORM_SECONDS
@@ -0,0 +1,220 @@
+"""Tests of the setup and unload of the Aquarea Smart Cloud entries."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Generator
+from datetime import timedelta
+from typing import Any
+from unittest.mock import patch
+
+from aiohttp import ClientSession
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.util import dt as dt_util
+
+from custom_components.aquarea.clients import CLIENT_EVICTION_DELAY
+from custom_components.aquarea.const import DEVICES, DOMAIN, LIFECYCLE
+from custom_components.aquarea.coordinator import SCAN_INTERVAL
+
+from .fakes import DEVICE_ID, FakeClient, USERNAME
+
+SETUP_CYCLES = 5
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    recorder_mock: None, enable_custom_integrations: None
+) -> None:
+    """Enable the integration, which depends on the recorder."""
+
+
+@pytest.fixture
+def sessions() -> Generator[list[ClientSession], None, None]:
+    """Collect the client sessions created by the integration."""
+    created: list[ClientSession] = []
+
+    def _create(hass: HomeAssistant, **kwargs: Any) -> ClientSession:
+        session = async_create_clientsession(hass, **kwargs)
+        created.append(session)
+        return session
+
+    with patch(
+        "custom_components.aquarea.clients.async_create_clientsession", _create
+    ):
+        yield created
+
+
+def _entry(hass: HomeAssistant) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: "password"},
+        unique_id=USERNAME,
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+def _timers(hass: HomeAssistant) -> int:
+    """Return the timers pending in the event loop."""
+    return sum(
+        not handle.cancelled()
+        for handle in hass.loop._scheduled  # pylint: disable=protected-access
+    )
+
+
+def _tasks() -> set[str]:
+    """Return the names of the tasks started by the integration."""
+    return {
+        task.get_name()
+        for task in asyncio.all_tasks()
+        if not task.done() and DOMAIN in task.get_name()
+    }
+
+
+async def test_setup_and_unload(
+    hass: HomeAssistant, fake_client: type[FakeClient]
+) -> None:
+    """Test an entry sets up its device and unloads cleanly."""
+    entry = _entry(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    coordinator = hass.data[DOMAIN][entry.entry_id][DEVICES][DEVICE_ID]
+    lifecycle = hass.data[DOMAIN][entry.entry_id][LIFECYCLE]
+    assert hass.states.get("climate.heat_pump_house") is not None
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.NOT_LOADED
+    assert entry.entry_id not in hass.data[DOMAIN]
+    assert lifecycle.as_dict() == {"shutdown": True, "tasks": [], "timers": 0}
+    assert coordinator._unsub_refresh is None  # pylint: disable=protected-access
+
+
+async def test_poll_on_phase(
+    hass: HomeAssistant, fake_client: type[FakeClient]
+) -> None:
+    """Test the first poll is on the phase of the device, the next ones follow."""
+    entry = _entry(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id][DEVICES][DEVICE_ID]
+    calls = coordinator.device.calls
+    refreshes = calls.count(("refresh_data",))
+    phase = int(coordinator._poll_phase)  # pylint: disable=protected-access
+    delay = coordinator.update_interval
+
+    assert timedelta(seconds=1) <= delay <= SCAN_INTERVAL
+    # Computed when the entry was set up, maybe a second earlier
+    poll = int(hass.loop.time()) + delay.seconds
+    assert (poll - phase) % SCAN_INTERVAL.seconds in (0, 1)
+
+    coordinator._fresh_until = 0  # pylint: disable=protected-access
+    async_fire_time_changed(hass, dt_util.utcnow() + delay)
+    await hass.async_block_till_done()
+
+    assert calls.count(("refresh_data",)) == refreshes + 1
+    assert coordinator.update_interval == SCAN_INTERVAL
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_repeated_setup_and_unload_leaks_nothing(
+    hass: HomeAssistant,
+    fake_client: type[FakeClient],
+    sessions: list[ClientSession],
+) -> None:
+    """Test setting up and unloading an entry leaves no work behind."""
+    entry = _entry(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    timers = _timers(hass)
+    tasks = _tasks()
+
+    for _ in range(SETUP_CYCLES):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        assert entry.state is ConfigEntryState.LOADED
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        assert entry.state is ConfigEntryState.NOT_LOADED
+
+        assert _timers(hass) <= timers
+        assert _tasks() <= tasks
+
+    # The client is kept warm across the cycles, then evicted
+    assert len(sessions) == 1
+    assert not sessions[0].closed
+    connector = sessions[0].connector
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=CLIENT_EVICTION_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+    assert sessions[0].closed
+    # Detached, the connector of Home Assistant is still open
+    assert not connector.closed
+
+
+async def test_repeated_reload_leaks_nothing(
+    hass: HomeAssistant,
+    fake_client: type[FakeClient],
+    sessions: list[ClientSession],
+) -> None:
+    """Test reloading an entry replaces its work instead of adding to it."""
+    entry = _entry(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    timers = _timers(hass)
+    tasks = _tasks()
+
+    for _ in range(SETUP_CYCLES):
+        lifecycle = hass.data[DOMAIN][entry.entry_id][LIFECYCLE]
+        assert await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+
+        assert entry.state is ConfigEntryState.LOADED
+        assert lifecycle.as_dict() == {"shutdown": True, "tasks": [], "timers": 0}
+        assert _timers(hass) <= timers
+        assert _tasks() <= tasks
+
+    assert len(sessions) == 1
+    assert not sessions[0].closed
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_failed_unload_keeps_running(
+    hass: HomeAssistant, fake_client: type[FakeClient]
+) -> None:
+    """Test the background work keeps running when the platforms stay loaded."""
+    entry = _entry(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    lifecycle = hass.data[DOMAIN][entry.entry_id][LIFECYCLE]
+
+    with patch.object(
+        hass.config_entries, "async_unload_platforms", return_value=False
+    ):
+        assert not await hass.config_entries.async_unload(entry.entry_id)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert not lifecycle.is_shutdown
+    assert entry.entry_id in hass.data[DOMAIN]
+
+    await lifecycle.async_shutdown()
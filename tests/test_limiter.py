@@ -0,0 +1,99 @@
+"""Tests of the limiter of the requests in flight of an account."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aquarea.limiter import AquareaRequestLimiter, async_get_limiter
+
+ACCOUNT = "User@Example.com"
+
+
+class _Requests:
+    """Requests held in flight until released, counting the concurrent ones."""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def request(self) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await self.release.wait()
+        finally:
+            self.in_flight -= 1
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_limit_requests_in_flight() -> None:
+    """Test no more requests than the limit are in flight at once."""
+    limiter = AquareaRequestLimiter(2)
+    requests = _Requests()
+
+    tasks = [asyncio.create_task(limiter.run(requests.request)) for _ in range(5)]
+    await _settle()
+
+    assert requests.in_flight == 2
+    assert limiter.queue_depth == 3
+
+    requests.release.set()
+    await asyncio.gather(*tasks)
+
+    assert requests.max_in_flight == 2
+    assert limiter.in_flight == 0
+    assert limiter.queue_depth == 0
+
+
+async def test_change_limit_in_place() -> None:
+    """Test a new limit applies to the requests already waiting."""
+    limiter = AquareaRequestLimiter(1)
+    requests = _Requests()
+
+    tasks = [asyncio.create_task(limiter.run(requests.request)) for _ in range(4)]
+    await _settle()
+    assert requests.in_flight == 1
+
+    limiter.async_set_limit(3)
+    await _settle()
+    assert requests.in_flight == 3
+
+    limiter.async_set_limit(1)
+    requests.release.set()
+    await asyncio.gather(*tasks)
+    assert limiter.in_flight == 0
+
+
+async def test_cancelled_waiter_frees_nothing() -> None:
+    """Test a request cancelled while waiting doesn't take or leak a slot."""
+    limiter = AquareaRequestLimiter(1)
+    requests = _Requests()
+
+    running = asyncio.create_task(limiter.run(requests.request))
+    waiting = asyncio.create_task(limiter.run(requests.request))
+    await _settle()
+    waiting.cancel()
+    await _settle()
+
+    assert limiter.queue_depth == 0
+    requests.release.set()
+    await running
+    assert limiter.in_flight == 0
+
+    await limiter.run(requests.request)
+    assert requests.max_in_flight == 1
+
+
+async def test_shared_limiter_of_account(hass: HomeAssistant) -> None:
+    """Test the entries of an account share one limiter, whatever their limit."""
+    limiter = async_get_limiter(hass, ACCOUNT, 2)
+
+    assert async_get_limiter(hass, ACCOUNT.lower(), 4) is limiter
+    assert limiter.limit == 4
+    assert async_get_limiter(hass, "other@example.com", 4) is not limiter
@@ -0,0 +1,169 @@
+"""Tests of the weekly programs and the profile restores."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+from datetime import timedelta
+from typing import Any
+
+from aioaquarea import ExtendedOperationMode
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import dt as dt_util
+
+from custom_components.aquarea.const import DEVICES, DOMAIN, SCHEDULER
+from custom_components.aquarea.coordinator import AquareaDataUpdateCoordinator
+
+from .fakes import DEVICE_ID, USERNAME, FakeClient
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    recorder_mock: None, enable_custom_integrations: None
+) -> None:
+    """Enable the integration, which depends on the recorder."""
+
+
+@pytest.fixture
+async def entry(
+    hass: HomeAssistant, fake_client: type[FakeClient]
+) -> AsyncGenerator[MockConfigEntry, None]:
+    """Set up the device and unload it after the test."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: "password"},
+        unique_id=USERNAME,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    yield entry
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+def _coordinator(
+    hass: HomeAssistant, entry: MockConfigEntry
+) -> AquareaDataUpdateCoordinator:
+    return hass.data[DOMAIN][entry.entry_id][DEVICES][DEVICE_ID]
+
+
+def _device_id(hass: HomeAssistant) -> str:
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, DEVICE_ID)})
+    assert device is not None
+    return device.id
+
+
+def _turn_off(coordinator: AquareaDataUpdateCoordinator) -> None:
+    coordinator.device._status.operation_mode = (  # pylint: disable=protected-access
+        ExtendedOperationMode.OFF
+    )
+
+
+async def _run_programs(
+    hass: HomeAssistant, entry: MockConfigEntry, temperatures: dict[str, int]
+) -> dict[str, Any]:
+    """Program the targets a few minutes ahead, return the result once run."""
+    due = (dt_util.now() + timedelta(minutes=2)).replace(second=0, microsecond=0)
+    for target, temperature in temperatures.items():
+        await hass.services.async_call(
+            DOMAIN,
+            "set_program",
+            {
+                "device_id": _device_id(hass),
+                "target": target,
+                "program": [
+                    {"time": due.strftime("%H:%M"), "temperature": temperature}
+                ],
+            },
+            blocking=True,
+        )
+
+    async_fire_time_changed(hass, due + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    # The programs are applied in background tasks of the entry
+    await asyncio.gather(
+        *(
+            task
+            for task in asyncio.all_tasks()
+            if f"program {DEVICE_ID}" in task.get_name()
+        )
+    )
+
+    scheduler = hass.data[DOMAIN][entry.entry_id][SCHEDULER]
+    return scheduler.as_dict()["results"][DEVICE_ID]
+
+
+async def test_program_applied(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Test a program sets the target temperature of the zone."""
+    calls = _coordinator(hass, entry).device.calls
+
+    result = await _run_programs(hass, entry, {"zone_1": 26})
+
+    assert ("set_temperature", 26, 1) in calls
+    assert [change["setting"] for change in result["changes"]] == [
+        "zone_1_temperature"
+    ]
+    assert result["skipped"] == {}
+    assert "error" not in result
+
+
+async def test_program_skipped_while_off(
+    hass: HomeAssistant, entry: MockConfigEntry
+) -> None:
+    """Test a zone program is skipped with its reason, not reported as done."""
+    coordinator = _coordinator(hass, entry)
+    _turn_off(coordinator)
+
+    result = await _run_programs(hass, entry, {"zone_1": 26})
+
+    assert not any(call[0] == "set_temperature" for call in coordinator.device.calls)
+    assert result["changes"] == []
+    assert result["skipped"] == {"zone_1": "the device is off"}
+    assert result["error"] == "No target temperature could be set"
+    assert result["attempts"] == 1
+
+
+async def test_program_partially_skipped(
+    hass: HomeAssistant, entry: MockConfigEntry
+) -> None:
+    """Test the targets the device takes are set when others are skipped."""
+    coordinator = _coordinator(hass, entry)
+    _turn_off(coordinator)
+
+    result = await _run_programs(hass, entry, {"zone_1": 26, "tank": 48})
+
+    assert ("set_target_temperature", 48) in coordinator.device.calls
+    assert result["skipped"] == {"zone_1": "the device is off"}
+    assert "error" not in result
+
+
+async def test_restore_profile_reports_skipped(
+    hass: HomeAssistant, entry: MockConfigEntry
+) -> None:
+    """Test restoring a profile returns the temperatures it could not set."""
+    coordinator = _coordinator(hass, entry)
+    await hass.services.async_call(
+        DOMAIN,
+        "save_profile",
+        {"device_id": _device_id(hass), "profile": "day"},
+        blocking=True,
+    )
+    _turn_off(coordinator)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "restore_profile",
+        {"device_id": _device_id(hass), "profile": "day"},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["skipped"] == {"zone_1_temperature": "the device is off"}
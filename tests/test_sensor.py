@@ -0,0 +1,80 @@
+"""Tests of the sensors of the Aquarea Smart Cloud devices."""
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+
+from aioaquarea.data import FaultError
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.aquarea.const import DEVICES, DOMAIN
+from custom_components.aquarea.coordinator import AquareaDataUpdateCoordinator
+
+from .fakes import DEVICE_ID, USERNAME, FakeClient
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    recorder_mock: None, enable_custom_integrations: None
+) -> None:
+    """Enable the integration, which depends on the recorder."""
+
+
+@pytest.fixture
+async def coordinator(
+    hass: HomeAssistant, fake_client: type[FakeClient]
+) -> AsyncGenerator[AquareaDataUpdateCoordinator, None]:
+    """Set up the device and return its coordinator."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: "password"},
+        unique_id=USERNAME,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    yield hass.data[DOMAIN][entry.entry_id][DEVICES][DEVICE_ID]
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def _refresh(
+    hass: HomeAssistant, coordinator: AquareaDataUpdateCoordinator
+) -> None:
+    """Refresh the device, past the window reusing the last refresh."""
+    coordinator._fresh_until = 0  # pylint: disable=protected-access
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+
+async def test_error_sensor_follows_fault_code(
+    hass: HomeAssistant, coordinator: AquareaDataUpdateCoordinator
+) -> None:
+    """Test the error sensor follows the fault code while the device is in error."""
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"{DEVICE_ID}_error"
+    )
+    assert entity_id is not None
+    # pylint: disable-next=protected-access
+    fault_status = coordinator.device._status.fault_status
+    assert hass.states.get(entity_id).state == "unknown"
+
+    fault_status.append(FaultError("Water flow", "H62"))
+    await _refresh(hass, coordinator)
+    state = hass.states.get(entity_id)
+    assert state.state == "H62"
+    assert state.attributes["error_message"] == "Water flow"
+
+    fault_status[0] = FaultError("Outdoor sensor", "H42")
+    await _refresh(hass, coordinator)
+    state = hass.states.get(entity_id)
+    assert state.state == "H42"
+    assert state.attributes["error_message"] == "Outdoor sensor"
+
+    fault_status.clear()
+    await _refresh(hass, coordinator)
+    assert hass.states.get(entity_id).state == "unknown"